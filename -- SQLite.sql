@@ -30,6 +30,57 @@ CREATE TABLE IF NOT EXISTS employee_deductions (
     FOREIGN KEY (deduction_id) REFERENCES deductions(id) ON DELETE CASCADE
 );
 
+-- Satu baris per pegawai, potongan dan periode (dipakai oleh upsert import CSV)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_employee_deductions_period
+    ON employee_deductions (employee_id, deduction_id, month, year);
+
+-- Index untuk query per periode dan per pegawai
+CREATE INDEX IF NOT EXISTS ix_employee_deductions_year_month
+    ON employee_deductions (year, month, deduction_id, payment_status, employee_id, amount);
+CREATE INDEX IF NOT EXISTS ix_employee_deductions_employee_year
+    ON employee_deductions (employee_id, year, month, deduction_id, amount);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_employees_nip ON employees (nip);
+-- Urutan nama + id untuk pagination keyset tabel pegawai
+CREATE INDEX IF NOT EXISTS ix_employees_name ON employees (name, id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_deductions_name ON deductions (name);
+
+-- Tabel rekap total potongan per periode (dipelihara oleh Learn/backend/rollup.py)
+CREATE TABLE IF NOT EXISTS deduction_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    deduction_id INTEGER NOT NULL,
+    payment_status TEXT NOT NULL,
+    total_amount INTEGER NOT NULL DEFAULT 0,
+    entry_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_deduction_rollups_period
+    ON deduction_rollups (year, month, deduction_id, payment_status);
+
+CREATE TABLE IF NOT EXISTS import_fingerprints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    fingerprint INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_import_fingerprints_period
+    ON import_fingerprints (year, month, employee_id);
+CREATE INDEX IF NOT EXISTS ix_import_fingerprints_employee
+    ON import_fingerprints (employee_id);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    imported_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_imported_files_period
+    ON imported_files (year, month);
+
 
 -----------------------------------------------------------
 -- 2. Memasukkan Data ke Tabel employees
@@ -8,6 +8,9 @@ from .pages import *
 from .states import Authentication
 from . import styles
 from .pages.index import index as dashboard_index
+from .backend.exports import EXPORT_PATH, export_endpoint
+from .backend.workers import loop_lag_monitor
+from .api import http_client_lifespan
 
 def index() -> rx.Component:
     return dashboard_index()
@@ -58,6 +61,15 @@ app = rx.App(
     )
 )
 
+# Download CSV export yang di-stream (lihat Learn/backend/exports.py)
+app.api.add_api_route(f"{EXPORT_PATH}/{{token}}", export_endpoint, methods=["GET"])
+
+# Catat lag event loop (lihat Learn/backend/workers.py)
+app.register_lifespan_task(loop_lag_monitor.run)
+
+# Client HTTP bersama untuk Supabase auth (lihat Learn/api.py)
+app.register_lifespan_task(http_client_lifespan)
+
 app.add_page(
     index,
     title="Dashbord Employee Deductions",
@@ -1,4 +1,7 @@
 # Learn\api.py:
+import asyncio
+import contextlib
+import importlib.util
 import jwt
 import httpx
 from datetime import datetime, timedelta
@@ -11,6 +14,83 @@ load_dotenv()
 PUBLIC_URL: str = os.environ["SUPABASE_URL"]
 PUBLIC_KEY: str = os.environ["SUPABASE_KEY"]
 
+# Satu AsyncClient untuk seluruh umur aplikasi: koneksi TCP/TLS ke Supabase
+# dipakai ulang (keep-alive) antar request, bukan handshake baru per panggilan.
+# Untuk development/test, arahkan SUPABASE_URL ke stub lokal
+# (lihat scripts/supabase_stub.py).
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+# HTTP/2 hanya jika paket h2 terpasang (pip install "httpx[http2]")
+HTTP2 = importlib.util.find_spec("h2") is not None
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2  # detik; digandakan setiap percobaan ulang
+# Server menolak request sebelum memprosesnya: aman diulang untuk semua method
+RETRY_STATUSES = {429, 503}
+# Gateway error: request mungkin sudah sampai ke Supabase, jadi hanya method idempoten yang diulang
+RETRY_IDEMPOTENT_STATUSES = {502, 504}
+# Method yang aman diulang meskipun request mungkin sudah diterima server.
+# PATCH di modul ini selalu menulis nilai absolut, jadi hasilnya sama jika diulang.
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """AsyncClient bersama (dibuat saat pertama dipakai, dibuka ulang jika sudah ditutup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=PUBLIC_URL,
+            headers={"apikey": PUBLIC_KEY},
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_LIMITS,
+            http2=HTTP2,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@contextlib.asynccontextmanager
+async def http_client_lifespan():
+    """Lifespan task aplikasi: buka client bersama saat start, tutup koneksinya saat shutdown."""
+    get_client()
+    try:
+        yield
+    finally:
+        await close_client()
+
+
+async def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Kirim request lewat client bersama, dengan retry + exponential backoff.
+
+    Error koneksi (request belum terkirim) dan status ``RETRY_STATUSES``
+    selalu diulang. Timeout/putus di tengah jalan dan status
+    ``RETRY_IDEMPOTENT_STATUSES`` hanya diulang untuk method idempoten, agar
+    signup/insert tidak terkirim dua kali.
+    """
+    idempotent = method.upper() in _IDEMPOTENT_METHODS
+    retry_statuses = RETRY_STATUSES | RETRY_IDEMPOTENT_STATUSES if idempotent else RETRY_STATUSES
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            response = await get_client().request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if last_attempt:
+                raise
+        except httpx.TransportError:
+            if last_attempt or not idempotent:
+                raise
+        else:
+            if last_attempt or response.status_code not in retry_statuses:
+                return response
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
 
 # first API endpoint: user login...
 async def user_login_endpoint(email:str, password: str):
@@ -30,20 +110,17 @@ async def user_login_endpoint(email:str, password: str):
     }
     
     #send request...
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url=url, headers=headers, json=data
-        )
-        
-        data = response.json()
-        
-        # get the data that we need ...
-        access_token =  data["access_token"]
-        expires_in = data["expires_in"]
-        user_id = data["user"]["id"]
-        user_email = data["user"]["email"]
-        
-        return access_token, expires_in, user_id, user_email
+    response = await _request("POST", url, headers=headers, json=data)
+
+    data = response.json()
+
+    # get the data that we need ...
+    access_token =  data["access_token"]
+    expires_in = data["expires_in"]
+    user_id = data["user"]["id"]
+    user_email = data["user"]["email"]
+
+    return access_token, expires_in, user_id, user_email
     
 
 # second API endpoint: user registration
@@ -57,18 +134,17 @@ async def is_invitation_code_valid(code: str):
         "Authorization": f"Bearer {PUBLIC_KEY}",
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url=url, headers=headers)
-        data = response.json()
-        
-        if len(data) == 0:
-            return False
-            
-        code_data = data[0]
-        return (
-            not code_data['is_used'] and 
-            datetime.fromisoformat(code_data['expired_at']) > datetime.now()
-        )
+    response = await _request("GET", url, headers=headers)
+    data = response.json()
+
+    if len(data) == 0:
+        return False
+
+    code_data = data[0]
+    return (
+        not code_data['is_used'] and 
+        datetime.fromisoformat(code_data['expired_at']) > datetime.now()
+    )
 
 
 async def mark_code_used(code: str, user_id: str):
@@ -87,26 +163,25 @@ async def mark_code_used(code: str, user_id: str):
         "used_at": datetime.now().isoformat()
     }
     
-    async with httpx.AsyncClient() as client:
-        await client.patch(url=url, headers=headers, json=data)
+    await _request("PATCH", url, headers=headers, json=data)
 
 
 async def resend_confirmation_email(email: str):
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                # "https://acsyvbepkaxpmeupvfxl.supabase.co/auth/v1/recover",
-                f"{PUBLIC_URL}/auth/v1/recover",
-                headers={
-                    "apikey": PUBLIC_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={"email": email}
-            )
-            
-            if response.status_code == 200:
-                return "Email konfirmasi telah dikirim ulang! Cek inbox Anda."
-            return "Gagal mengirim ulang email konfirmasi"
+        response = await _request(
+            "POST",
+            # "https://acsyvbepkaxpmeupvfxl.supabase.co/auth/v1/recover",
+            f"{PUBLIC_URL}/auth/v1/recover",
+            headers={
+                "apikey": PUBLIC_KEY,
+                "Content-Type": "application/json"
+            },
+            json={"email": email}
+        )
+
+        if response.status_code == 200:
+            return "Email konfirmasi telah dikirim ulang! Cek inbox Anda."
+        return "Gagal mengirim ulang email konfirmasi"
             
     except Exception as e:
         return f"Error: {str(e)}"
@@ -142,28 +217,29 @@ async def user_registration_endpoint(
             }
         }
         
-        async with httpx.AsyncClient() as client:
-            # Registrasi user
-            response = await client.post(url=url, headers=headers, json=data)
-            
-            if response.status_code not in [200, 201]:
-                return f"Registration failed. Status: {response.status_code}, Error: {response.text}"
-                        
-            user_data = response.json()
-            user_id = user_data['user']['id']
-            
-            # Update role berdasarkan kode undangan
-            await client.patch(
+        # Registrasi user
+        response = await _request("POST", url, headers=headers, json=data)
+
+        if response.status_code not in [200, 201]:
+            return f"Registration failed. Status: {response.status_code}, Error: {response.text}"
+
+        user_data = response.json()
+        user_id = user_data['user']['id']
+
+        # Update role berdasarkan kode undangan dan tandai kode digunakan;
+        # keduanya hanya bergantung pada user_id, jadi dikirim bersamaan
+        await asyncio.gather(
+            _request(
+                "PATCH",
                 # url=f"https://acsyvbepkaxpmeupvfxl.supabase.co/rest/v1/profiles?id=eq.{user_id}",
-                url=f"{PUBLIC_URL}/rest/v1/profiles?id=eq.{user_id}",
+                f"{PUBLIC_URL}/rest/v1/profiles?id=eq.{user_id}",
                 headers=headers,
                 json={"role": "employee"}
-            )
-            
-            # Tandai kode digunakan
-            await mark_code_used(invitation_code, user_id)
-            
-            return True
+            ),
+            mark_code_used(invitation_code, user_id),
+        )
+
+        return True
         
     except httpx.HTTPStatusError as e:
         error_messages = {
@@ -185,9 +261,8 @@ async def get_user_role(user_id: str):
         "Authorization": f"Bearer {PUBLIC_KEY}",
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url=url, headers=headers)
-        return response.json()[0]['role']
+    response = await _request("GET", url, headers=headers)
+    return response.json()[0]['role']
 
 # endpoint to check if JWT is valid
 async def is_user_authenticated(access_token: str):
@@ -225,8 +300,7 @@ async def generate_invitation_code(role: str, expiry_days: int = 7):
         "role": role
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url=url, headers=headers, json=data)
-        if response.status_code == 201:
-            return code
-        return None
\ No newline at end of file
+    response = await _request("POST", url, headers=headers, json=data)
+    if response.status_code == 201:
+        return code
+    return None
\ No newline at end of file
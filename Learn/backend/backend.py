@@ -1,65 +1,75 @@
+import asyncio
 import io
 import csv
 import re
 import pandas as pd
 from io import BytesIO
 from datetime import datetime, timedelta
+from pathlib import Path
 import calendar
 from typing import Union, List, Dict, Any
 from sqlalchemy import text
 import reflex as rx
 from reflex import UploadFile
+from reflex.utils import format
 from sqlmodel import Field, String, asc, cast, desc, func, or_, select
 
-# ---------------------------
-# Model-Model Baru
-# ---------------------------
-
-class Employee(rx.Model, table=True):
-    """Model untuk data pegawai."""
-    __tablename__ = "employees"
-    name: str
-    nip: str
-
-
-class Deduction(rx.Model, table=True):
-    """Model untuk jenis potongan."""
-    __tablename__ = "deductions"
-    name: str
-
-
-class EmployeeDeduction(rx.Model, table=True):
-    """Model untuk data potongan tiap pegawai per periode."""
-    __tablename__ = "employee_deductions"
-    employee_id: int
-    deduction_id: int
-    amount: int | None = None
-    payment_status: str = "unpaid"  # nilai default 'unpaid'
-    payment_type: Union[str, None] = None  # 'cash' atau 'transfer'
-    month: int
-    year: int
-    created_at: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-    updated_at: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-
-# Jika dibutuhkan, model untuk _view data_ (bukan tabel) bisa dibuat secara dinamis
-# Contoh: EmployeeDeductionEntry (dipakai untuk menampung hasil join/pivot)
-class EmployeeDeductionEntry(rx.Model):
-    id: int
-    name: str
-    nip: str
-    arisan: int | None = None
-    iuran_dw: int | None = None
-    simpanan_wajib_koperasi: int | None = None
-    belanja_koperasi: int | None = None
-    simpanan_pokok: int | None = None
-    kredit_khusus: int | None = None
-    kredit_barang: int | None = None
-    total_potongan: int | None = None
-    date: str | None = None
-    status: str | None = None
-    payment_type: str | None = None
-
+from ..models import Employee, EmployeeDeduction, EmployeeDeductionEntry
+from .backfill import backfill, create_backfill_dir, remove_backfill_dir
+from .cache import bump_data_version, data_version, employee_year_cache, reference_cache
+from .catalog import add_deduction, load_catalog, short_label
+from .dashboard import (
+    Dashboard,
+    TablePage,
+    TableQuery,
+    area_chart_series,
+    fetch_page,
+    goto_page,
+    load_dashboard,
+    load_table,
+    month_stats,
+    month_stats_params,
+    payment_status_data,
+    prefetch_month,
+    rows_to_entries,
+)
+from .exports import csv_chunks, export_url, slip_block
+from .fingerprints import forget_imports
+from .importer import MAX_REPORTED_ERRORS, ImportReport
+from .jobs import (
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    ImportJob,
+    cancel_job,
+    create_job,
+    finish_job,
+    get_job,
+    run_import_job,
+)
+from .month_pivot import adjacent_periods
+from .queries import (
+    CURSOR_AFTER,
+    CURSOR_BEFORE,
+    CURSOR_FROM,
+    EMPLOYEE_RECAP_SQL,
+    entries_query,
+    fold_case,
+    search_term,
+)
+from .rollup import RollupDelta, remove_employee_rows
+from .workers import run_blocking
+
+# Jeda (detik) sebelum query pencarian dijalankan; ketikan baru dalam jeda ini menggantikan yang lama
+SEARCH_DEBOUNCE_SECONDS = 0.25
+# Interval (detik) pengiriman progress job import ke UI
+IMPORT_PROGRESS_INTERVAL = 0.5
+# Ukuran potongan saat menyimpan file upload ke disk
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Warna chart per jenis potongan (urut katalog, berulang jika jenis potongan lebih banyak)
+DEDUCTION_COLORS = ["lime", "blue", "green", "orange", "purple", "brown", "pink", "cyan", "amber", "crimson"]
 
 # ---------------------------
 # State (Backend Logic)
@@ -73,24 +83,36 @@ class MonthValues(rx.Base):
 
 class State(rx.State):
     """State aplikasi yang diperbarui untuk menangani data EmployeeDeduction."""
-    # Daftar entry hasil join/pivot (untuk front end)
-    entries: list[EmployeeDeductionEntry] = []
+    # Hanya baris halaman aktif yang disinkronkan ke front end
+    current_page_entries: list[EmployeeDeductionEntry] = []
     sort_value: str = ""
     sort_reverse: bool = False
     search_value: str = ""
+    _search_seq: int = 0  # nomor urut input pencarian terakhir
     current_entry: EmployeeDeductionEntry = None  # untuk update
+
+    # Katalog jenis potongan (kolom tabel, form, tab chart); lihat backend/catalog.py
+    deduction_names: list[str] = []
+    deduction_tabs: list[dict[str, str]] = []
+    _catalog_version: int = -1
     
     # Nilai agregat (bisa disesuaikan jika diperlukan)
     current_month_values: MonthValues = MonthValues()
     previous_month_values: MonthValues = MonthValues()
+    _month_stats_version: int = -1  # versi data dari kartu statistik yang sudah dikirim
     
     # Tambahkan variabel untuk pagination
     total_entries: int = 0
-    offset: int = 0
+    offset: int = 0  # indeks baris pertama halaman aktif (untuk nomor halaman; paging memakai kursor)
+    # Kursor keyset [nilai kolom sort, id] baris pertama/terakhir halaman aktif
+    _first_cursor: list | None = None
+    _last_cursor: list | None = None
+    _table_payload_bytes: int = 0  # metrik: ukuran JSON halaman tabel terakhir yang dikirim
     limit: int = 10  # Jumlah baris per halaman
     
     current_month: datetime = datetime.now()  # Untuk tracking bulan aktif
     timeframe: str = "Monthly"
+    payment_status_data: List[Dict[str, Any]] = []  # pie chart status pembayaran untuk timeframe aktif
     
     # Tambahkan state variables baru
     selected_employee_id: int = 1
@@ -115,6 +137,22 @@ class State(rx.State):
     
     # Tambahkan state variable untuk area chart
     area_chart_data: List[Dict[str, Any]] = []  
+    _area_chart_version: int = -1  # versi data dari area_chart_data yang sudah dikirim
+
+    # Progress job import CSV yang berjalan di background (lihat backend/jobs.py)
+    import_job_id: str = ""
+    import_status: str = ""  # queued / running / done / cancelled / failed
+    import_filename: str = ""
+    import_rows_parsed: int = 0
+    import_rows_upserted: int = 0
+    import_rows_inserted: int = 0
+    import_rows_updated: int = 0
+    import_rows_unchanged: int = 0
+    import_error_count: int = 0
+    import_errors: list[str] = []
+    import_summary: str = ""
+    import_cancel_requested: bool = False
+    import_is_backfill: bool = False  # backfill banyak file tidak bisa dibatalkan
     
     @rx.var(cache=True)
     def is_nip_valid(self) -> bool:
@@ -124,11 +162,8 @@ class State(rx.State):
     @rx.var(cache=True)
     def selected_employee_name(self) -> str:
         """Get name of selected employee."""
-        with rx.session() as session:
-            employee = session.exec(
-                select(Employee).where(Employee.id == self.selected_employee_id)
-            ).first()
-            return employee.name if employee else ""
+        employee = reference_cache.employee(self.selected_employee_id)
+        return employee[1] if employee else ""
         
     def on_mount(self) -> None:
         """Initialize state when component mounts."""
@@ -156,71 +191,55 @@ class State(rx.State):
         if not self.nip_input:
             return
         
-        with rx.session() as session:
-            employee = session.exec(
-                select(Employee).where(Employee.nip == self.nip_input)
-            ).first()
-            if employee:
-                self.selected_employee_id = employee.id
-                self.monthly_data = self._fetch_monthly_data()
-                # Clear input after successful search
-                self.nip_input = ""
-            else:
-                return rx.toast.error("Employee not found!", position="bottom-right")
+        employee = reference_cache.employees_by_nip([self.nip_input]).get(self.nip_input)
+        if employee:
+            self.selected_employee_id = employee[0]
+            self.monthly_data = self._fetch_monthly_data()
+            # Clear input after successful search
+            self.nip_input = ""
+        else:
+            return rx.toast.error("Employee not found!", position="bottom-right")
+
+    def _employee_year(self, employee_id: int, year: int) -> Dict[str, tuple]:
+        """Nominal 12 bulan per jenis potongan untuk satu pegawai dan tahun.
+
+        Satu query untuk semua potongan; di-cache per (pegawai, tahun) sampai
+        data berubah, jadi ganti potongan atau setengah tahun tidak query lagi.
+        """
+        catalog = load_catalog()
+
+        def compute() -> Dict[str, tuple]:
+            deductions = catalog.by_id()
+            amounts = {name: [0] * 12 for name in catalog.names}
+            with rx.session() as session:
+                rows = session.execute(
+                    text(EMPLOYEE_RECAP_SQL), {"employee_id": employee_id, "year": year}
+                ).all()
+            for deduction_id, month, amount in rows:
+                if deduction_id in deductions:
+                    amounts[deductions[deduction_id].name][month - 1] = amount or 0
+            return {name: tuple(values) for name, values in amounts.items()}
+
+        return employee_year_cache.get_or_compute((employee_id, year, catalog.version), compute)
 
     def _fetch_monthly_data(self) -> List[Dict[str, Any]]:
-        """Internal function untuk mengambil data bulanan."""
+        """Data chart 6 bulan (Jan-Jun / Jul-Dec) untuk pegawai dan potongan terpilih."""
         if not self.selected_employee_id:
             return []
-        
-        print(f"Getting data for employee_id: {self.selected_employee_id}")
-        print(f"Selected deduction: {self.selected_deduction}")
 
-        with rx.session() as session:
-            year = self.current_month.year
-            if self.current_page_month == 1:
-                start_month, end_month = 1, 6
-            else:
-                start_month, end_month = 7, 12
-
-            query = text("""
-                SELECT 
-                    ed.month,
-                    SUM(ed.amount) as total_amount
-                FROM employee_deductions ed
-                JOIN deductions d ON ed.deduction_id = d.id
-                WHERE ed.employee_id = :employee_id
-                AND d.name = :deduction_name
-                AND ed.year = :year
-                AND ed.month BETWEEN :start_month AND :end_month
-                GROUP BY ed.month
-                ORDER BY ed.month
-            """)
-
-            result = session.execute(
-                query,
-                {
-                    "employee_id": self.selected_employee_id,
-                    "deduction_name": self.selected_deduction,
-                    "year": year,
-                    "start_month": start_month,
-                    "end_month": end_month
-                }
-            ).fetchall()
-
-            data_dict = {row[0]: row[1] for row in result}
-            
-            # Perbaiki cara pembuatan data
-            formatted_data = []
-            for month in range(start_month, end_month + 1):
-                month_name = self.month_name(month)
-                formatted_data.append({
-                    "month": month_name,
-                    "amount": data_dict.get(month, 0),
-                    "fill": rx.color(self.MONTH_COLORS.get(month_name, "gray"), 9)
-                })
-            
-            return formatted_data
+        amounts = self._employee_year(self.selected_employee_id, self.current_month.year).get(
+            self.selected_deduction, (0,) * 12
+        )
+        start_month = 1 if self.current_page_month == 1 else 7
+        formatted_data = []
+        for month in range(start_month, start_month + 6):
+            month_name = self.month_name(month)
+            formatted_data.append({
+                "month": month_name,
+                "amount": amounts[month - 1],
+                "fill": rx.color(self.MONTH_COLORS.get(month_name, "gray"), 9)
+            })
+        return formatted_data
 
     @rx.event
     def set_selected_deduction(self, value: str):
@@ -276,262 +295,70 @@ class State(rx.State):
         if not self.selected_employee_id:
             return rx.toast.error("No employee selected!", position="bottom-right")
 
-        output = io.StringIO()
-        writer = csv.writer(output)
         year = self.current_month.year
-
-        with rx.session() as session:
-            # Get employee name
-            employee = session.exec(
-                select(Employee).where(Employee.id == self.selected_employee_id)
-            ).first()
-
-            if not employee:
-                return rx.toast.error("Employee not found!", position="bottom-right")
-
-            # Write header
-            writer.writerow([f"Recap Deductions Employee by {employee.name} in {year}"])
-            writer.writerow([])  # Empty row
-
-            # Write column headers
-            headers = ["Deductions"] + ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", 
-                                    "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
-            writer.writerow(headers)
-
-            # Get data for each deduction type
-            deduction_types = ["Arisan", "Iuran DW", "Simpanan Wajib Koperasi", 
-                            "Belanja Koperasi", "Simpanan Pokok", "Kredit Khusus", 
-                            "Kredit Barang"]
-
-            query = text("""
-                SELECT 
-                    d.name as deduction_name,
-                    ed.month,
-                    SUM(ed.amount) as amount
-                FROM employee_deductions ed
-                JOIN deductions d ON ed.deduction_id = d.id
-                WHERE ed.employee_id = :employee_id
-                AND ed.year = :year
-                GROUP BY d.name, ed.month
-                ORDER BY d.name, ed.month
-            """)
-
-            result = session.execute(
-                query,
-                {"employee_id": self.selected_employee_id, "year": year}
-            ).fetchall()
-
-            # Convert to dictionary for easier access
-            data_dict = {}
-            for row in result:
-                if row[0] not in data_dict:
-                    data_dict[row[0]] = [0] * 12  # Initialize with zeros
-                data_dict[row[0]][row[1] - 1] = row[2] or 0
-
-            # Write data rows
-            for deduction in deduction_types:
-                row_data = [deduction] + [
-                    f"{amount:,.0f}".replace(",", ".") if amount else ""
-                    for amount in data_dict.get(deduction, [0] * 12)
-                ]
-                writer.writerow(row_data)
-
-        # Get CSV data and generate filename
-        csv_data = output.getvalue()
-        output.close()
-        filename = f"recap_deductions_{employee.name.replace(' ', '_')}_{year}.csv"
-
-        return rx.download(data=csv_data, filename=filename)
+        employee = reference_cache.employee(self.selected_employee_id)
+        if not employee:
+            return rx.toast.error("Employee not found!", position="bottom-right")
+        employee_name = employee[1]
+
+        filename = f"recap_deductions_{employee_name.replace(' ', '_')}_{year}.csv"
+        return self._stream_download(
+            "employee_recap", filename, employee_id=self.selected_employee_id, year=year
+        )
 
     @rx.event
     def download_all_recap(self):
-        """Download recap deductions untuk semua employee."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        year = self.current_month.year
+        """Download recap deductions untuk semua employee.
 
-        with rx.session() as session:
-            # Get all employees
-            employees = session.exec(select(Employee).order_by(Employee.name)).all()
-
-            for employee in employees:
-                # Write header for each employee
-                writer.writerow([f"Recap Deductions Employee by {employee.name} in {year}"])
-                writer.writerow([])  # Empty row
-
-                # Write column headers
-                headers = ["Deductions"] + ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", 
-                                        "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
-                writer.writerow(headers)
-
-                # Get data for each deduction type
-                query = text("""
-                    SELECT 
-                        d.name as deduction_name,
-                        ed.month,
-                        SUM(ed.amount) as amount
-                    FROM employee_deductions ed
-                    JOIN deductions d ON ed.deduction_id = d.id
-                    WHERE ed.employee_id = :employee_id
-                    AND ed.year = :year
-                    GROUP BY d.name, ed.month
-                    ORDER BY d.name, ed.month
-                """)
-
-                result = session.execute(
-                    query,
-                    {"employee_id": employee.id, "year": year}
-                ).fetchall()
-
-                # Convert to dictionary
-                data_dict = {}
-                for row in result:
-                    if row[0] not in data_dict:
-                        data_dict[row[0]] = [0] * 12
-                    data_dict[row[0]][row[1] - 1] = row[2] or 0
-
-                # Write data rows
-                deduction_types = ["Arisan", "Iuran DW", "Simpanan Wajib Koperasi", 
-                                "Belanja Koperasi", "Simpanan Pokok", "Kredit Khusus", 
-                                "Kredit Barang"]
-                
-                for deduction in deduction_types:
-                    row_data = [deduction] + [
-                        f"{amount:,.0f}".replace(",", ".") if amount else ""
-                        for amount in data_dict.get(deduction, [0] * 12)
-                    ]
-                    writer.writerow(row_data)
-
-                # Add two empty rows between employees
-                writer.writerow([])
-                writer.writerow([])
-
-        # Get CSV data and generate filename
-        csv_data = output.getvalue()
-        output.close()
+        Semua pegawai diambil dengan satu query GROUP BY (pegawai, potongan, bulan)
+        dan di-stream oleh endpoint export, bukan satu query per pegawai.
+        """
+        year = self.current_month.year
         filename = f"recap_all_deductions_{year}.csv"
-
-        return rx.download(data=csv_data, filename=filename)
+        return self._stream_download("all_recap", filename, year=year)
+
+    def _stream_download(self, kind: str, filename: str, **params):
+        """Unduh export lewat endpoint HTTP streaming alih-alih mengirim isi file via websocket."""
+        url = export_url(kind, filename, **params)
+        # URL absolut ke backend, jadi dibungkus Var (rx.download hanya menerima path "/..." untuk str)
+        return rx.download(url=rx.Var.create(url), filename=filename)
+
+    def _table_export_params(self) -> dict:
+        """Parameter export yang sama dengan tampilan tabel (periode, pencarian, sorting)."""
+        return {
+            "month": self.current_month.month,
+            "year": self.current_month.year,
+            "search_value": self.search_value,
+            "sort_value": self.sort_value,
+            "sort_reverse": self.sort_reverse,
+        }
     
     @rx.event
     def set_timeframe(self, value: str):
+        """Ganti timeframe pie chart; timeframe lain sudah dihitung di latar belakang oleh ``refresh_pie_chart``."""
         self.timeframe = value
-    
-    def get_payment_status_data(self) -> list:
-        """Get payment status data."""
-        with rx.session() as session:
-            current_date = datetime.now()
-
-            if self.timeframe == "Monthly":
-                query = """
-                    SELECT 
-                        COALESCE(payment_status, 'Unknown') as status,
-                        COUNT(DISTINCT employee_id) as count
-                    FROM employee_deductions
-                    WHERE month = :month AND year = :year
-                    GROUP BY payment_status
-                """
-                params = {"month": current_date.month, "year": current_date.year}
-            else:  # Yearly
-                query = """
-                    SELECT 
-                        COALESCE(payment_status, 'Unknown') as status,
-                        COUNT(DISTINCT employee_id) as count
-                    FROM employee_deductions
-                    WHERE year = :year
-                    GROUP BY payment_status
-                """
-                params = {"year": current_date.year}
-
-            result = session.execute(text(query), params).fetchall()
-
-            # Mapping warna untuk setiap status pembayaran
-            color_mapping = {
-                "paid": "var(--jade-8)",        # Warna biru
-                "unpaid": "var(--tomato-8)",       # Warna merah
-                "installment": "var(--yellow-8)" # Warna ungu
-            }
-
-            # Pastikan semua status ada dalam data
-            status_counts = {row[0]: row[1] for row in result}
-            default_statuses = ["paid", "unpaid", "installment"]
-
-            data = []
-            for status in default_statuses:
-                count = status_counts.get(status, 0)
-                data.append({
-                    "name": status.capitalize(),
-                    "value": count,
-                    "fill": color_mapping.get(status, "var(--gray-8)")  # Default warna abu-abu jika tidak ditemukan
-                })
+        self.payment_status_data = self.get_payment_status_data(value)
 
-            return data
+    def get_payment_status_data(self, timeframe: str = "Monthly") -> list:
+        """Jumlah pegawai per status pembayaran bulan ini ("Monthly") atau tahun ini ("Yearly")."""
+        return payment_status_data(timeframe)
 
-    @rx.var(cache=True)
-    def payment_status_data(self) -> list:
-        """Data untuk pie chart payment status."""
-        return self.get_payment_status_data()
-    
     @rx.event
     def refresh_pie_chart(self):
-        """Refresh pie chart data."""
-        self.payment_status_data = self.get_payment_status_data()
+        """Refresh pie chart data untuk timeframe aktif, lalu hitung timeframe lain di latar belakang."""
+        self.payment_status_data = self.get_payment_status_data(self.timeframe)
         print("Pie chart data refreshed")
-    
-    def _fetch_area_chart_data(self) -> List[Dict[str, Any]]:
-        """Internal function untuk mengambil data area chart."""
-        with rx.session() as session:
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
-            query = text("""
-                WITH monthly_totals AS (
-                    SELECT 
-                        ed.month,
-                        ed.year,
-                        d.name as deduction_name,
-                        SUM(ed.amount) as total_amount
-                    FROM employee_deductions ed
-                    JOIN deductions d ON ed.deduction_id = d.id
-                    WHERE (year = :current_year AND month <= :current_month)
-                    OR (year = :previous_year AND month > :current_month)
-                    GROUP BY ed.month, ed.year, d.name
-                )
-                SELECT 
-                    month,
-                    year,
-                    SUM(CASE WHEN deduction_name = 'Arisan' THEN total_amount ELSE 0 END) AS arisan,
-                    SUM(CASE WHEN deduction_name = 'Iuran DW' THEN total_amount ELSE 0 END) AS iuran_dw,
-                    SUM(CASE WHEN deduction_name = 'Simpanan Wajib Koperasi' THEN total_amount ELSE 0 END) AS simpanan_wajib_koperasi,
-                    SUM(CASE WHEN deduction_name = 'Belanja Koperasi' THEN total_amount ELSE 0 END) AS belanja_koperasi,
-                    SUM(CASE WHEN deduction_name = 'Simpanan Pokok' THEN total_amount ELSE 0 END) AS simpanan_pokok,
-                    SUM(CASE WHEN deduction_name = 'Kredit Khusus' THEN total_amount ELSE 0 END) AS kredit_khusus,
-                    SUM(CASE WHEN deduction_name = 'Kredit Barang' THEN total_amount ELSE 0 END) AS kredit_barang
-                FROM monthly_totals
-                GROUP BY month, year
-                ORDER BY year, month
-            """)
-            
-            result = session.execute(query, {
-                "current_year": current_year,
-                "current_month": current_month,
-                "previous_year": current_year - 1
-            }).fetchall()
-
-            return [
-                {
-                    "month": f"{row[0]}-{row[1]}",
-                    "Arisan": row[2],
-                    "Iuran DW": row[3],
-                    "Simpanan Wajib Koperasi": row[4],
-                    "Belanja Koperasi": row[5],
-                    "Simpanan Pokok": row[6],
-                    "Kredit Khusus": row[7],
-                    "Kredit Barang": row[8],
-                }
-                for row in result
-            ]
+        return State.prefetch_payment_status
 
+    @rx.event(background=True)
+    async def prefetch_payment_status(self):
+        """Isi cache pie chart untuk semua timeframe agar ``set_timeframe`` tidak perlu query."""
+        for timeframe in ("Monthly", "Yearly"):
+            try:
+                await run_blocking(payment_status_data, timeframe)
+            except Exception as e:
+                print(f"Error prefetching payment status ({timeframe}): {e}")
+    
     @rx.var(cache=True)
     def get_deduction_data_last_12_months(self) -> List[Dict[str, Any]]:
         """Get area chart data."""
@@ -539,8 +366,18 @@ class State(rx.State):
         
     @rx.event
     def refresh_area_chart(self):
-        """Refresh area chart data."""
-        self.area_chart_data = self._fetch_area_chart_data()
+        """Refresh area chart data.
+
+        Seri 12 bulan dihitung sekali per versi data dan dibagi ke semua chart;
+        mount ulang / pindah tab tanpa perubahan data tidak menjalankan query
+        dan tidak mengirim ulang data ke browser.
+        """
+        self._sync_catalog()
+        version = data_version()
+        if self._area_chart_version == version and self.area_chart_data:
+            return
+        self.area_chart_data = area_chart_series()
+        self._area_chart_version = version
         
     def parse_int(self, value):
         """
@@ -576,246 +413,242 @@ class State(rx.State):
         except (TypeError, ValueError):
             return None
 
-    async def import_csv(self, files: List[UploadFile]) -> None:
-        """Import data dari file CSV dan masukkan ke dalam database."""
+    def _sync_catalog(self) -> None:
+        """Samakan daftar jenis potongan di front end dengan katalog (hanya jika versinya berubah)."""
+        catalog = load_catalog()
+        if catalog.version == self._catalog_version and self.deduction_names:
+            return
+        self.deduction_names = catalog.names
+        self.deduction_tabs = [
+            {
+                "name": name,
+                "label": short_label(name),
+                "stroke": f"var(--{color}-9)",
+                "fill": f"var(--{color}-7)",
+                "gradient": f"colorDeduction{i}",
+            }
+            for i, name in enumerate(catalog.names)
+            for color in [DEDUCTION_COLORS[i % len(DEDUCTION_COLORS)]]
+        ]
+        self._catalog_version = catalog.version
+        # Area chart dibentuk dari katalog lama; hitung ulang pada refresh berikutnya
+        self._area_chart_version = -1
+
+    def add_deduction_type(self, form_data: dict):
+        """Tambah jenis potongan baru ke katalog; langsung muncul sebagai kolom tabel dan tab chart."""
+        try:
+            with rx.session() as session:
+                deduction = add_deduction(session, form_data.get("name") or "")
+        except ValueError as e:
+            return rx.toast.error(str(e), position="bottom-right")
+        self._sync_catalog()
+        self._reload_table()
+        self.refresh_area_chart()
+        return rx.toast.info(f"Deduction '{deduction.name}' has been added.", position="bottom-right")
+
+    @rx.var(cache=True)
+    def import_running(self) -> bool:
+        """True selama job import masih mengantre atau berjalan."""
+        return self.import_status in (JOB_QUEUED, JOB_RUNNING)
+
+    async def import_csv(self, files: List[UploadFile]):
+        """Simpan file CSV yang diunggah lalu jalankan import sebagai job background."""
         if not files:
             return rx.toast.error("No file uploaded.", position="bottom-right")
+        if self.import_running:
+            return rx.toast.warning("Another import is still running.", position="bottom-right")
 
         file = files[0]
-        content = await file.read()
-        print("RAW CSV CONTENT:\n", content.decode('utf-8-sig'))
-
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')), thousands='.')
-
-        print("CSV Columns:", df.columns.tolist())
-        print(df.head())
+        job = create_job(file.filename or "upload.csv", self.current_month.month, self.current_month.year)
+        # Tulis ke disk per potongan agar file besar tidak ditahan di memori
+        with open(job.path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                out.write(chunk)
+
+        self.import_job_id = job.id
+        self.import_status = job.status
+        self.import_filename = job.filename
+        self.import_rows_parsed = 0
+        self.import_rows_upserted = 0
+        self.import_rows_inserted = 0
+        self.import_rows_updated = 0
+        self.import_rows_unchanged = 0
+        self.import_error_count = 0
+        self.import_errors = []
+        self.import_summary = ""
+        self.import_cancel_requested = False
+        self.import_is_backfill = False
+        return State.run_import_job(job.id)
+
+    def _apply_import_progress(self, job: ImportJob) -> None:
+        self.import_status = job.status
+        self.import_rows_parsed = job.report.rows
+        self.import_rows_upserted = job.report.upserted
+        self.import_rows_inserted = job.report.inserted
+        self.import_rows_updated = job.report.updated
+        self.import_rows_unchanged = job.report.unchanged
+        self.import_error_count = job.report.error_count
+        self.import_errors = list(job.report.errors)
+
+    @rx.event(background=True)
+    async def run_import_job(self, job_id: str):
+        """Jalankan job import di thread pool dan kirim progress ke UI secara berkala."""
+        job = get_job(job_id)
+        if job is None:
+            return
+        task = asyncio.ensure_future(run_blocking(run_import_job, job))
+        while not task.done():
+            await asyncio.wait({task}, timeout=IMPORT_PROGRESS_INTERVAL)
+            async with self:
+                if self.import_job_id == job_id:
+                    self._apply_import_progress(job)
+
+        job = await task
+        finish_job(job_id)
+        report = job.report
+        changed = job.status == JOB_DONE and report.changed > 0
+        if job.status == JOB_DONE:
+            print(f"CSV import {job_id}: {report.summary()}")
+            summary = f"Imported {job.filename}: {report.summary()}."
+        elif job.status == JOB_CANCELLED:
+            summary = f"Import of {job.filename} cancelled after {report.rows} rows; no changes were saved."
+        else:
+            summary = f"Import of {job.filename} failed: {job.error}"
+
+        async with self:
+            if self.import_job_id == job_id:
+                self._apply_import_progress(job)
+                self.import_summary = summary
+            params = self._dashboard_params()
+        if changed:
+            await self._refresh_dashboard(*params)
+
+        if job.status == JOB_DONE and not changed:
+            return rx.toast.info("CSV data is unchanged since the last import; nothing was written.", position="bottom-right")
+        if job.status == JOB_DONE:
+            return rx.toast.info(
+                f"CSV data has been imported successfully ({report.inserted} inserted, {report.updated} updated, "
+                f"{report.unchanged} unchanged rows).",
+                position="bottom-right",
+            )
+        if job.status == JOB_CANCELLED:
+            return rx.toast.info(summary, position="bottom-right")
+        return rx.toast.error(summary, position="bottom-right")
 
-        if 'NIP' not in df.columns:
-            return rx.toast.error("CSV file is missing 'NIP' column.", position="bottom-right")
+    async def import_backfill(self, files: List[UploadFile]):
+        """Simpan banyak CSV bulanan lalu import semuanya; periode diambil dari nama file."""
+        if not files:
+            return rx.toast.error("No file uploaded.", position="bottom-right")
+        if self.import_running:
+            return rx.toast.warning("Another import is still running.", position="bottom-right")
+
+        folder = create_backfill_dir()
+        for file in files:
+            with open(folder / Path(file.filename or "upload.csv").name, "wb") as out:
+                while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                    out.write(chunk)
+
+        self.import_job_id = folder.name
+        self.import_status = JOB_RUNNING
+        self.import_filename = f"{len(files)} files"
+        self.import_rows_parsed = 0
+        self.import_rows_upserted = 0
+        self.import_rows_inserted = 0
+        self.import_rows_updated = 0
+        self.import_rows_unchanged = 0
+        self.import_error_count = 0
+        self.import_errors = []
+        self.import_summary = ""
+        self.import_cancel_requested = False
+        self.import_is_backfill = True
+        return State.run_backfill(str(folder))
+
+    @rx.event(background=True)
+    async def run_backfill(self, folder: str):
+        """Parse file backfill secara paralel lalu tulis satu transaksi per periode."""
+        folder = Path(folder)
+        try:
+            results, skipped = await run_blocking(backfill, [str(path) for path in folder.glob("*.csv")])
+        except Exception as e:
+            print(f"Backfill {folder.name} failed: {e}")
+            results, skipped, error = [], [], str(e)
+        else:
+            error = ""
+        finally:
+            remove_backfill_dir(folder)
+
+        errors = [f"{Path(item.path).name}: {item.error}" for item in skipped]
+        totals = ImportReport()
+        for result in results:
+            print(f"Backfill {folder.name} {result.summary()}")
+            totals.rows += result.report.rows
+            totals.upserted += result.report.upserted
+            totals.inserted += result.report.inserted
+            totals.updated += result.report.updated
+            totals.unchanged += result.report.unchanged
+            totals.error_count += result.report.error_count
+            if result.error:
+                errors.append(result.summary())
+            errors.extend(result.report.errors)
+        written = [result for result in results if not result.error]
+        changed = any(result.report.changed for result in written)
+        summary = error or f"Backfilled {len(written)} periods: " + ", ".join(
+            f"{result.year}-{result.month:02d}" for result in written
+        )
 
-        current_month = self.current_month.month
-        current_year = self.current_month.year
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        async with self:
+            if self.import_job_id == folder.name:
+                self.import_status = JOB_DONE if written or not error else JOB_FAILED
+                self.import_rows_parsed = totals.rows
+                self.import_rows_upserted = totals.upserted
+                self.import_rows_inserted = totals.inserted
+                self.import_rows_updated = totals.updated
+                self.import_rows_unchanged = totals.unchanged
+                self.import_error_count = totals.error_count + len(skipped)
+                self.import_errors = errors[:MAX_REPORTED_ERRORS]
+                self.import_summary = summary
+            params = self._dashboard_params()
+        if changed:
+            await self._refresh_dashboard(*params)
+
+        if error or not written:
+            return rx.toast.error(f"Backfill failed: {error or 'no file could be imported'}", position="bottom-right")
+        return rx.toast.info(
+            f"{summary} ({totals.inserted} inserted, {totals.updated} updated, {totals.unchanged} unchanged rows).",
+            position="bottom-right",
+        )
 
-        with rx.session() as session:
-            for _, row in df.iterrows():
-                employee = session.exec(
-                    select(Employee).where(Employee.nip == row['NIP'])
-                ).first()
-                if not employee:
-                    employee = Employee(name=row['Nama'], nip=row['NIP'])
-                    session.add(employee)
-                    session.commit()
-                    session.refresh(employee)
-
-                csv_date = row['Date'] if pd.notna(row['Date']) and str(row['Date']).strip() != "" else None
-
-                deductions_values = {
-                    "Arisan": self.parse_int(row['Arisan']),
-                    "Iuran DW": self.parse_int(row['Iuran DW']),
-                    "Simpanan Wajib Koperasi": self.parse_int(row['Simpanan Wajib Koperasi']),
-                    "Belanja Koperasi": self.parse_int(row['Belanja Koperasi']),
-                    "Simpanan Pokok": self.parse_int(row['Simpanan Pokok']),
-                    "Kredit Khusus": self.parse_int(row['Kredit Khusus']),
-                    "Kredit Barang": self.parse_int(row['Kredit Barang']),
-                }
-
-                for deduction_name, amount in deductions_values.items():
-                    ded = session.exec(
-                        select(Deduction).where(Deduction.name == deduction_name)
-                    ).first()
-                    if not ded:
-                        continue
-
-                    ed = session.exec(
-                        select(EmployeeDeduction).where(
-                            EmployeeDeduction.employee_id == employee.id,
-                            EmployeeDeduction.deduction_id == ded.id,
-                            EmployeeDeduction.month == current_month,
-                            EmployeeDeduction.year == current_year
-                        )
-                    ).first()
-
-                    if ed:
-                        if ed.amount != amount or ed.payment_status != row['Status'] or ed.payment_type != row['Type']:
-                            ed.amount = amount
-                            ed.payment_status = row['Status'] if row['Status'] in ['paid', 'unpaid', 'installment'] else 'unpaid'
-                            ed.payment_type = row['Type'] if row['Type'] in ['cash', 'transfer'] else None
-                            if csv_date is not None:
-                                ed.updated_at = csv_date
-                            ed.total_potongan = self.parse_int(row['Total Potongan'])
-                            session.add(ed)
-                    else:
-                        new_date = csv_date if csv_date is not None else ""
-                        ed = EmployeeDeduction(
-                            employee_id=employee.id,
-                            deduction_id=ded.id,
-                            amount=amount,
-                            payment_status=row['Status'] if row['Status'] in ['paid', 'unpaid', 'installment'] else 'unpaid',
-                            payment_type=row['Type'] if row['Type'] in ['cash', 'transfer'] else None,
-                            month=current_month,
-                            year=current_year,
-                            created_at=new_date,
-                            updated_at=new_date,
-                            total_potongan=self.parse_int(row['Total Potongan']),
-                        )
-                        session.add(ed)
-            session.commit()
+    def cancel_import(self):
+        """Minta job import yang sedang berjalan untuk berhenti (transaksi di-rollback)."""
+        if self.import_running and cancel_job(self.import_job_id):
+            self.import_cancel_requested = True
 
-        self.load_entries()
-        self.refresh_area_chart()
-        self.refresh_pie_chart()
-        return rx.toast.info("CSV data has been imported successfully.", position="bottom-right")  
+    def clear_import_status(self):
+        """Tutup panel ringkasan import."""
+        if not self.import_running:
+            self.import_status = ""
+            self.import_summary = ""
+            self.import_errors = []
 
     def download_table_data(self) -> None:
         """Generate and download table data as CSV for current month."""
-        # Create string buffer
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        headers = [
-            'Nama', 'NIP', 'Arisan', 'Iuran DW', 
-            'Simpanan Wajib Koperasi', 'Belanja Koperasi', 'Simpanan Pokok', 
-            'Kredit Khusus', 'Kredit Barang', 'Total Potongan', 'Date', 'Status', 'Type'
-        ]
-        writer.writerow(headers)
-        
-        # Write data rows
-        for entry in self.entries:      
-            total_potongan = (
-                (entry.arisan or 0) +
-                (entry.iuran_dw or 0) +
-                (entry.simpanan_wajib_koperasi or 0) +
-                (entry.belanja_koperasi or 0) +
-                (entry.simpanan_pokok or 0) +
-                (entry.kredit_khusus or 0) +
-                (entry.kredit_barang or 0)
-            )
-            total_potongan = total_potongan if total_potongan != 0 else ''
-            row = [
-                entry.name,
-                entry.nip,
-                entry.arisan or '',
-                entry.iuran_dw or '',
-                entry.simpanan_wajib_koperasi or '',
-                entry.belanja_koperasi or '',
-                entry.simpanan_pokok or '',
-                entry.kredit_khusus or '',
-                entry.kredit_barang or '',
-                total_potongan,
-                entry.date,
-                entry.status,
-                entry.payment_type
-            ]
-            writer.writerow(row)
-        
-        # Get the CSV data
-        csv_data = output.getvalue()
-        output.close()
-        
         # Generate filename with current month and year
         filename = f"employee_deductions_{self.current_month.strftime('%B_%Y')}.csv"
-        
-        return rx.download(
-            data=csv_data,
-            filename=filename,
-        )
+        return self._stream_download("table", filename, **self._table_export_params())
 
     def download_all_deduction_slips(self):
         """Generate and download deduction slips for all employees."""
-        # Create string buffer
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
         month_name = calendar.month_name[self.current_month.month]
-        year = self.current_month.year
-        
-        for entry in self.entries:
-            # Write title
-            writer.writerow([])  # Empty row for spacing
-            writer.writerow([f'DAFTAR POTONGAN KOPERASI DAN LAIN-LAIN BULAN {month_name.upper()} {year}'])
-            writer.writerow([])
-            
-            # Write employee info
-            writer.writerow([f'Nama         :', entry.name])
-            writer.writerow([f'Potongan   :'])
-            
-            # Define deductions and write them
-            total_amount = 0
-            deductions = [
-                ('Arisan', entry.arisan),
-                ('Iuran DW', entry.iuran_dw),
-                ('Simpanan Wajib Koperasi', entry.simpanan_wajib_koperasi),
-                ('Belanja Koperasi', entry.belanja_koperasi),
-                ('Simpanan Pokok', entry.simpanan_pokok),
-                ('Kredit Khusus', entry.kredit_khusus),
-                ('Kredit Barang', entry.kredit_barang),
-            ]
-            
-            # Write deductions that have values
-            for deduction_name, amount in deductions:
-                writer.writerow(['', deduction_name, f'{amount:,.0f}'.replace(',', '.')] if amount else ['', deduction_name, ''])
-                if amount:
-                    total_amount += amount
-            
-            writer.writerow(['', 'Total Potongan', f'{total_amount:,.0f}'.replace(',', '.')])
-            writer.writerow([])  # Empty row for spacing
-        
-        # Get the CSV data
-        csv_data = output.getvalue()
-        output.close()
-        
-        # Generate filename
-        filename = f"all_deduction_slips_{month_name}_{year}.csv"
-        
-        return rx.download(
-            data=csv_data,
-            filename=filename,
-        )
+        filename = f"all_deduction_slips_{month_name}_{self.current_month.year}.csv"
+        return self._stream_download("slips", filename, **self._table_export_params())
 
     def download_deduction_slip(self, entry: EmployeeDeductionEntry):
         """Generate and download deduction slip for an employee."""
-        # Create string buffer
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write title
         month_name = calendar.month_name[self.current_month.month]
         year = self.current_month.year
-        writer.writerow([])  # Empty row for spacing
-        writer.writerow([f'DAFTAR POTONGAN KOPERASI DAN LAIN-LAIN BULAN {month_name.upper()} {year}'])
-        writer.writerow([])
-        
-        # Write employee info
-        writer.writerow([f'Nama         :', entry.name])
-        writer.writerow([f'Potongan   :'])
-        
-        # Define deductions and write them
-        total_amount = 0
-        deductions = [
-            ('Arisan', entry.arisan),
-            ('Iuran DW', entry.iuran_dw),
-            ('Simpanan Wajib Koperasi', entry.simpanan_wajib_koperasi),
-            ('Belanja Koperasi', entry.belanja_koperasi),
-            ('Simpanan Pokok', entry.simpanan_pokok),
-            ('Kredit Khusus', entry.kredit_khusus),
-            ('Kredit Barang', entry.kredit_barang),
-        ]
-        
-        # Write deductions that have values
-        for deduction_name, amount in deductions:
-            writer.writerow(['', deduction_name, f'{amount:,.0f}'.replace(',', '.')] if amount else ['', deduction_name, ''])
-            if amount:
-                total_amount += amount
-        
-        writer.writerow(['', 'Total Potongan', f'{total_amount:,.0f}'.replace(',', '.')])
-        writer.writerow([]) 
-        
-        # Get the CSV data
-        csv_data = output.getvalue()
-        output.close()
-        
+        amounts = {name: entry.amounts.get(name) for name in load_catalog().names}
+        csv_data = "".join(csv_chunks(slip_block(entry.name, amounts, self.current_month.month, year)))
+
         # Generate filename
         filename = f"deduction_slip_{entry.name.replace(' ', '_')}_{month_name}_{year}.csv"
         
@@ -828,11 +661,28 @@ class State(rx.State):
         """Pindah ke bulan berikutnya."""
         self.current_month = (self.current_month.replace(day=1) + timedelta(days=32)).replace(day=1)
         self.load_entries()
+        return State.prefetch_adjacent_months
 
     def prev_month(self):
         """Pindah ke bulan sebelumnya."""
         self.current_month = (self.current_month.replace(day=1) - timedelta(days=1)).replace(day=1)
-        self.load_entries()    
+        self.load_entries()
+        return State.prefetch_adjacent_months
+
+    @rx.event(background=True)
+    async def prefetch_adjacent_months(self):
+        """Hangatkan cache pivot tabel dan kartu statistik bulan sesudah/sebelum bulan aktif.
+
+        Berjalan di thread pool setelah bulan aktif tampil; hasilnya hanya
+        masuk cache, state tidak diubah.
+        """
+        async with self:
+            year, month = self.current_month.year, self.current_month.month
+        for period in adjacent_periods(year, month):
+            try:
+                await run_blocking(prefetch_month, *period)
+            except Exception as e:
+                print(f"Error prefetching {period[0]}-{period[1]:02d}: {e}")
         
     @rx.var(cache=True)
     def formatted_month(self) -> str:
@@ -845,196 +695,382 @@ class State(rx.State):
         if hasattr(self.current_entry, field_name):
             setattr(self.current_entry, field_name, value)
             
-    def load_entries(self) -> None:
+    def _fetch_entries(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        columns: List[str] | None = None,
+        employee_id: int | None = None,
+    ) -> List[EmployeeDeductionEntry]:
+        """Ambil baris pivot bulan aktif; pencarian, sorting dan paging dikerjakan di SQL.
+
+        ``columns`` membatasi jenis potongan yang dipivot (None berarti semua);
+        ``employee_id`` membatasi ke satu pegawai.
+        """
+        query, params, deductions = entries_query(
+            load_catalog(),
+            self.current_month.month,
+            self.current_month.year,
+            search_value=self.search_value,
+            sort_value=self.sort_value,
+            sort_reverse=self.sort_reverse,
+            limit=limit,
+            offset=offset,
+            columns=columns,
+            employee_id=employee_id,
+        )
         with rx.session() as session:
-            query = """
-                SELECT 
-                    e.id,
-                    e.name,
-                    e.nip,
-                    MAX(CASE WHEN d.name = 'Arisan' THEN ed.amount END) AS arisan,
-                    MAX(CASE WHEN d.name = 'Iuran DW' THEN ed.amount END) AS iuran_dw,
-                    MAX(CASE WHEN d.name = 'Simpanan Wajib Koperasi' THEN ed.amount END) AS simpanan_wajib_koperasi,
-                    MAX(CASE WHEN d.name = 'Belanja Koperasi' THEN ed.amount END) AS belanja_koperasi,
-                    MAX(CASE WHEN d.name = 'Simpanan Pokok' THEN ed.amount END) AS simpanan_pokok,
-                    MAX(CASE WHEN d.name = 'Kredit Khusus' THEN ed.amount END) AS kredit_khusus,
-                    MAX(CASE WHEN d.name = 'Kredit Barang' THEN ed.amount END) AS kredit_barang,
-                    MAX(ed.updated_at) AS date,
-                    MAX(ed.payment_status) AS status,
-                    MAX(ed.payment_type) AS payment_type
-                FROM employees e
-                LEFT JOIN employee_deductions ed ON ed.employee_id = e.id 
-                    AND ed.month = :month 
-                    AND ed.year = :year
-                LEFT JOIN deductions d ON ed.deduction_id = d.id
-                GROUP BY e.id, e.name, e.nip
-            """
-            
-            try:
-                result = session.execute(
-                    text(query), 
-                    {
-                        "month": self.current_month.month,
-                        "year": self.current_month.year
-                    }
-                )
-                entries = []
-                for row in result:
-                    try:
-                        total_potongan = (
-                            (row[3] or 0) +
-                            (row[4] or 0) +
-                            (row[5] or 0) +
-                            (row[6] or 0) +
-                            (row[7] or 0) +
-                            (row[8] or 0) +
-                            (row[9] or 0)
-                        )
-                        total_potongan = total_potongan if total_potongan != 0 else None
-                        row_dict = {
-                            "id": row[0],
-                            "name": row[1],
-                            "nip": row[2],
-                            "arisan": row[3] if row[3] is not None else None,
-                            "iuran_dw": row[4] if row[4] is not None else None,
-                            "simpanan_wajib_koperasi": row[5] if row[5] is not None else None,
-                            "belanja_koperasi": row[6] if row[6] is not None else None,
-                            "simpanan_pokok": row[7] if row[7] is not None else None,
-                            "kredit_khusus": row[8] if row[8] is not None else None,
-                            "kredit_barang": row[9] if row[9] is not None else None,
-                            "total_potongan": total_potongan,
-                            "date": str(row[10] or ""),
-                            "status": str(row[11] or ""),
-                            "payment_type": str(row[12] or "")
-                        }
-                        entry = EmployeeDeductionEntry(**row_dict)
-                        entries.append(entry)
-                    except Exception as e:
-                        print(f"Error creating entry object: {e}")
-                        continue
-
-                # Terapkan pencarian jika ada
-                if self.search_value:
-                    search_lower = self.search_value.lower()
-                    entries = [
-                        r for r in entries
-                        if search_lower in r.name.lower() or search_lower in r.nip.lower()
-                    ]
-
-                # Terapkan sorting jika ada
-                if self.sort_value:
-                    entries.sort(
-                        key=lambda r: getattr(r, self.sort_value) or "",
-                        reverse=self.sort_reverse
-                    )
+            rows = session.execute(text(query), params).mappings().all()
+        return rows_to_entries(rows, deductions)
+
+    def _table_query(self) -> TableQuery:
+        """Salinan parameter tabel aktif untuk fungsi di ``dashboard``."""
+        return TableQuery(
+            year=self.current_month.year,
+            month=self.current_month.month,
+            search_value=self.search_value,
+            sort_value=self.sort_value,
+            sort_reverse=self.sort_reverse,
+            limit=self.limit,
+        )
 
-                self.entries = entries
-                print(f"Successfully loaded {len(entries)} entries")
-                
-            except Exception as e:
-                print(f"Error in load_entries: {e}")
-                self.entries = []
-
-            # Update nilai agregat
-            self.get_current_month_values()
-            self.get_previous_month_values()
-            # Update Chart
-            self.refresh_area_chart()
-            self.refresh_pie_chart()
+    def _fetch_page(self, cursor: list | None = None, mode: str = CURSOR_AFTER) -> List[EmployeeDeductionEntry]:
+        """Ambil satu halaman (keyset) dan simpan kursor baris pertama/terakhirnya."""
+        entries, first_cursor, last_cursor = fetch_page(self._table_query(), cursor, mode)
+        if first_cursor is not None:
+            self._first_cursor, self._last_cursor = first_cursor, last_cursor
+        return entries
+
+    def _show_page(self, entries: List[EmployeeDeductionEntry], page: int) -> None:
+        self.current_page_entries = entries
+        self.offset = (page - 1) * self.limit
+        self._log_table_payload()
+
+    def _apply_table(self, table: TablePage) -> None:
+        """Pasang halaman hasil ``goto_page``/``load_table`` ke state."""
+        self.total_entries = table.total
+        if table.first_cursor is not None:
+            self._first_cursor, self._last_cursor = table.first_cursor, table.last_cursor
+        self._show_page(table.entries, table.page)
+
+    def _goto_page(self, page: int) -> None:
+        """Muat halaman ke-``page``; halaman selain pertama dimulai dari kursor di indeks batas halaman."""
+        self._apply_table(goto_page(self._table_query(), page, self.total_entries))
+
+    def _load_page(self) -> None:
+        """Muat ulang halaman aktif mulai dari kursor baris pertamanya."""
+        if self.page_number == 1 or self._first_cursor is None:
+            self._goto_page(self.page_number)
+            return
+        try:
+            entries = self._fetch_page(self._first_cursor, CURSOR_FROM)
+        except Exception as e:
+            print(f"Error in _load_page: {e}")
+            entries = []
+        self._show_page(entries, self.page_number)
+
+    def _log_table_payload(self) -> None:
+        """Catat ukuran payload tabel yang dikirim ke browser."""
+        page_bytes = len(format.json_dumps(self.current_page_entries))
+        self._table_payload_bytes = page_bytes
+        print(
+            f"Table payload: {page_bytes:,} bytes sent to client "
+            f"({len(self.current_page_entries)} of {self.total_entries} rows)"
+        )
+
+    def _reload_table(self) -> None:
+        """Jalankan ulang query tabel saja (tanpa statistik dan chart)."""
+        # Kursor lama tidak berlaku untuk periode/pencarian/urutan baru; nomor halaman dipertahankan
+        self._apply_table(load_table(self._table_query(), self.page_number))
+        print(f"Successfully loaded {len(self.current_page_entries)} of {self.total_entries} entries")
+
+    def load_entries(self) -> None:
+        """Muat tabel, nilai agregat dan chart untuk tampilan aktif."""
+        self._apply_dashboard(load_dashboard(*self._dashboard_params()))
      
-    def get_current_month_values(self):
-        """Contoh perhitungan agregat untuk bulan ini."""
-        now = datetime.now()
-        start_of_month = datetime(now.year, now.month, 1)
-        # Asumsikan kolom 'date' dalam format "%Y-%m-%d %H:%M:%S"
-        current_entries = [
-            entry for entry in self.entries
-            if entry.date and datetime.strptime(entry.date, "%Y-%m-%d %H:%M:%S") >= start_of_month
-        ]
-        num_entries = len(current_entries)
-        total = sum(
-            (entry.arisan or 0) +
-            (entry.iuran_dw or 0) +
-            (entry.simpanan_wajib_koperasi or 0) +
-            (entry.belanja_koperasi or 0) +
-            (entry.simpanan_pokok or 0) +
-            (entry.kredit_khusus or 0) +
-            (entry.kredit_barang or 0)
-            for entry in current_entries
+    def _load_month_stats(self) -> None:
+        """Kartu statistik periode aktif dari satu query agregat (di-cache per periode dan versi data).
+
+        Pegawai dihitung di "bulan ini" jika data periodenya terakhir diubah
+        pada bulan kalender berjalan, dan di "bulan lalu" jika pada bulan
+        kalender sebelumnya.
+        """
+        self._apply_month_stats(*month_stats(self.current_month.year, self.current_month.month))
+
+    def _apply_month_stats(self, values: tuple, version: int) -> None:
+        current_entries, current_total, previous_entries, previous_total = values
+        self._month_stats_version = version
+        self.current_month_values = MonthValues(num_entries=current_entries, total_payments=current_total)
+        self.previous_month_values = MonthValues(num_entries=previous_entries, total_payments=previous_total)
+
+    def _dashboard_params(self) -> tuple:
+        """Parameter ``load_dashboard`` untuk tampilan aktif; dibaca di dalam ``async with self``."""
+        return self._table_query(), self.page_number, self.timeframe
+
+    async def _refresh_dashboard(self, query: TableQuery, page: int, timeframe: str) -> None:
+        """Muat ulang tabel, statistik dan chart dari event latar belakang.
+
+        Query berjalan di thread pool tanpa memegang lock state; lock hanya
+        diambil untuk memasang hasilnya.
+        """
+        dashboard = await run_blocking(load_dashboard, query, page, timeframe)
+        async with self:
+            self._apply_dashboard(dashboard)
+
+    def _apply_dashboard(self, dashboard: Dashboard) -> None:
+        """Pasang hasil ``load_dashboard`` ke state tanpa query.
+
+        Bagian yang parameternya sudah berubah (pindah bulan, pencarian,
+        timeframe) atau sudah diperbarui dari versi data yang lebih baru
+        selama query berjalan dilewati.
+        """
+        self._sync_catalog()
+        if dashboard.query == self._table_query():
+            self._apply_table(dashboard.table)
+            if dashboard.month_stats_version >= self._month_stats_version:
+                self._apply_month_stats(dashboard.month_stats, dashboard.month_stats_version)
+        if dashboard.area_chart is not None and not (
+            self._area_chart_version >= dashboard.version and self.area_chart_data
+        ):
+            self.area_chart_data = dashboard.area_chart
+            self._area_chart_version = dashboard.version
+        if dashboard.timeframe == self.timeframe:
+            self.payment_status_data = dashboard.payment_status
+
+    def _matches_search(self, name: str, nip: str) -> bool:
+        """Sama dengan filter pencarian di SQL (substring nama/NIP, case-insensitive)."""
+        search = search_term(self.search_value)
+        return not search or search in fold_case(name) or search in fold_case(nip)
+
+    def _entry_from_form(
+        self, employee_id: int, form_data: dict, amounts: Dict[str, int | None], updated_at: str
+    ) -> EmployeeDeductionEntry:
+        """Baris pivot pegawai sesudah add/update, dibentuk dari nilai yang baru ditulis (tanpa query).
+
+        Semua baris potongan pegawai di periode ini ditulis dengan status, type
+        dan ``updated_at`` yang sama, jadi MAX(...) di pivot sama dengan nilai form.
+        """
+        total = sum(amount for amount in amounts.values() if amount)
+        return EmployeeDeductionEntry(
+            id=employee_id,
+            name=form_data.get("name"),
+            nip=form_data.get("nip"),
+            amounts={name: amounts.get(name) for name in load_catalog().names},
+            total_potongan=total or None,  # NULLIF(SUM(amount), 0)
+            date=updated_at if amounts else "",
+            status=str(form_data.get("status") or "") if amounts else "",
+            payment_type=str(form_data.get("payment_type") or "") if amounts else "",
         )
-        self.current_month_values = MonthValues(num_entries=num_entries, total_payments=total)
 
-    def get_previous_month_values(self):
-        """Contoh perhitungan agregat untuk bulan sebelumnya."""
-        now = datetime.now()
-        first_day_of_current_month = datetime(now.year, now.month, 1)
-        last_day_previous = first_day_of_current_month - timedelta(days=1)
-        start_of_previous = datetime(last_day_previous.year, last_day_previous.month, 1)
-        previous_entries = [
-            entry for entry in self.entries
-            if entry.date and start_of_previous <= datetime.strptime(entry.date, "%Y-%m-%d %H:%M:%S") <= last_day_previous
-        ]
-        num_entries = len(previous_entries)
-        total = sum(
-            (entry.arisan or 0) +
-            (entry.iuran_dw or 0) +
-            (entry.simpanan_wajib_koperasi or 0) +
-            (entry.belanja_koperasi or 0) +
-            (entry.simpanan_pokok or 0) +
-            (entry.kredit_khusus or 0) +
-            (entry.kredit_barang or 0)
-            for entry in previous_entries
+    def _patch_entry(
+        self,
+        version: int,
+        employee_id: int,
+        matched_before: bool,
+        new: EmployeeDeductionEntry | None,
+        added: bool = False,
+    ) -> Dict[str, Any] | None:
+        """Perbarui satu pegawai di tabel dan statistik tanpa memuat ulang seluruh bulan.
+
+        Tidak ada query untuk baris itu sendiri: ``new`` dibentuk pemanggil
+        dari nilai yang ditulis. Baris di halaman aktif diganti di tempat;
+        urutan tidak disusun ulang sampai tabel dimuat ulang. Kartu statistik
+        digeser dengan kontribusi lama/baru pegawai (lihat ``_patch_month_stats``).
+
+        Args:
+            version: Versi data hasil ``bump_data_version()`` untuk perubahan ini.
+            employee_id: Pegawai yang berubah.
+            matched_before: Pegawai cocok dengan pencarian aktif sebelum perubahan.
+            new: Baris pivot pegawai sesudah perubahan; None jika pegawai dihapus.
+            added: Pegawai baru (belum punya baris sebelum perubahan).
+
+        Returns:
+            Nominal per potongan sebelum perubahan untuk patch chart, atau None
+            jika baris tidak ada di halaman aktif (nominal lama tidak diketahui).
+        """
+        page_index = next(
+            (i for i, entry in enumerate(self.current_page_entries) if entry.id == employee_id), None
         )
-        self.previous_month_values = MonthValues(num_entries=num_entries, total_payments=total)
-                
+        old = self.current_page_entries[page_index] if page_index is not None else None
+        visible = new if new is not None and self._matches_search(new.name, new.nip) else None
+        self.total_entries += (visible is not None) - matched_before
+
+        if page_index is not None and visible is not None:
+            self.current_page_entries[page_index] = visible
+        elif page_index is not None:
+            # Baris hilang dari halaman (dihapus / tidak cocok lagi dengan pencarian)
+            self.current_page_entries.pop(page_index)
+            if self.offset >= self.total_entries > 0:
+                self._goto_page(self.page_number - 1)
+            elif self.offset + len(self.current_page_entries) < self.total_entries:
+                self._load_page()
+        elif visible is not None and not matched_before:
+            # Pegawai baru: dengan urutan default (id) baris baru ada di akhir tabel
+            on_last_page = self.offset + len(self.current_page_entries) == self.total_entries - 1
+            if not self.sort_value and on_last_page and len(self.current_page_entries) < self.limit:
+                self.current_page_entries.append(visible)
+                self._last_cursor = [None, visible.id]
+
+        if self._month_stats_version == version - 1 and (old is not None or added):
+            self._patch_month_stats(old, new)
+            self._month_stats_version = version
+        else:
+            # Kontribusi lama tidak diketahui, atau statistik sudah usang: baca ulang
+            self._load_month_stats()
+        return dict(old.amounts) if old is not None else None
+
+    def _patch_month_stats(self, old: EmployeeDeductionEntry | None, new: EmployeeDeductionEntry | None) -> None:
+        """Geser kartu statistik dengan kontribusi lama/baru satu pegawai, sama seperti ``MONTH_STATS_SQL``.
+
+        Pegawai masuk "bulan ini"/"bulan lalu" menurut MAX(updated_at) barisnya
+        (kolom ``date`` pivot) dan menyumbang total potongannya; pegawai tanpa
+        baris di periode ini (``date`` kosong) tidak dihitung.
+        """
+        params = month_stats_params(self.current_month.year, self.current_month.month)
+        current = [self.current_month_values.num_entries, self.current_month_values.total_payments]
+        previous = [self.previous_month_values.num_entries, self.previous_month_values.total_payments]
+        for entry, sign in ((old, -1), (new, 1)):
+            if entry is None or not entry.date:
+                continue
+            if entry.date >= params["current_start"]:
+                bucket = current
+            elif entry.date >= params["previous_start"]:
+                bucket = previous
+            else:
+                continue
+            bucket[0] += sign
+            bucket[1] += sign * (entry.total_potongan or 0)
+        self.current_month_values = MonthValues(num_entries=current[0], total_payments=current[1])
+        self.previous_month_values = MonthValues(num_entries=previous[0], total_payments=previous[1])
+
+    def _patch_charts(
+        self,
+        version: int,
+        periods: List[tuple],
+        old_amounts: Dict[str, Any] | None = None,
+        new_amounts: Dict[str, Any] | None = None,
+        status_changed: bool = True,
+    ) -> bool:
+        """Perbarui chart hanya jika periode yang berubah tampil di chart.
+
+        Area chart (12 bulan terakhir) di-patch dengan selisih nominal jika
+        nominal lama/baru diketahui dan seri yang tampil masih dari versi data
+        tepat sebelum perubahan ini; selain itu seri dihitung ulang dari rollup.
+
+        Args:
+            version: Versi data hasil ``bump_data_version()`` untuk perubahan ini.
+            periods: Periode (tahun, bulan) yang berubah.
+            old_amounts: Nominal per potongan sebelum perubahan, jika diketahui.
+            new_amounts: Nominal per potongan sesudah perubahan, jika diketahui.
+            status_changed: Jumlah pegawai per status pembayaran berubah (pegawai
+                baru/dihapus atau status diganti); jika False pie chart tidak disentuh.
+
+        Returns:
+            True jika pie chart dihitung ulang (timeframe lain perlu di-prefetch).
+        """
+        now = datetime.now()
+        month_index = now.year * 12 + now.month - 1
+        window = {((month_index - i) // 12, (month_index - i) % 12 + 1) for i in range(12)}
+        changed = [tuple(period) for period in periods if tuple(period) in window]
+        fresh = self._area_chart_version == version - 1
+        if changed:
+            index = None
+            if fresh and len(changed) == 1 and old_amounts is not None and new_amounts is not None:
+                year, month = changed[0]
+                index = next(
+                    (i for i, row in enumerate(self.area_chart_data) if row["month"] == f"{month}-{year}"), None
+                )
+            if index is not None:
+                row = dict(self.area_chart_data[index])
+                for name in self.deduction_names:
+                    row[name] = (row.get(name) or 0) + (new_amounts.get(name) or 0) - (old_amounts.get(name) or 0)
+                self.area_chart_data[index] = row
+                self._area_chart_version = version
+            else:
+                self.refresh_area_chart()
+        elif fresh:
+            self._area_chart_version = version
+
+        # Pie chart Monthly dan Yearly sama-sama membaca periode tahun ini
+        if status_changed and any(tuple(period)[0] == now.year for period in periods):
+            self.payment_status_data = self.get_payment_status_data(self.timeframe)
+            return True
+        return False
+
+    def _edit_events(self, toast, pie_refreshed: bool) -> list:
+        """Event balasan add/update/delete: toast, plus prefetch pie timeframe lain jika pie berubah."""
+        return [toast, State.prefetch_payment_status] if pie_refreshed else [toast]
+
     def sort_values(self, sort_value: str):
         self.sort_value = sort_value
+        self.offset = 0
         self.load_entries()
 
     def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
+        self.offset = 0
         self.load_entries()
 
     def filter_values(self, search_value: str):
+        """Simpan input pencarian lalu jadwalkan query tabel yang di-debounce."""
         self.search_value = search_value
-        self.load_entries()
+        self.offset = 0
+        self._search_seq += 1
+        return State.run_search(self._search_seq)
+
+    @rx.event(background=True)
+    async def run_search(self, seq: int):
+        """Jalankan query tabel hanya untuk input pencarian terbaru.
+
+        Input yang datang selama jeda debounce menaikkan ``_search_seq`` sehingga
+        query untuk input lama dibuang. Statistik dan chart tidak ikut dihitung ulang.
+        """
+        await asyncio.sleep(SEARCH_DEBOUNCE_SECONDS)
+        async with self:
+            if seq != self._search_seq:
+                return  # sudah digantikan input yang lebih baru
+            query, page = self._table_query(), self.page_number
+        # Query berjalan tanpa memegang lock state: event lain (ketikan baru, navigasi) tetap dilayani
+        table = await run_blocking(load_table, query, page)
+        async with self:
+            if seq != self._search_seq:
+                return  # input baru datang selama query berjalan; hasil ini sudah basi
+            self._apply_table(table)
+        print(f"Successfully loaded {len(table.entries)} of {table.total} entries")
 
     def get_entry(self, entry: EmployeeDeductionEntry):
         print("Current entry:", entry.__dict__) 
         self.current_entry = entry
 
+    def _form_deductions(self, form_data: dict) -> Dict[str, int | None]:
+        """Nominal per nama potongan dari form; field kosong menjadi None."""
+        return {name: self.parse_int(form_data.get(name)) for name in load_catalog().names}
+
     def add_employee_entry(self, form_data: dict):
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         current_month = self.current_month.month
         current_year = self.current_month.year
         with rx.session() as session:
-            # Buat record pegawai baru
+            # Buat record pegawai baru (flush untuk id; satu transaksi dengan potongannya)
             employee = Employee(name=form_data.get("name"), nip=form_data.get("nip"))
             session.add(employee)
-            session.commit()
-            session.refresh(employee)
+            session.flush()
+            employee_id = employee.id
             employee_name = employee.name
-            
-            # Daftar deduction dan nilai dari form_data
-            deductions_values = {
-                "Arisan": int(form_data.get("arisan")) if form_data.get("arisan") else None,
-                "Iuran DW": int(form_data.get("iuran_dw")) if form_data.get("iuran_dw") else None,
-                "Simpanan Wajib Koperasi": int(form_data.get("simpanan_wajib_koperasi")) if form_data.get("simpanan_wajib_koperasi") else None,
-                "Belanja Koperasi": int(form_data.get("belanja_koperasi")) if form_data.get("belanja_koperasi") else None,
-                "Simpanan Pokok": int(form_data.get("simpanan_pokok")) if form_data.get("simpanan_pokok") else None,
-                "Kredit Khusus": int(form_data.get("kredit_khusus")) if form_data.get("kredit_khusus") else None,
-                "Kredit Barang": int(form_data.get("kredit_barang")) if form_data.get("kredit_barang") else None,
-            }
+
+            # Daftar deduction dan nilai dari form_data (nama field = nama potongan)
+            deductions_values = self._form_deductions(form_data)
+            deduction_ids = reference_cache.deduction_ids(session)
+            delta = RollupDelta()
+            written: Dict[str, int | None] = {}
             for deduction_name, amount in deductions_values.items():
-                # Dapatkan record deduction berdasarkan nama
-                ded = session.exec(
-                    select(Deduction).where(Deduction.name == deduction_name)
-                ).first()
-                if not ded:
+                # Dapatkan id deduction berdasarkan nama
+                deduction_id = deduction_ids.get(deduction_name)
+                if deduction_id is None:
                     continue  # atau bisa tambahkan log/error jika record tidak ditemukan
                 ed = EmployeeDeduction(
-                    employee_id=employee.id,
-                    deduction_id=ded.id,
+                    employee_id=employee_id,
+                    deduction_id=deduction_id,
                     amount = int(amount) if amount else None,
                     payment_status=form_data.get("status"),
                     payment_type=form_data.get("payment_type"),
@@ -1044,70 +1080,86 @@ class State(rx.State):
                     updated_at=now_str,
                 )
                 session.add(ed)
+                written[deduction_name] = ed.amount
+                delta.add(current_year, current_month, deduction_id, ed.payment_status, ed.amount)
+            session.flush()
+            delta.apply(session)
+            forget_imports(session, employee_id, [(current_year, current_month)])
+            # Pegawai baru muncul di tabel setiap bulan
+            version = bump_data_version(session)
             session.commit()
-        self.load_entries()
-        self.refresh_area_chart()
-        self.refresh_pie_chart()
-        return rx.toast.info(f"Entry for {employee_name} has been added for {self.formatted_month}.", position="bottom-right")
+        self._patch_entry(
+            version, employee_id, matched_before=False,
+            new=self._entry_from_form(employee_id, form_data, written, now_str), added=True,
+        )
+        pie_refreshed = self._patch_charts(
+            version, [(current_year, current_month)], {}, deductions_values, status_changed=bool(written)
+        )
+        return self._edit_events(
+            rx.toast.info(f"Entry for {employee_name} has been added for {self.formatted_month}.", position="bottom-right"),
+            pie_refreshed,
+        )
 
     def update_employee_entry(self, form_data: dict):
         """
         Memperbarui data entry yang sudah ada.
         form_data diharapkan memiliki kunci:
-        name, nip, arisan, denda_arisan, iuran_dw, simpanan_wajib_koperasi,
-        belanja_koperasi, simpanan_pokok, kredit_khusus, kredit_barang, status, payment_type
+        name, nip, status, payment_type, dan satu kunci per nama potongan di katalog
         """
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         current_month = self.current_month.month
         current_year = self.current_month.year
+        status = form_data.get("status")
         with rx.session() as session:
             # Perbarui data pegawai
             employee = session.exec(
                 select(Employee).where(Employee.id == self.current_entry.id)
             ).first()
+            employee_id = employee.id
+            matched_before = self._matches_search(employee.name, employee.nip)
+            renamed = (employee.name, employee.nip) != (form_data.get("name"), form_data.get("nip"))
             employee.name = form_data.get("name")
             employee.nip = form_data.get("nip")
             session.add(employee)
-            session.commit()
             employee_name = str(employee.name)
 
             # Perbarui tiap record potongan untuk periode (bulan & tahun) saat ini
-            deductions_values = {
-            "Arisan": int(form_data.get("arisan")) if form_data.get("arisan") else None,
-            "Iuran DW": int(form_data.get("iuran_dw")) if form_data.get("iuran_dw") else None,
-            "Simpanan Wajib Koperasi": int(form_data.get("simpanan_wajib_koperasi")) if form_data.get("simpanan_wajib_koperasi") else None,
-            "Belanja Koperasi": int(form_data.get("belanja_koperasi")) if form_data.get("belanja_koperasi") else None,
-            "Simpanan Pokok": int(form_data.get("simpanan_pokok")) if form_data.get("simpanan_pokok") else None,
-            "Kredit Khusus": int(form_data.get("kredit_khusus")) if form_data.get("kredit_khusus") else None,
-            "Kredit Barang": int(form_data.get("kredit_barang")) if form_data.get("kredit_barang") else None,
-            }
-            for deduction_name, amount in deductions_values.items():
-                ded = session.exec(
-                    select(Deduction).where(Deduction.name == deduction_name)
-                ).first()
-                if not ded:
-                    continue
-                # Cari record EmployeeDeduction untuk pegawai ini, deduction ini, dan periode saat ini
-                ed = session.exec(
+            deductions_values = self._form_deductions(form_data)
+            deduction_ids = reference_cache.deduction_ids(session)
+            # Semua record pegawai ini di periode saat ini, dibaca sekaligus (satu query IN)
+            existing = {
+                ed.deduction_id: ed
+                for ed in session.exec(
                     select(EmployeeDeduction).where(
-                        EmployeeDeduction.employee_id == employee.id,
-                        EmployeeDeduction.deduction_id == ded.id,
+                        EmployeeDeduction.employee_id == employee_id,
                         EmployeeDeduction.month == current_month,
-                        EmployeeDeduction.year == current_year
+                        EmployeeDeduction.year == current_year,
+                        EmployeeDeduction.deduction_id.in_(list(deduction_ids.values())),
                     )
-                ).first()
+                ).all()
+            }
+            # Pie chart menghitung pegawai per status: berubah jika status lama berbeda atau pegawai baru punya baris
+            status_changed = any(ed.payment_status != status for ed in existing.values()) or not existing
+            delta = RollupDelta()
+            written: Dict[str, int | None] = {}
+            for deduction_name, amount in deductions_values.items():
+                deduction_id = deduction_ids.get(deduction_name)
+                if deduction_id is None:
+                    continue
+                ed = existing.get(deduction_id)
                 if ed:
+                    delta.remove(current_year, current_month, deduction_id, ed.payment_status, ed.amount)
                     ed.amount = amount
-                    ed.payment_status = form_data.get("status")
+                    ed.payment_status = status
                     ed.payment_type = form_data.get("payment_type")
                     ed.updated_at = now_str
                     session.add(ed)
                 else:
                     new_ed = EmployeeDeduction(
-                        employee_id=employee.id,
-                        deduction_id=ded.id,
+                        employee_id=employee_id,
+                        deduction_id=deduction_id,
                         amount=amount ,
-                        payment_status=form_data.get("status"),
+                        payment_status=status,
                         payment_type=form_data.get("payment_type"),
                         month=current_month,
                         year=current_year,
@@ -1115,22 +1167,51 @@ class State(rx.State):
                         updated_at=now_str,
                     )
                     session.add(new_ed)
+                written[deduction_name] = amount
+                delta.add(current_year, current_month, deduction_id, status, amount)
+            session.flush()
+            delta.apply(session)
+            forget_imports(session, employee_id, [(current_year, current_month)])
+            # Nama/NIP tampil di tabel setiap bulan; nominal hanya berubah di periode ini
+            version = bump_data_version(session, None if renamed else [(current_year, current_month)])
             session.commit()
-        self.load_entries()
-        self.refresh_area_chart()
-        self.refresh_pie_chart()  
-        return rx.toast.info(f"Entry for {employee_name} has been updated for {self.formatted_month}.", position="bottom-right")
+        reference_cache.forget_employee(employee_id)
+        old_amounts = self._patch_entry(
+            version, employee_id, matched_before, new=self._entry_from_form(employee_id, form_data, written, now_str)
+        )
+        pie_refreshed = self._patch_charts(
+            version, [(current_year, current_month)], old_amounts, deductions_values,
+            status_changed=status_changed and bool(written),
+        )
+        return self._edit_events(
+            rx.toast.info(f"Entry for {employee_name} has been updated for {self.formatted_month}.", position="bottom-right"),
+            pie_refreshed,
+        )
 
     def delete_employee(self, id: int):
-        """Menghapus entry pegawai (cascade akan menghapus data potongan terkait)."""
+        """Menghapus entry pegawai beserta data potongannya di semua periode."""
         with rx.session() as session:
             employee = session.exec(select(Employee).where(Employee.id == id)).first()
+            matched_before = self._matches_search(employee.name, employee.nip)
+            delta = RollupDelta()
+            remove_employee_rows(session, id, delta)
+            periods = delta.periods
+            # Tidak ada cascade (SQLite tidak menegakkan FK); baris potongan dihapus di sini
+            session.execute(text("DELETE FROM employee_deductions WHERE employee_id = :id"), {"id": id})
             session.delete(employee)
+            session.flush()
+            delta.apply(session)
+            forget_imports(session, id, periods)
+            version = bump_data_version(session)
             session.commit()
-        self.load_entries()
-        self.refresh_area_chart()
-        self.refresh_pie_chart()
-        return rx.toast.info(f"Entry for {employee.name} has been deleted.", position="bottom-right")
+        reference_cache.forget_employee(id)
+        self._patch_entry(version, id, matched_before, new=None)
+        # Nominal per periode tidak diketahui di sini; periode yang tampil di chart dihitung ulang
+        pie_refreshed = self._patch_charts(version, sorted(periods))
+        return self._edit_events(
+            rx.toast.info(f"Entry for {employee.name} has been deleted.", position="bottom-right"),
+            pie_refreshed,
+        )
 
     # Contoh perhitungan persentase perubahan (bisa disesuaikan jika diperlukan)
     def _get_percentage_change(self, value: Union[int, int], prev_value: Union[int, int]) -> int:
@@ -1161,32 +1242,45 @@ class State(rx.State):
     @rx.var(cache=True)
     def total_pages(self) -> int:
         """Mendapatkan total jumlah halaman."""
-        return (len(self.entries) // self.limit) + (1 if len(self.entries) % self.limit else 0)
-
-    @rx.var(cache=True)
-    def current_page_entries(self) -> List[EmployeeDeductionEntry]:
-        """Mendapatkan entries untuk halaman saat ini."""
-        start = self.offset
-        end = start + self.limit
-        return self.entries[start:end]
+        return (self.total_entries // self.limit) + (1 if self.total_entries % self.limit else 0)
 
     def prev_page(self):
-        """Pindah ke halaman sebelumnya."""
-        if self.page_number > 1:
-            self.offset -= self.limit
+        """Pindah ke halaman sebelumnya (baris sebelum kursor baris pertama halaman aktif)."""
+        if self.page_number <= 1:
+            return
+        page = self.page_number - 1
+        entries = self._fetch_page(self._first_cursor, CURSOR_BEFORE) if self._first_cursor else []
+        if page == 1 or len(entries) < self.limit:
+            # Halaman pertama, atau baris di depan berkurang sejak halaman ini dimuat
+            self._goto_page(page)
+        else:
+            self._show_page(entries, page)
 
     def next_page(self):
-        """Pindah ke halaman berikutnya."""
-        if self.page_number < self.total_pages:
-            self.offset += self.limit
+        """Pindah ke halaman berikutnya (baris setelah kursor baris terakhir halaman aktif)."""
+        if self.page_number >= self.total_pages:
+            return
+        page = self.page_number + 1
+        entries = self._fetch_page(self._last_cursor, CURSOR_AFTER) if self._last_cursor else []
+        if entries:
+            self._show_page(entries, page)
+        else:
+            self._goto_page(page)
 
     def first_page(self):
         """Pindah ke halaman pertama."""
-        self.offset = 0
+        self._goto_page(1)
 
     def last_page(self):
-        """Pindah ke halaman terakhir."""
-        self.offset = (self.total_pages - 1) * self.limit
+        """Pindah ke halaman terakhir (lewat indeks batas halaman, tanpa OFFSET)."""
+        self._goto_page(self.total_pages)
+
+    def jump_to_page(self, value: str):
+        """Lompat ke nomor halaman yang diketik; nilai di luar rentang dibatasi ke halaman pertama/terakhir."""
+        page = self.parse_int(value)
+        if page is None:
+            return
+        self._goto_page(page)
         
     @rx.event
     def reset_table_filters(self):
@@ -0,0 +1,197 @@
+"""Backfill banyak file CSV sekaligus (misalnya riwayat satu tahun di uploaded_files/).
+
+Periode tiap file diambil dari nama file, misalnya
+``employee_deductions_Januari_2024.csv`` atau ``..._February_2025.csv``
+(nama bulan Indonesia maupun Inggris). File di-parse dan dinormalisasi
+secara paralel di beberapa proses (pandas tidak berbagi GIL antar proses),
+lalu setiap periode ditulis dalam satu transaksi. Beberapa file untuk
+periode yang sama diterapkan berurutan menurut nama file, jadi file yang
+terakhir menang untuk NIP yang sama.
+"""
+import multiprocessing
+import os
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+import reflex as rx
+
+from .cache import bump_data_version, reference_cache, sync_versions
+from .fingerprints import file_sha256, imported_file, record_imported_file
+from .importer import ImportReport, NormalizedBatch, load_deduction_ids, normalize_batch, write_batch
+from .jobs import import_dir
+from .rollup import refresh_periods
+
+MONTH_NAMES: Dict[str, int] = {
+    "januari": 1, "january": 1, "jan": 1,
+    "februari": 2, "february": 2, "feb": 2, "pebruari": 2,
+    "maret": 3, "march": 3, "mar": 3,
+    "april": 4, "apr": 4,
+    "mei": 5, "may": 5,
+    "juni": 6, "june": 6, "jun": 6,
+    "juli": 7, "july": 7, "jul": 7,
+    "agustus": 8, "august": 8, "agu": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9,
+    "oktober": 10, "october": 10, "okt": 10, "oct": 10,
+    "november": 11, "nov": 11, "nopember": 11,
+    "desember": 12, "december": 12, "des": 12, "dec": 12,
+}
+_PERIOD_PATTERN = re.compile(r"([A-Za-z]+)[\s_\-.]*(\d{4})")
+
+
+def infer_period(filename: str) -> Tuple[int, int] | None:
+    """Ambil (tahun, bulan) dari nama file; None jika tidak ada nama bulan + tahun."""
+    for word, year in reversed(_PERIOD_PATTERN.findall(Path(filename).name)):
+        month = MONTH_NAMES.get(word.lower())
+        if month is not None:
+            return int(year), month
+    return None
+
+
+def create_backfill_dir() -> Path:
+    """Direktori sementara untuk file yang diunggah dalam satu backfill.
+
+    Nama file asli dipertahankan karena periodenya diambil dari nama file.
+    """
+    path = import_dir() / f"backfill_{uuid.uuid4().hex[:12]}"
+    path.mkdir(parents=True)
+    return path
+
+
+def remove_backfill_dir(path: Path) -> None:
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@dataclass
+class ParsedFile:
+    """Hasil parse satu file di proses pekerja."""
+    path: str
+    period: Tuple[int, int] | None
+    sha256: str = ""
+    batch: NormalizedBatch | None = None
+    report: ImportReport = field(default_factory=ImportReport)
+    error: str = ""
+
+
+@dataclass
+class PeriodResult:
+    """Ringkasan satu periode yang ditulis."""
+    year: int
+    month: int
+    files: List[str]
+    report: ImportReport
+    error: str = ""
+
+    def summary(self) -> str:
+        label = f"{self.year}-{self.month:02d} ({len(self.files)} file)"
+        if self.error:
+            return f"{label}: failed, {self.error}"
+        return f"{label}: {self.report.summary()}"
+
+
+def parse_file(path: str, deduction_names: List[str]) -> ParsedFile:
+    """Baca dan normalisasi satu CSV (dijalankan di proses pekerja)."""
+    parsed = ParsedFile(path=path, period=infer_period(path))
+    if parsed.period is None:
+        parsed.error = "no month name and year in the filename"
+        return parsed
+    try:
+        parsed.sha256 = file_sha256(path)
+        df = pd.read_csv(path, thousands=".", dtype={"NIP": str}, encoding="utf-8-sig")
+        if "NIP" not in df.columns:
+            parsed.error = "CSV file is missing 'NIP' column."
+            return parsed
+        parsed.report.rows = len(df)
+        parsed.batch = normalize_batch(df, 2, parsed.report, deduction_names)
+    except Exception as e:
+        parsed.error = str(e)
+    return parsed
+
+
+def _mp_context():
+    """Context proses worker parse; bukan fork.
+
+    ``parse_files`` dipanggil dari thread worker di server yang multi-thread;
+    proses hasil fork bisa mewarisi lock yang sedang dipegang thread lain dan
+    deadlock. forkserver memulai proses server bersih sekali, memuat modul ini
+    (pandas, reflex) di sana, lalu tiap worker di-fork darinya tanpa import
+    ulang. spawn dipakai jika forkserver tidak tersedia (Windows).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def parse_files(
+    paths: Iterable[str], deduction_names: List[str], max_workers: int | None = None
+) -> List[ParsedFile]:
+    """Parse semua file secara paralel; urutan hasil mengikuti nama file."""
+    paths = sorted(paths, key=lambda path: Path(path).name)
+    if not paths:
+        return []
+    workers = max(1, min(len(paths), max_workers or os.cpu_count() or 1))
+    if workers == 1:
+        return [parse_file(path, deduction_names) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+        return list(pool.map(partial(parse_file, deduction_names=deduction_names), paths))
+
+
+def backfill(paths: Iterable[str], max_workers: int | None = None) -> Tuple[List[PeriodResult], List[ParsedFile]]:
+    """Import banyak file; satu transaksi per periode.
+
+    File yang identik dengan file terakhir yang diimport ke periodenya
+    dilewati; baris yang tidak berubah tidak ditulis (lihat ``write_batch``).
+
+    Returns:
+        Tuple (hasil per periode, file yang dilewati karena error parse/periode).
+    """
+    # Pegawai/katalog yang diubah worker lain tidak boleh dipetakan dari cache lama
+    sync_versions()
+    # Katalog potongan dibaca sekali di proses utama lalu dikirim ke pekerja
+    deduction_names = list(load_deduction_ids())
+    parsed = parse_files(paths, deduction_names, max_workers)
+    skipped = [item for item in parsed if item.error]
+    ready = sorted((item for item in parsed if not item.error), key=lambda item: item.period)
+
+    results: List[PeriodResult] = []
+    with rx.session() as session:
+        deduction_ids = load_deduction_ids(session)
+        for (year, month), items in groupby(ready, key=lambda item: item.period):
+            items = list(items)
+            started = time.perf_counter()
+            report = ImportReport()
+            result = PeriodResult(year, month, [Path(item.path).name for item in items], report)
+            try:
+                for item in items:
+                    name = Path(item.path).name
+                    report.rows += item.report.rows
+                    previous = imported_file(session, year, month)
+                    if previous is not None and previous[0] == item.sha256:
+                        report.unchanged += len(item.batch.frame)
+                        continue
+                    report.error_count += item.report.error_count
+                    report.errors.extend(f"{name}: {error}" for error in item.report.errors)
+                    write_batch(session, item.batch, deduction_ids, month, year, report)
+                    record_imported_file(session, year, month, item.sha256, name, item.report.rows)
+                if report.changed:
+                    refresh_periods(session, [(year, month)])
+                    bump_data_version(session, None if report.employees_created else [(year, month)])
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                if report.employees_created:
+                    reference_cache.invalidate_employees()
+                result.error = str(e)
+            report.elapsed = time.perf_counter() - started
+            results.append(result)
+    return results, skipped
@@ -0,0 +1,403 @@
+"""Cache proses untuk data dashboard yang jarang berubah.
+
+Semua jalur tulis ke ``employee_deductions`` (import, add, update, delete)
+memanggil ``bump_data_version(session, ...)`` di dalam transaksinya, yang
+menaikkan baris di tabel ``data_versions``. Nilai yang di-cache menyimpan
+versi data saat dihitung; pembacaan berikutnya membandingkannya dengan
+versi terbaru. Jalur tulis yang tahu periode mana yang berubah
+meneruskannya, sehingga ``PeriodCache`` hanya membuang periode itu.
+
+Versi disimpan di database, bukan di memori proses, agar aplikasi bisa
+berjalan dengan beberapa proses worker: penulisan di satu worker membuat
+cache di worker lain usang pada pembacaan berikutnya. ``sync_versions``
+(dipanggil oleh ``data_version``/``period_version``) cukup membaca satu
+baris ``data`` lewat primary key; seluruh tabel versi hanya dibaca ulang
+jika nilai itu berubah.
+
+``reference_cache`` menyimpan data referensi yang hampir statis (jenis
+potongan, pegawai per NIP/id). Katalog potongan punya scope versinya sendiri
+(``bump_catalog_version``); pegawai baru/diubah/dihapus selalu menaikkan
+epoch semua periode, jadi cache pegawai dikosongkan saat epoch berubah.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+import reflex as rx
+from sqlalchemy import event, text
+from sqlmodel import select
+
+from ..models import Deduction, Employee
+
+# Batas jumlah parameter per query IN (...) agar aman untuk SQLite
+_IN_CHUNK_SIZE = 500
+
+# Jeda minimum (detik) antar pengecekan versi bersama; penulisan di proses ini terlihat langsung
+VERSION_CHECK_SECONDS = 0.1
+
+# Scope baris di tabel data_versions
+_DATA_SCOPE = "data"
+_EPOCH_SCOPE = "epoch"
+_CATALOG_SCOPE = "deductions"
+_PERIOD_PREFIX = "period:"
+
+_BUMP_SQL = text("""
+    INSERT INTO data_versions (scope, version) VALUES (:scope, 1)
+    ON CONFLICT (scope) DO UPDATE SET version = data_versions.version + 1
+""")
+_DATA_VERSION_SQL = text("SELECT version FROM data_versions WHERE scope = 'data'")
+_ALL_VERSIONS_SQL = text("SELECT scope, version FROM data_versions")
+
+_lock = threading.Lock()
+# Salinan lokal tabel data_versions (diperbarui oleh sync_versions)
+_data_version = 0
+# Versi per periode (tahun, bulan); _period_epoch naik jika perubahan menyentuh semua periode
+_period_versions: Dict[Tuple[int, int], int] = {}
+_period_epoch = 0
+_catalog_version = 0
+_checked_at = float("-inf")
+
+
+def _period_scope(year: int, month: int) -> str:
+    return f"{_PERIOD_PREFIX}{year:04d}-{month:02d}"
+
+
+def sync_versions() -> int:
+    """Samakan versi lokal dengan tabel ``data_versions``; mengembalikan versi data.
+
+    Satu query primary key jika tidak ada penulisan sejak pembacaan terakhir
+    (dari proses mana pun); jika ada, semua versi dibaca ulang dan cache
+    referensi yang scope-nya berubah dikosongkan. Pengecekan dijalankan paling
+    sering sekali per ``VERSION_CHECK_SECONDS``, kecuali setelah commit
+    penulisan di proses ini (lihat ``_bump``).
+    """
+    global _data_version, _period_epoch, _period_versions, _catalog_version, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < VERSION_CHECK_SECONDS:
+        return _data_version
+    _checked_at = now
+    with rx.model.get_engine().connect() as conn:
+        current = conn.execute(_DATA_VERSION_SQL).scalar() or 0
+        if current == _data_version:
+            return current
+        rows = dict(conn.execute(_ALL_VERSIONS_SQL).all())
+
+    periods: Dict[Tuple[int, int], int] = {}
+    for scope, version in rows.items():
+        if scope.startswith(_PERIOD_PREFIX):
+            year, month = scope[len(_PERIOD_PREFIX):].split("-")
+            periods[(int(year), int(month))] = version
+    with _lock:
+        epoch_changed = rows.get(_EPOCH_SCOPE, 0) != _period_epoch
+        catalog_changed = rows.get(_CATALOG_SCOPE, 0) != _catalog_version
+        _data_version = rows.get(_DATA_SCOPE, 0)
+        _period_epoch = rows.get(_EPOCH_SCOPE, 0)
+        _catalog_version = rows.get(_CATALOG_SCOPE, 0)
+        _period_versions = periods
+    if epoch_changed:
+        # Pegawai baru/diubah/dihapus (mungkin oleh worker lain)
+        reference_cache.invalidate_employees()
+    if catalog_changed:
+        reference_cache.invalidate_deductions()
+    return _data_version
+
+
+def data_version() -> int:
+    """Versi data potongan saat ini (naik setiap ada penulisan, dari proses mana pun)."""
+    return sync_versions()
+
+
+def period_version(year: int, month: int) -> Tuple[int, int]:
+    """Versi data satu periode; berubah hanya jika periode itu (atau semua periode) ditulis."""
+    sync_versions()
+    return _period_epoch, _period_versions.get((year, month), 0)
+
+
+def period_versions(periods: Iterable[Tuple[int, int]]) -> Tuple[Tuple[int, int], ...]:
+    """Versi gabungan beberapa periode, untuk nilai yang dibaca dari periode-periode itu."""
+    sync_versions()
+    return tuple((_period_epoch, _period_versions.get((year, month), 0)) for year, month in periods)
+
+
+def _expire_check(session) -> None:
+    global _checked_at
+    _checked_at = float("-inf")
+
+
+def _bump(session, scopes: List[str]) -> int:
+    session.execute(_BUMP_SQL, [{"scope": scope} for scope in [_DATA_SCOPE, *scopes]])
+    # Pembacaan pertama setelah commit di proses ini langsung melihat versi baru
+    event.listen(session, "after_commit", _expire_check, once=True)
+    return session.execute(_DATA_VERSION_SQL).scalar()
+
+
+def bump_data_version(session, periods: Iterable[Tuple[int, int]] | None = None) -> int:
+    """Tandai data potongan berubah; semua cache berbasis versi menjadi usang.
+
+    Dipanggil di dalam transaksi tulis, sebelum commit: versi baru terlihat
+    oleh semua proses tepat saat datanya di-commit, dan ikut di-rollback
+    bersama datanya.
+
+    Args:
+        session: Session transaksi tulis.
+        periods: Periode (tahun, bulan) yang berubah. None berarti semua
+            periode, misalnya pegawai baru/dihapus/diganti nama, karena tabel
+            setiap bulan memuat semua pegawai.
+
+    Returns:
+        Versi data baru (berlaku setelah commit).
+    """
+    if periods is None:
+        return _bump(session, [_EPOCH_SCOPE])
+    return _bump(session, sorted({_period_scope(year, month) for year, month in periods}))
+
+
+def bump_catalog_version(session) -> int:
+    """Tandai katalog jenis potongan berubah (di dalam transaksi tulis, sebelum commit)."""
+    return _bump(session, [_CATALOG_SCOPE])
+
+
+class VersionedCache:
+    """Cache kecil key -> nilai yang otomatis usang saat versi data berubah.
+
+    Secara default nilai bergantung pada ``data_version()``; pemanggil yang
+    tahu periode mana yang dibaca bisa memberi versi sendiri (misalnya
+    ``period_versions(...)``) agar penulisan ke periode lain tidak membuangnya.
+    """
+
+    def __init__(self, name: str, max_entries: int = 32):
+        self.name = name
+        self.max_entries = max_entries
+        self._values: Dict[Hashable, Tuple[Hashable, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Hashable = None) -> Any:
+        """Ambil nilai untuk ``key`` pada versi data saat ini, hitung jika belum ada.
+
+        Args:
+            key: Key cache.
+            compute: Fungsi yang menghitung nilai saat miss.
+            version: Versi data yang dibaca nilai ini; None berarti ``data_version()``.
+        """
+        if version is None:
+            version = data_version()
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            if len(self._values) >= self.max_entries and key not in self._values:
+                self._values.pop(next(iter(self._values)))
+            self._values[key] = (version, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class PeriodCache:
+    """Cache LRU per periode (tahun, bulan) dengan batas jumlah entri dan ukuran memori.
+
+    Nilai disimpan bersama ``period_version`` periodenya, jadi penulisan ke
+    bulan lain tidak membuangnya. Ukuran tiap nilai diberikan pemanggil
+    (perkiraan byte); entri paling lama tidak dipakai dibuang sampai total
+    ukuran di bawah ``max_bytes``.
+    """
+
+    def __init__(self, name: str, max_entries: int = 12, max_bytes: int = 64 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._values: "OrderedDict[Hashable, Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, year: int, month: int, key: Hashable = None) -> Any:
+        """Nilai untuk periode (dan ``key`` tambahan) pada versi periode saat ini, atau None."""
+        version = period_version(year, month)
+        with self._lock:
+            cached = self._values.get((year, month, key))
+            if cached is not None and cached[0] == version:
+                self._values.move_to_end((year, month, key))
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return None
+
+    def put(self, year: int, month: int, key: Hashable, value: Any, nbytes: int, version: Tuple[int, int]) -> bool:
+        """Simpan nilai yang dihitung pada ``version``; False jika lebih besar dari ``max_bytes``."""
+        if nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._values.pop((year, month, key), None)
+            if old is not None:
+                self.nbytes -= old[2]
+            while self._values and (
+                len(self._values) >= self.max_entries or self.nbytes + nbytes > self.max_bytes
+            ):
+                _, (_, _, evicted) = self._values.popitem(last=False)
+                self.nbytes -= evicted
+            self._values[(year, month, key)] = (version, value, nbytes)
+            self.nbytes += nbytes
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._values), "bytes": self.nbytes}
+
+
+# Seri 12 bulan per jenis potongan; dipakai bersama oleh ketujuh chart dan tab switcher
+area_chart_cache = VersionedCache("area_chart")
+# Kartu statistik per (periode tabel, bulan kalender berjalan)
+month_stats_cache = VersionedCache("month_stats")
+# Kursor awal tiap halaman tabel per (periode, pencarian, urutan, ukuran halaman)
+page_boundaries_cache = VersionedCache("page_boundaries", max_entries=16)
+# Pie chart status pembayaran per (timeframe, bulan, tahun); bergantung hanya pada periode yang dibaca
+payment_status_cache = VersionedCache("payment_status", max_entries=8)
+# Nominal 12 bulan per potongan untuk satu (pegawai, tahun) (chart Recap Employees)
+employee_year_cache = VersionedCache("employee_year", max_entries=64)
+# Pivot lengkap tabel potongan per bulan (lihat month_pivot.py)
+month_pivot_cache = PeriodCache("month_pivot")
+
+
+class ReferenceCache:
+    """Cache nama potongan -> id dan pegawai (NIP <-> id, nama) untuk seluruh proses.
+
+    Setiap method menerima ``session`` opsional; jika tidak diberikan, session
+    baru hanya dibuka saat terjadi miss. Pegawai di-cache per key saat
+    dibaca, bukan seluruh tabel sekaligus. NIP yang tidak ditemukan tidak
+    di-cache, jadi pegawai baru langsung terlihat.
+
+    Penulis wajib memanggil ``forget_employee``/``invalidate_*`` setelah
+    commit, dan ``invalidate_employees`` setelah rollback transaksi yang
+    membaca pegawai lewat cache ini (id pegawai yang belum di-commit bisa
+    ikut tersimpan).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deductions: Dict[str, int] | None = None
+        self.deductions_version = 0  # naik setiap katalog potongan di-invalidasi
+        self._by_nip: Dict[str, Tuple[int, str]] = {}
+        self._by_id: Dict[int, Tuple[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _with_session(self, session, fn: Callable[[Any], Any]) -> Any:
+        if session is not None:
+            return fn(session)
+        with rx.session() as new_session:
+            return fn(new_session)
+
+    def deduction_ids(self, session=None) -> Dict[str, int]:
+        """Mapping nama potongan -> id (salinan), urut id."""
+        with self._lock:
+            if self._deductions is not None:
+                self.hits += 1
+                return dict(self._deductions)
+            self.misses += 1
+        rows = self._with_session(session, lambda s: s.exec(select(Deduction.name, Deduction.id).order_by(Deduction.id)).all())
+        deductions = {name: id_ for name, id_ in rows}
+        with self._lock:
+            self._deductions = deductions
+        return dict(deductions)
+
+    def deduction_id(self, name: str, session=None) -> int | None:
+        return self.deduction_ids(session).get(name)
+
+    def employees_by_nip(self, nips: Iterable[str], session=None) -> Dict[str, Tuple[int, str]]:
+        """Mapping NIP -> (id, nama) untuk NIP yang ada di database."""
+        found: Dict[str, Tuple[int, str]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for nip in dict.fromkeys(nips):
+                cached = self._by_nip.get(nip)
+                if cached is not None:
+                    found[nip] = cached
+                else:
+                    missing.append(nip)
+            self.hits += len(found)
+            self.misses += len(missing)
+        if not missing:
+            return found
+
+        def load(s):
+            rows = []
+            for start in range(0, len(missing), _IN_CHUNK_SIZE):
+                chunk = missing[start:start + _IN_CHUNK_SIZE]
+                rows.extend(s.exec(
+                    select(Employee.id, Employee.nip, Employee.name).where(Employee.nip.in_(chunk))
+                ).all())
+            return rows
+
+        rows = self._with_session(session, load)
+        with self._lock:
+            for id_, nip, name in rows:
+                self._by_nip[nip] = (id_, name)
+                self._by_id[id_] = (nip, name)
+                found[nip] = (id_, name)
+        return found
+
+    def employee(self, employee_id: int, session=None) -> Tuple[str, str] | None:
+        """(NIP, nama) pegawai berdasarkan id; None jika tidak ada."""
+        with self._lock:
+            cached = self._by_id.get(employee_id)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        row = self._with_session(session, lambda s: s.exec(
+            select(Employee.nip, Employee.name).where(Employee.id == employee_id)
+        ).first())
+        if row is None:
+            return None
+        nip, name = row
+        with self._lock:
+            self._by_id[employee_id] = (nip, name)
+            self._by_nip[nip] = (employee_id, name)
+        return nip, name
+
+    def forget_employee(self, employee_id: int) -> None:
+        """Pegawai diubah/dihapus: buang entri id dan NIP lamanya."""
+        with self._lock:
+            cached = self._by_id.pop(employee_id, None)
+            if cached is not None:
+                self._by_nip.pop(cached[0], None)
+
+    def invalidate_employees(self) -> None:
+        with self._lock:
+            self._by_nip.clear()
+            self._by_id.clear()
+
+    def invalidate_deductions(self) -> None:
+        with self._lock:
+            self._deductions = None
+            self.deductions_version += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Counter hit/miss dan ukuran cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "employees": len(self._by_id),
+                "deductions": len(self._deductions or {}),
+            }
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,107 @@
+"""Katalog jenis potongan yang dibaca dari tabel ``deductions``.
+
+Pivot tabel, export, chart dan import CSV dibentuk dari katalog ini, bukan
+dari daftar nama yang ditulis di kode; menambah jenis potongan cukup dengan
+``add_deduction`` (atau tombol *New Deduction* di tabel). Nama potongan juga
+menjadi nama kolom CSV dan key ``EmployeeDeductionEntry.amounts``.
+
+Katalog di-cache per proses lewat ``reference_cache`` dan dibaca ulang saat
+versi katalog di ``data_versions`` naik; SQL yang dibentuk dari katalog
+di-cache per ``Catalog.version``. Jika tabel deductions diubah
+langsung lewat SQL, restart aplikasi agar katalog dibaca ulang.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+
+from ..models import Deduction
+from .cache import bump_catalog_version, reference_cache, sync_versions
+
+
+@dataclass(frozen=True)
+class DeductionType:
+    """Satu jenis potongan."""
+    id: int
+    name: str
+
+    @property
+    def alias(self) -> str:
+        """Nama kolom SQL yang aman untuk potongan ini (nama asli bisa berisi spasi)."""
+        return f"d{self.id}"
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Daftar jenis potongan (urut id) pada satu versi katalog."""
+    version: int
+    types: Tuple[DeductionType, ...]
+
+    @property
+    def names(self) -> List[str]:
+        return [deduction.name for deduction in self.types]
+
+    def by_name(self) -> Dict[str, DeductionType]:
+        return {deduction.name: deduction for deduction in self.types}
+
+    def by_id(self) -> Dict[int, DeductionType]:
+        return {deduction.id: deduction for deduction in self.types}
+
+    def select(self, names: Iterable[str] | None = None) -> Tuple[DeductionType, ...]:
+        """Jenis potongan yang diminta (urut katalog); None berarti semua, nama asing diabaikan."""
+        if names is None:
+            return self.types
+        wanted = set(names)
+        return tuple(deduction for deduction in self.types if deduction.name in wanted)
+
+
+_lock = threading.Lock()
+_catalog: Catalog | None = None
+
+
+def load_catalog(session=None) -> Catalog:
+    """Katalog potongan saat ini (query database hanya setelah katalog di-invalidasi)."""
+    global _catalog
+    # Potongan baru dari worker lain mengosongkan reference_cache lewat versi bersama
+    sync_versions()
+    version = reference_cache.deductions_version
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    deduction_ids = reference_cache.deduction_ids(session)
+    catalog = Catalog(
+        version=version,
+        types=tuple(DeductionType(id=id_, name=name) for name, id_ in deduction_ids.items()),
+    )
+    with _lock:
+        _catalog = catalog
+    return catalog
+
+
+def short_label(name: str) -> str:
+    """Label pendek untuk tab chart, misalnya 'Simpanan Wajib Koperasi' -> 'S. Wajib'."""
+    words = name.split()
+    if len(name) <= 10 or len(words) < 2:
+        return name
+    return f"{words[0][0]}. {words[1]}"
+
+
+def add_deduction(session, name: str) -> DeductionType:
+    """Tambah jenis potongan baru lalu naikkan versi katalog (di-commit oleh fungsi ini).
+
+    Raises:
+        ValueError: Nama kosong atau sudah ada.
+    """
+    name = " ".join(name.split())
+    if not name:
+        raise ValueError("Deduction name is required.")
+    existing = session.execute(select(Deduction.id).where(Deduction.name == name)).first()
+    if existing is not None:
+        raise ValueError(f"Deduction '{name}' already exists.")
+    deduction = Deduction(name=name)
+    session.add(deduction)
+    bump_catalog_version(session)
+    session.commit()
+    session.refresh(deduction)
+    return DeductionType(id=deduction.id, name=deduction.name)
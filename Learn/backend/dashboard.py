@@ -0,0 +1,333 @@
+"""Data tabel, kartu statistik dan chart sebagai fungsi murni.
+
+Fungsi di sini hanya menerima argumen biasa (periode, pencarian, urutan,
+halaman) dan mengembalikan data biasa; tidak ada yang membaca atau menulis
+``State``. Event latar belakang (``run_search``, ``run_import_job``,
+``run_backfill``, prefetch) menjalankannya di thread pool *tanpa* memegang
+lock state, lalu masuk lagi ke ``async with self`` hanya untuk memasang
+hasilnya. Event biasa memanggil fungsi yang sama langsung lewat method
+tipis di ``State``.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import reflex as rx
+from sqlalchemy import text
+
+from ..models import EmployeeDeductionEntry
+from .cache import (
+    area_chart_cache,
+    data_version,
+    month_stats_cache,
+    page_boundaries_cache,
+    payment_status_cache,
+    period_versions,
+)
+from .catalog import Catalog, load_catalog
+from .month_pivot import month_pivot
+from .queries import (
+    CURSOR_AFTER,
+    CURSOR_BEFORE,
+    CURSOR_FROM,
+    MONTH_STATS_SQL,
+    PAYMENT_STATUS_MONTHLY_SQL,
+    PAYMENT_STATUS_YEARLY_SQL,
+    area_chart_query,
+    count_query,
+    keyset_query,
+    page_boundaries_query,
+    pivot_amounts,
+    resolve_sort_column,
+)
+
+# Mapping warna untuk setiap status pembayaran
+PAYMENT_STATUS_COLORS = {
+    "paid": "var(--jade-8)",
+    "unpaid": "var(--tomato-8)",
+    "installment": "var(--yellow-8)",
+}
+
+
+@dataclass(frozen=True)
+class TableQuery:
+    """Salinan parameter tabel dari state: periode, pencarian, urutan dan ukuran halaman."""
+    year: int
+    month: int
+    search_value: str = ""
+    sort_value: str = ""
+    sort_reverse: bool = False
+    limit: int = 10
+
+
+@dataclass
+class TablePage:
+    """Satu halaman tabel beserta jumlah baris dan kursor baris pertama/terakhirnya."""
+    entries: List[EmployeeDeductionEntry]
+    total: int
+    page: int
+    first_cursor: Optional[list] = None
+    last_cursor: Optional[list] = None
+
+
+@dataclass
+class Dashboard:
+    """Semua yang dimuat ulang setelah data berubah: tabel, kartu statistik dan chart.
+
+    ``query`` dan ``timeframe`` adalah parameter yang dipakai saat data dibaca;
+    state membandingkannya dengan parameter aktif sebelum memasang hasil.
+    """
+    query: TableQuery
+    timeframe: str
+    table: TablePage
+    version: int
+    month_stats: tuple
+    month_stats_version: int
+    area_chart: Optional[List[Dict[str, Any]]] = None
+    payment_status: list = field(default_factory=list)
+
+
+def page_count(total: int, limit: int) -> int:
+    """Jumlah halaman untuk ``total`` baris."""
+    return (total // limit) + (1 if total % limit else 0)
+
+
+def rows_to_entries(rows, deductions) -> List[EmployeeDeductionEntry]:
+    entries = []
+    for row in rows:
+        try:
+            entries.append(EmployeeDeductionEntry(
+                id=row["id"],
+                name=row["name"],
+                nip=row["nip"],
+                amounts=pivot_amounts(row, deductions),
+                total_potongan=row["total_potongan"],
+                date=str(row["date"] or ""),
+                status=str(row["status"] or ""),
+                payment_type=str(row["payment_type"] or ""),
+            ))
+        except Exception as e:
+            print(f"Error creating entry object: {e}")
+            continue
+    return entries
+
+
+def fetch_page(
+    query: TableQuery, cursor: list | None = None, mode: str = CURSOR_AFTER
+) -> Tuple[List[EmployeeDeductionEntry], Optional[list], Optional[list]]:
+    """Satu halaman (keyset) beserta kursor baris pertama dan terakhirnya (None jika kosong)."""
+    catalog = load_catalog()
+    pivot = month_pivot(catalog, query.year, query.month)
+    if pivot is not None:
+        deductions = catalog.types
+        cursor_column = resolve_sort_column(catalog, query.sort_value)
+        rows = pivot.page(
+            query.search_value, cursor_column, query.sort_reverse, query.limit,
+            cursor=tuple(cursor) if cursor is not None else None, mode=mode,
+        )
+    else:
+        sql, params, deductions, cursor_column = keyset_query(
+            catalog,
+            query.month,
+            query.year,
+            search_value=query.search_value,
+            sort_value=query.sort_value,
+            sort_reverse=query.sort_reverse,
+            limit=query.limit,
+            cursor=tuple(cursor) if cursor is not None else None,
+            mode=mode,
+        )
+        with rx.session() as session:
+            rows = session.execute(text(sql), params).mappings().all()
+        if cursor is not None and mode == CURSOR_BEFORE:
+            rows = rows[::-1]
+    if not rows:
+        return [], None, None
+    first_cursor = [rows[0][cursor_column] if cursor_column else None, rows[0]["id"]]
+    last_cursor = [rows[-1][cursor_column] if cursor_column else None, rows[-1]["id"]]
+    return rows_to_entries(rows, deductions), first_cursor, last_cursor
+
+
+def page_boundaries(query: TableQuery) -> List[tuple]:
+    """Kursor awal setiap halaman untuk urutan/pencarian ``query`` (di-cache per versi data)."""
+    catalog = load_catalog()
+    pivot = month_pivot(catalog, query.year, query.month)
+    if pivot is not None:
+        return pivot.boundaries(
+            query.search_value, resolve_sort_column(catalog, query.sort_value), query.sort_reverse, query.limit
+        )
+    key = (
+        catalog.version, query.year, query.month,
+        query.search_value, query.sort_value, query.sort_reverse, query.limit,
+    )
+
+    def compute() -> List[tuple]:
+        sql, params = page_boundaries_query(
+            catalog,
+            query.month,
+            query.year,
+            search_value=query.search_value,
+            sort_value=query.sort_value,
+            sort_reverse=query.sort_reverse,
+            limit=query.limit,
+        )
+        with rx.session() as session:
+            return [tuple(row) for row in session.execute(text(sql), params)]
+
+    return page_boundaries_cache.get_or_compute(key, compute)
+
+
+def count_entries(query: TableQuery) -> int:
+    """Jumlah baris pivot (pegawai) yang cocok dengan pencarian ``query``."""
+    pivot = month_pivot(load_catalog(), query.year, query.month)
+    if pivot is not None:
+        return pivot.count(query.search_value)
+    sql, params = count_query(query.search_value)
+    with rx.session() as session:
+        return session.execute(text(sql), params).scalar() or 0
+
+
+def goto_page(query: TableQuery, page: int, total: int) -> TablePage:
+    """Halaman ke-``page`` dari ``total`` baris; halaman selain pertama dimulai dari indeks batas halaman."""
+    page = max(1, min(page, page_count(total, query.limit)))
+    try:
+        if page == 1:
+            entries, first_cursor, last_cursor = fetch_page(query)
+        else:
+            boundaries = page_boundaries(query)
+            page = max(1, min(page, len(boundaries)))
+            entries, first_cursor, last_cursor = fetch_page(query, list(boundaries[page - 1]), CURSOR_FROM)
+    except Exception as e:
+        print(f"Error in goto_page: {e}")
+        entries, first_cursor, last_cursor = [], None, None
+    return TablePage(entries, total, page, first_cursor, last_cursor)
+
+
+def load_table(query: TableQuery, page: int) -> TablePage:
+    """Hitung ulang jumlah baris lalu muat halaman ``page`` (dibatasi ke halaman terakhir)."""
+    try:
+        return goto_page(query, page, count_entries(query))
+    except Exception as e:
+        print(f"Error in load_table: {e}")
+        return TablePage([], 0, 1)
+
+
+def month_stats_params(year: int, month: int) -> Dict[str, Any]:
+    now = datetime.now()
+    current_start = datetime(now.year, now.month, 1)
+    previous_start = (current_start - timedelta(days=1)).replace(day=1)
+    return {
+        "year": year,
+        "month": month,
+        "current_start": current_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "previous_start": previous_start.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _fetch_month_stats(params: Dict[str, Any]) -> tuple:
+    with rx.session() as session:
+        return tuple(session.execute(text(MONTH_STATS_SQL), params).one())
+
+
+def month_stats(year: int, month: int, version: int | None = None) -> Tuple[tuple, int]:
+    """Kartu statistik satu periode dari satu query agregat (di-cache per periode dan versi data).
+
+    Mengembalikan (jumlah pegawai bulan ini, total bulan ini, jumlah pegawai
+    bulan lalu, total bulan lalu) dan versi data yang dibaca; versi -1 jika
+    query gagal.
+    """
+    params = month_stats_params(year, month)
+    version = data_version() if version is None else version
+    try:
+        values = month_stats_cache.get_or_compute(
+            tuple(params.values()), lambda: _fetch_month_stats(params), version=version
+        )
+    except Exception as e:
+        print(f"Error in month_stats: {e}")
+        return (0, 0, 0, 0), -1
+    return tuple(values), version
+
+
+def payment_status_data(timeframe: str = "Monthly") -> list:
+    """Jumlah pegawai per status pembayaran bulan ini ("Monthly") atau tahun ini ("Yearly").
+
+    Di-cache per (timeframe, bulan, tahun) dengan versi periode yang
+    dibaca, jadi hanya penulisan ke periode itu yang memicu query ulang.
+    """
+    current_date = datetime.now()
+    if timeframe == "Monthly":
+        sql = PAYMENT_STATUS_MONTHLY_SQL
+        params = {"month": current_date.month, "year": current_date.year}
+        periods = [(current_date.year, current_date.month)]
+    else:  # Yearly
+        sql = PAYMENT_STATUS_YEARLY_SQL
+        params = {"year": current_date.year}
+        periods = [(current_date.year, month) for month in range(1, 13)]
+
+    def compute() -> list:
+        with rx.session() as session:
+            result = session.execute(text(sql), params).fetchall()
+
+        # Pastikan semua status ada dalam data
+        status_counts = {row[0]: row[1] for row in result}
+        return [
+            {
+                "name": status.capitalize(),
+                "value": status_counts.get(status, 0),
+                "fill": PAYMENT_STATUS_COLORS.get(status, "var(--gray-8)"),  # Default abu-abu jika tidak ditemukan
+            }
+            for status in ("paid", "unpaid", "installment")
+        ]
+
+    key = (timeframe, current_date.month, current_date.year)
+    return payment_status_cache.get_or_compute(key, compute, version=period_versions(periods))
+
+
+def _fetch_area_chart_data(catalog: Catalog) -> List[Dict[str, Any]]:
+    now = datetime.now()
+    with rx.session() as session:
+        result = session.execute(text(area_chart_query(catalog)), {
+            "current_year": now.year,
+            "current_month": now.month,
+            "previous_year": now.year - 1,
+        }).mappings()
+        return [
+            {"month": f"{row['month']}-{row['year']}", **pivot_amounts(row, catalog.types)}
+            for row in result
+        ]
+
+
+def area_chart_series() -> List[Dict[str, Any]]:
+    """Seri 12 bulan terakhir per jenis potongan (di-cache per bulan berjalan dan versi katalog)."""
+    catalog = load_catalog()
+    now = datetime.now()
+    return area_chart_cache.get_or_compute(
+        (now.year, now.month, catalog.version), lambda: _fetch_area_chart_data(catalog)
+    )
+
+
+def load_dashboard(query: TableQuery, page: int, timeframe: str) -> Dashboard:
+    """Tabel, kartu statistik dan chart untuk ``query``; dipakai setelah import/backfill selesai."""
+    version = data_version()
+    stats, stats_version = month_stats(query.year, query.month, version)
+    try:
+        area_chart = area_chart_series()
+    except Exception as e:
+        print(f"Error in area_chart_series: {e}")
+        area_chart = None
+    return Dashboard(
+        query=query,
+        timeframe=timeframe,
+        table=load_table(query, page),
+        version=version,
+        month_stats=stats,
+        month_stats_version=stats_version,
+        area_chart=area_chart,
+        payment_status=payment_status_data(timeframe),
+    )
+
+
+def prefetch_month(year: int, month: int) -> None:
+    """Isi cache pivot tabel dan kartu statistik satu periode tanpa menyentuh state."""
+    month_pivot(load_catalog(), year, month)
+    month_stats(year, month)
@@ -0,0 +1,249 @@
+"""Export CSV potongan yang di-stream lewat endpoint HTTP.
+
+Baris dibaca langsung dari cursor database dan ditulis per potongan kecil
+(chunk), sehingga memori tetap terbatas berapapun jumlah pegawainya dan byte
+pertama sudah terkirim sebelum query selesai dibaca.
+
+Event handler di State tidak lagi mengirim isi file lewat websocket; handler
+hanya membuat token export bertanda tangan (JWT, berlaku singkat) lalu
+browser mengunduh ``/export/{token}`` yang dilayani oleh ``export_endpoint``.
+"""
+import calendar
+import csv
+import io
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from urllib.parse import quote
+
+import jwt
+import reflex as rx
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+
+from ..models import Employee
+from .catalog import load_catalog
+from .queries import ALL_EMPLOYEES_RECAP_SQL, EMPLOYEE_RECAP_SQL, entries_query, pivot_amounts
+
+MONTH_HEADERS = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun",
+                 "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
+# Header tabel di sekitar kolom potongan (kolom potongan diambil dari katalog)
+TABLE_HEADERS_BEFORE = ['Nama', 'NIP']
+TABLE_HEADERS_AFTER = ['Total Potongan', 'Date', 'Status', 'Type']
+
+# Jumlah baris yang dikumpulkan sebelum satu chunk CSV dikirim
+CSV_CHUNK_ROWS = 500
+# Jumlah baris yang diambil dari cursor per fetch
+FETCH_SIZE = 1000
+
+EXPORT_PATH = "/export"
+EXPORT_TOKEN_TTL = timedelta(minutes=5)
+load_dotenv()
+# Set EXPORT_TOKEN_SECRET di .env jika backend berjalan dengan lebih dari satu worker
+EXPORT_TOKEN_SECRET = os.environ.get("EXPORT_TOKEN_SECRET") or secrets.token_hex(32)
+
+
+def format_amount(amount) -> str:
+    """Format nominal dengan pemisah ribuan titik; kosong jika nol/None."""
+    return f"{amount:,.0f}".replace(",", ".") if amount else ""
+
+
+def csv_chunks(rows: Iterable[List[Any]], chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """Ubah iterable baris menjadi potongan teks CSV berukuran terbatas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def _stream(session, sql: str, params: Dict[str, Any]):
+    """Eksekusi query dengan cursor streaming (server-side cursor jika didukung)."""
+    return session.execute(
+        text(sql).execution_options(stream_results=True, yield_per=FETCH_SIZE),
+        params,
+    )
+
+
+# ---------------------------
+# Penulis baris CSV
+# ---------------------------
+
+def recap_block(employee_name: str, year: int, amounts: dict, deduction_names: List[str]) -> Iterator[List[Any]]:
+    """Baris CSV rekap satu pegawai: judul, header bulan, satu baris per jenis potongan."""
+    yield [f"Recap Deductions Employee by {employee_name} in {year}"]
+    yield []  # Empty row
+    yield ["Deductions"] + MONTH_HEADERS
+    for deduction in deduction_names:
+        monthly = amounts.get(deduction, [0] * 12)
+        yield [deduction] + [format_amount(amount) for amount in monthly]
+
+
+def slip_block(name: str, amounts: Dict[str, int | None], month: int, year: int) -> Iterator[List[Any]]:
+    """Baris CSV slip potongan satu pegawai untuk satu bulan (urutan potongan mengikuti ``amounts``)."""
+    month_name = calendar.month_name[month]
+    yield []  # Empty row for spacing
+    yield [f'DAFTAR POTONGAN KOPERASI DAN LAIN-LAIN BULAN {month_name.upper()} {year}']
+    yield []
+    yield ['Nama         :', name]
+    yield ['Potongan   :']
+    total_amount = 0
+    for deduction_name in amounts:
+        amount = amounts.get(deduction_name)
+        yield ['', deduction_name, format_amount(amount)]
+        if amount:
+            total_amount += amount
+    yield ['', 'Total Potongan', f'{total_amount:,.0f}'.replace(',', '.')]
+    yield []  # Empty row for spacing
+
+
+def iter_table_rows(
+    session,
+    month: int,
+    year: int,
+    search_value: str = "",
+    sort_value: str = "",
+    sort_reverse: bool = False,
+) -> Iterator[List[Any]]:
+    """Baris CSV tabel potongan satu bulan (pencarian & sorting sama dengan tabel)."""
+    catalog = load_catalog(session)
+    yield [*TABLE_HEADERS_BEFORE, *catalog.names, *TABLE_HEADERS_AFTER]
+    sql, params, deductions = entries_query(catalog, month, year, search_value, sort_value, sort_reverse)
+    aliases = [deduction.alias for deduction in deductions]
+    for row in _stream(session, sql, params).mappings():
+        yield [
+            row["name"],
+            row["nip"],
+            *[row[alias] or '' for alias in aliases],
+            row["total_potongan"] or '',
+            str(row["date"] or ""),
+            str(row["status"] or ""),
+            str(row["payment_type"] or ""),
+        ]
+
+
+def iter_slip_rows(
+    session,
+    month: int,
+    year: int,
+    search_value: str = "",
+    sort_value: str = "",
+    sort_reverse: bool = False,
+) -> Iterator[List[Any]]:
+    """Baris CSV slip potongan semua pegawai untuk satu bulan."""
+    catalog = load_catalog(session)
+    sql, params, deductions = entries_query(catalog, month, year, search_value, sort_value, sort_reverse)
+    for row in _stream(session, sql, params).mappings():
+        yield from slip_block(row["name"], pivot_amounts(row, deductions), month, year)
+
+
+def iter_employee_recap_rows(session, employee_id: int, year: int) -> Iterator[List[Any]]:
+    """Baris CSV rekap tahunan satu pegawai."""
+    employee = session.get(Employee, employee_id)
+    if employee is None:
+        return
+    catalog = load_catalog(session)
+    deductions = catalog.by_id()
+    amounts: dict = {}
+    for deduction_id, month, amount in _stream(
+        session, EMPLOYEE_RECAP_SQL, {"employee_id": employee_id, "year": year}
+    ):
+        if deduction_id in deductions:
+            amounts.setdefault(deductions[deduction_id].name, [0] * 12)[month - 1] = amount or 0
+    yield from recap_block(employee.name, year, amounts, catalog.names)
+
+
+def iter_all_recap_rows(session, year: int) -> Iterator[List[Any]]:
+    """Baris CSV rekap tahunan semua pegawai dari satu query GROUP BY (pegawai, potongan, bulan).
+
+    Hasil query dibaca secara streaming dan dikelompokkan per pegawai, jadi hanya
+    data satu pegawai yang ada di memori pada satu waktu.
+    """
+    catalog = load_catalog(session)
+    deductions = catalog.by_id()
+    result = _stream(session, ALL_EMPLOYEES_RECAP_SQL, {"year": year})
+    for (_, employee_name), rows in groupby(result, key=lambda row: (row[0], row[1])):
+        amounts: dict = {}
+        for _, _, deduction_id, month, amount in rows:
+            if deduction_id not in deductions or month is None:
+                continue  # pegawai tanpa potongan di tahun ini
+            amounts.setdefault(deductions[deduction_id].name, [0] * 12)[month - 1] = amount or 0
+        yield from recap_block(employee_name, year, amounts, catalog.names)
+        # Add two empty rows between employees
+        yield []
+        yield []
+
+
+EXPORTERS: Dict[str, Callable[..., Iterator[List[Any]]]] = {
+    "table": iter_table_rows,
+    "slips": iter_slip_rows,
+    "employee_recap": iter_employee_recap_rows,
+    "all_recap": iter_all_recap_rows,
+}
+
+
+# ---------------------------
+# Token & endpoint HTTP
+# ---------------------------
+
+def export_url(kind: str, filename: str, **params) -> str:
+    """Buat URL download bertoken untuk satu export."""
+    if kind not in EXPORTERS:
+        raise ValueError(f"Unknown export: {kind}")
+    token = jwt.encode(
+        {
+            "kind": kind,
+            "filename": filename,
+            "params": params,
+            "exp": datetime.now(timezone.utc) + EXPORT_TOKEN_TTL,
+        },
+        EXPORT_TOKEN_SECRET,
+        algorithm="HS256",
+    )
+    return f"{rx.config.get_config().api_url}{EXPORT_PATH}/{token}"
+
+
+def stream_csv(kind: str, params: Dict[str, Any]) -> Iterator[bytes]:
+    """Generator chunk CSV; session database hidup selama respons di-stream."""
+    with rx.session() as session:
+        for chunk in csv_chunks(EXPORTERS[kind](session, **params)):
+            yield chunk.encode("utf-8")
+
+
+async def export_endpoint(token: str) -> StreamingResponse:
+    """Endpoint ``GET /export/{token}``: stream file CSV secara chunked."""
+    try:
+        payload = jwt.decode(token, EXPORT_TOKEN_SECRET, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=410, detail="Export link has expired.")
+    except jwt.InvalidTokenError:
+        # Tanda tangan salah / token rusak: ditolak, bukan "tidak ditemukan"
+        raise HTTPException(status_code=403, detail="Invalid export link.")
+
+    kind = payload.get("kind")
+    if kind not in EXPORTERS:
+        raise HTTPException(status_code=404, detail="Export not found.")
+
+    filename = payload.get("filename") or f"{kind}.csv"
+    ascii_filename = filename.encode("ascii", "ignore").decode().replace('"', "")
+    return StreamingResponse(
+        stream_csv(kind, payload.get("params") or {}),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{ascii_filename}"; filename*=UTF-8\'\'{quote(filename)}'
+            ),
+        },
+    )
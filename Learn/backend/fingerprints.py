@@ -0,0 +1,126 @@
+"""Sidik jari import CSV agar import ulang hanya menulis yang berubah.
+
+Dua tingkat:
+
+- ``imported_files``: hash SHA-256 file terakhir yang diimport per periode.
+  File yang sama persis dengan import terakhir periode itu dilewati tanpa
+  di-parse (mengimport ulang file terakhir tidak mengubah apa pun).
+- ``import_fingerprints``: hash per baris CSV (NIP, periode, nominal,
+  status, type) per pegawai. Baris dengan hash sama dengan import
+  sebelumnya tidak ditulis ulang.
+
+Sidik jari hanya berlaku selama data periode itu tidak diubah di luar
+import; tambah/ubah/hapus pegawai memanggil ``forget_imports`` di transaksi
+yang sama. Jika employee_deductions diubah langsung lewat SQL, kosongkan
+kedua tabel ini (import berikutnya akan menulis semua baris).
+"""
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import bindparam, text
+
+# Batas jumlah parameter per query IN (...) agar aman untuk SQLite
+_IN_CHUNK_SIZE = 500
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+_LOAD_FINGERPRINTS_SQL = text("""
+    SELECT employee_id, fingerprint
+    FROM import_fingerprints
+    WHERE year = :year AND month = :month AND employee_id IN :employee_ids
+""").bindparams(bindparam("employee_ids", expanding=True))
+
+_EMPLOYEES_WITH_ROWS_SQL = text("""
+    SELECT DISTINCT employee_id
+    FROM employee_deductions
+    WHERE year = :year AND month = :month AND employee_id IN :employee_ids
+""").bindparams(bindparam("employee_ids", expanding=True))
+
+# Sintaks ON CONFLICT ini sama di SQLite dan PostgreSQL
+_STORE_FINGERPRINTS_SQL = text("""
+    INSERT INTO import_fingerprints (employee_id, year, month, fingerprint)
+    VALUES (:employee_id, :year, :month, :fingerprint)
+    ON CONFLICT (year, month, employee_id) DO UPDATE SET fingerprint = excluded.fingerprint
+""")
+
+_RECORD_FILE_SQL = text("""
+    INSERT INTO imported_files (year, month, sha256, filename, row_count, imported_at)
+    VALUES (:year, :month, :sha256, :filename, :row_count, :imported_at)
+    ON CONFLICT (year, month) DO UPDATE SET
+        sha256 = excluded.sha256,
+        filename = excluded.filename,
+        row_count = excluded.row_count,
+        imported_at = excluded.imported_at
+""")
+
+
+def file_sha256(path: str | Path) -> str:
+    """Hash SHA-256 isi file (dibaca per potongan)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _by_chunks(session, statement, employee_ids: List[int], params: dict) -> list:
+    rows = []
+    for start in range(0, len(employee_ids), _IN_CHUNK_SIZE):
+        chunk = employee_ids[start:start + _IN_CHUNK_SIZE]
+        rows.extend(session.execute(statement, {**params, "employee_ids": chunk}).all())
+    return rows
+
+
+def load_fingerprints(session, employee_ids: List[int], year: int, month: int) -> Dict[int, int]:
+    """Mapping employee id -> sidik jari baris import terakhir pada periode ini."""
+    rows = _by_chunks(session, _LOAD_FINGERPRINTS_SQL, employee_ids, {"year": year, "month": month})
+    return {employee_id: fingerprint for employee_id, fingerprint in rows}
+
+
+def employees_with_rows(session, employee_ids: List[int], year: int, month: int) -> Set[int]:
+    """Pegawai (dari daftar) yang sudah punya data potongan pada periode ini."""
+    rows = _by_chunks(session, _EMPLOYEES_WITH_ROWS_SQL, employee_ids, {"year": year, "month": month})
+    return {employee_id for employee_id, in rows}
+
+
+def store_fingerprints(session, fingerprints: Dict[int, int], year: int, month: int) -> None:
+    """Simpan sidik jari baris yang baru ditulis (tanpa commit)."""
+    if not fingerprints:
+        return
+    session.execute(_STORE_FINGERPRINTS_SQL, [
+        {"employee_id": employee_id, "year": year, "month": month, "fingerprint": fingerprint}
+        for employee_id, fingerprint in fingerprints.items()
+    ])
+
+
+def imported_file(session, year: int, month: int) -> Tuple[str, int] | None:
+    """(sha256, jumlah baris) file terakhir yang diimport ke periode ini, jika ada."""
+    row = session.execute(
+        text("SELECT sha256, row_count FROM imported_files WHERE year = :year AND month = :month"),
+        {"year": year, "month": month},
+    ).first()
+    return tuple(row) if row else None
+
+
+def record_imported_file(session, year: int, month: int, sha256: str, filename: str, row_count: int) -> None:
+    """Catat file yang baru diimport sebagai file terakhir periode ini (tanpa commit)."""
+    session.execute(_RECORD_FILE_SQL, {
+        "year": year,
+        "month": month,
+        "sha256": sha256,
+        "filename": filename,
+        "row_count": row_count,
+        "imported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+
+def forget_imports(session, employee_id: int, periods: Iterable[Tuple[int, int]]) -> None:
+    """Data pegawai pada periode ini diubah di luar import: buang sidik jarinya (tanpa commit)."""
+    for year, month in sorted(set(periods)):
+        params = {"employee_id": employee_id, "year": year, "month": month}
+        session.execute(
+            text("DELETE FROM import_fingerprints WHERE employee_id = :employee_id AND year = :year AND month = :month"),
+            params,
+        )
+        session.execute(text("DELETE FROM imported_files WHERE year = :year AND month = :month"), params)
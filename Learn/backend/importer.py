@@ -0,0 +1,488 @@
+"""Bulk import potongan pegawai dari CSV ke database.
+
+Alih-alih satu query per baris/potongan, semua referensi (pegawai, jenis
+potongan) di-resolve dengan beberapa query berbasis himpunan, lalu seluruh
+baris potongan ditulis dalam satu transaksi memakai
+``INSERT ... ON CONFLICT (employee_id, deduction_id, month, year) DO UPDATE``.
+Nilai CSV (nominal, Status, Type) dinormalisasi per kolom dengan pandas,
+bukan per sel. Rollup periode yang diimport dihitung ulang di transaksi yang sama.
+
+Import ulang bersifat idempoten dan murah: file yang identik dengan import
+terakhir periode itu dilewati, dan baris yang sidik jarinya tidak berubah
+tidak ditulis (lihat ``fingerprints``).
+"""
+import time
+from itertools import repeat
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, case, insert, literal_column, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import Employee, EmployeeDeduction
+from .cache import bump_data_version, reference_cache
+from .fingerprints import (
+    employees_with_rows,
+    imported_file,
+    load_fingerprints,
+    record_imported_file,
+    store_fingerprints,
+)
+from .rollup import refresh_periods
+
+PAYMENT_STATUSES = ("paid", "unpaid", "installment")
+PAYMENT_TYPES = ("cash", "transfer")
+PERIOD_KEY = ["employee_id", "deduction_id", "month", "year"]
+# Urutan kolom pada tuple baris upsert
+UPSERT_COLUMNS = (
+    "employee_id", "deduction_id", "amount", "payment_status", "payment_type",
+    "month", "year", "created_at", "updated_at",
+)
+
+# Batas jumlah parameter per query IN (...) agar aman untuk SQLite
+IN_CHUNK_SIZE = 500
+
+
+# Jumlah baris CSV per batch (progress dan pengecekan cancel dilakukan per batch)
+IMPORT_BATCH_ROWS = 5000
+# Batas jumlah pesan error yang disimpan di laporan
+MAX_REPORTED_ERRORS = 50
+
+
+class ImportCancelled(Exception):
+    """Import dibatalkan oleh pengguna; transaksi di-rollback."""
+
+
+@dataclass
+class ImportReport:
+    """Ringkasan hasil satu kali import.
+
+    ``inserted``/``updated``/``unchanged`` dihitung per pegawai (baris CSV
+    setelah NIP ganda digabung); ``upserted`` adalah jumlah baris potongan
+    yang benar-benar ditulis.
+    """
+    rows: int = 0
+    employees_created: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    upserted: int = 0
+    file_unchanged: bool = False  # file identik dengan import terakhir, tidak di-parse
+    elapsed: float = 0.0
+    error_count: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        if self.file_unchanged:
+            return f"{self.rows} rows, file unchanged since the last import, nothing written"
+        return (
+            f"{self.rows} rows ({self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged), {self.upserted} deductions written, "
+            f"{self.employees_created} new employees, {self.error_count} errors "
+            f"in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _dialect_insert(session, table):
+    """Pilih konstruksi INSERT yang mendukung ON CONFLICT sesuai dialect database."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def resolve_employees(session, employees: Dict[str, str]) -> tuple[Dict[str, int], int]:
+    """Resolve NIP -> employee id, membuat pegawai yang belum ada secara bulk.
+
+    Args:
+        employees: Mapping NIP -> nama dari file yang diimport.
+
+    Returns:
+        Tuple (mapping NIP -> id, jumlah pegawai baru).
+    """
+    nips = list(employees)
+    nip_to_id = {
+        nip: id_ for nip, (id_, _) in reference_cache.employees_by_nip(nips, session).items()
+    }
+
+    missing = [nip for nip in nips if nip not in nip_to_id]
+    if missing:
+        session.execute(
+            insert(Employee),
+            [{"name": employees[nip] or "", "nip": nip} for nip in missing],
+        )
+        for chunk in _chunks(missing):
+            rows = session.execute(
+                select(Employee.nip, Employee.id).where(Employee.nip.in_(chunk))
+            ).all()
+            nip_to_id.update({nip: id_ for nip, id_ in rows})
+    return nip_to_id, len(missing)
+
+
+def _upsert_statement(session):
+    """Statement upsert employee_deductions dengan parameter bernama sesuai ``UPSERT_COLUMNS``."""
+    table = EmployeeDeduction.__table__
+    stmt = _dialect_insert(session, table).values(
+        {column: bindparam(column) for column in UPSERT_COLUMNS}
+    )
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=PERIOD_KEY,
+        set_={
+            "amount": excluded.amount,
+            "payment_status": excluded.payment_status,
+            "payment_type": excluded.payment_type,
+            "updated_at": case(
+                (excluded.updated_at == literal_column("''"), table.c.updated_at),
+                else_=excluded.updated_at,
+            ),
+        },
+        where=or_(
+            table.c.amount.is_distinct_from(excluded.amount),
+            table.c.payment_status.is_distinct_from(excluded.payment_status),
+            table.c.payment_type.is_distinct_from(excluded.payment_type),
+        ),
+    )
+
+
+def upsert_employee_deductions(session, rows: List[tuple]) -> int:
+    """Tulis baris potongan dengan satu statement upsert (executemany).
+
+    ``rows`` berisi tuple dengan urutan ``UPSERT_COLUMNS``. Untuk driver
+    dengan paramstyle posisional (sqlite3) tuple langsung diberikan ke
+    ``cursor.executemany``; driver lain menerima dict per baris.
+
+    Baris yang sudah ada hanya diperbarui jika amount/status/type berbeda;
+    ``updated_at`` hanya ditimpa jika file menyediakan tanggal.
+    """
+    if not rows:
+        return 0
+    stmt = _upsert_statement(session)
+    dialect = session.get_bind().dialect
+    compiled = stmt.compile(dialect=dialect)
+    if dialect.positional and tuple(compiled.positiontup) == UPSERT_COLUMNS:
+        session.connection().exec_driver_sql(str(compiled), rows)
+    else:
+        session.execute(stmt, [dict(zip(UPSERT_COLUMNS, row)) for row in rows])
+    return len(rows)
+
+
+def normalize_amounts(column: pd.Series) -> pd.Series:
+    """Ubah satu kolom nominal menjadi dtype ``Int64`` (nullable) secara vektor.
+
+    Teks dibersihkan dari semua karakter non-digit (pemisah ribuan, huruf
+    nyasar); sel kosong menjadi <NA>. Kolom yang sudah numerik (misalnya
+    hasil ``read_csv(thousands='.')``) dibulatkan ke bawah seperti ``int()``.
+    """
+    if pd.api.types.is_float_dtype(column.dtype) and isinstance(column.dtype, np.dtype):
+        values = column.to_numpy()
+        missing = np.isnan(values)
+        return pd.Series(
+            pd.arrays.IntegerArray(np.where(missing, 0, values).astype(np.int64), missing),
+            index=column.index,
+        )
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype("Int64")
+    digits = column.astype("string").str.replace(r"\D", "", regex=True)
+    return pd.to_numeric(digits.mask(digits == ""), errors="coerce").astype("Int64")
+
+
+def _strings(df: pd.DataFrame, column: str, few_values: bool = False) -> pd.Series:
+    """Kolom teks (dtype object) yang sudah di-strip; sel kosong/tidak ada menjadi NaN.
+
+    Untuk kolom dengan sedikit nilai berbeda (Status, Type) ``few_values=True``
+    hanya men-strip nilai unik hasil ``pd.factorize``.
+    """
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    values = df[column]
+    if values.dtype != object:
+        values = values.astype(str).where(values.notna())
+    if few_values:
+        codes, uniques = pd.factorize(values)
+        stripped = np.append(uniques.str.strip().to_numpy(dtype=object), np.nan)
+        values = pd.Series(stripped[codes], index=values.index)
+    else:
+        values = values.str.strip()
+    values[values == ""] = np.nan
+    return values
+
+
+def _report_invalid(
+    report: ImportReport, lines: pd.Series, values: pd.Series, mask: pd.Series, message: str
+) -> None:
+    """Catat error untuk baris yang cocok dengan mask (pesan dibentuk hanya untuk yang disimpan)."""
+    count = int(mask.sum())
+    if not count:
+        return
+    room = max(MAX_REPORTED_ERRORS - len(report.errors), 0)
+    report.errors.extend(
+        message.format(line=line, value=value)
+        for line, value in zip(lines[mask].head(room), values[mask].head(room))
+    )
+    report.error_count += count
+
+
+@dataclass
+class NormalizedBatch:
+    """Satu batch CSV setelah normalisasi: satu baris per NIP, kolom sudah bertipe."""
+    frame: pd.DataFrame  # index: nip; kolom: name, status, payment_type, created_at, updated_at, <potongan>
+    deductions: List[str]  # nama kolom potongan (katalog saat batch dinormalisasi)
+
+
+def normalize_batch(
+    df: pd.DataFrame, first_line: int, report: ImportReport, deduction_names: Sequence[str]
+) -> NormalizedBatch:
+    """Normalisasi satu batch CSV di level kolom (pandas/NumPy, tanpa loop per baris).
+
+    - Baris tanpa NIP dibuang dan dicatat sebagai error.
+    - Nominal potongan menjadi ``Int64`` (lihat ``normalize_amounts``).
+    - Status/Type divalidasi terhadap ``PAYMENT_STATUSES``/``PAYMENT_TYPES``;
+      Status tidak dikenal menjadi 'unpaid', Type tidak dikenal dikosongkan.
+    - NIP ganda: nilai baris terakhir yang dipakai; ``created_at`` dari tanggal
+      pertama, ``updated_at`` dari tanggal terakhir yang tidak kosong.
+
+    Args:
+        df: Batch hasil ``pd.read_csv``.
+        first_line: Nomor baris file untuk baris pertama batch (untuk pesan error).
+        report: Laporan import yang menampung error.
+        deduction_names: Nama jenis potongan (katalog); kolom yang tidak ada di CSV menjadi <NA>.
+    """
+    # Nomor baris file, diindeks sama dengan df
+    lines = pd.Series(np.arange(first_line, first_line + len(df)), index=df.index)
+
+    nip = _strings(df, "NIP")
+    status = _strings(df, "Status", few_values=True)
+    payment_type = _strings(df, "Type", few_values=True)
+    valid_status = status.isin(PAYMENT_STATUSES)
+    valid_type = payment_type.isin(PAYMENT_TYPES)
+
+    missing_nip = nip.isna()
+    _report_invalid(report, lines, nip, missing_nip, "Line {line}: missing NIP, row skipped")
+    _report_invalid(
+        report, lines, status, status.notna() & ~valid_status & ~missing_nip,
+        "Line {line}: unknown Status '{value}', saved as unpaid",
+    )
+    _report_invalid(
+        report, lines, payment_type, payment_type.notna() & ~valid_type & ~missing_nip,
+        "Line {line}: unknown Type '{value}', left empty",
+    )
+
+    date = _strings(df, "Date")
+    frame = pd.DataFrame({
+        "nip": nip,
+        "name": _strings(df, "Nama"),
+        "status": status.where(valid_status, "unpaid"),
+        "payment_type": payment_type.where(valid_type, None),
+        "created_at": date,
+        "updated_at": date,
+    })
+    for deduction_name in deduction_names:
+        frame[deduction_name] = (
+            normalize_amounts(df[deduction_name]) if deduction_name in df.columns
+            else pd.Series(pd.NA, index=df.index, dtype="Int64")
+        )
+    frame = frame[~missing_nip]
+
+    if frame["nip"].duplicated().any():
+        grouped = frame.groupby("nip", sort=False)
+        firsts = grouped[["name", "created_at"]].first()
+        last_dates = grouped["updated_at"].last()
+        frame = frame.drop_duplicates("nip", keep="last").set_index("nip")
+        frame["name"] = firsts["name"]
+        frame["created_at"] = firsts["created_at"]
+        frame["updated_at"] = last_dates
+    else:
+        frame = frame.set_index("nip")
+    frame["created_at"] = frame["created_at"].fillna("")
+    frame["updated_at"] = frame["updated_at"].fillna("")
+    return NormalizedBatch(frame=frame, deductions=list(deduction_names))
+
+
+def row_fingerprints(batch: NormalizedBatch, month: int, year: int) -> np.ndarray:
+    """Sidik jari 64-bit per pegawai dari NIP, periode, nominal, status dan type.
+
+    Tanggal tidak ikut di-hash: upsert juga tidak menulis baris yang hanya
+    berbeda tanggalnya.
+    """
+    frame = batch.frame[["status", "payment_type", *batch.deductions]].reset_index()
+    frame["month"] = month
+    frame["year"] = year
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def batch_rows(
+    batch: NormalizedBatch,
+    nip_to_id: Dict[str, int],
+    deduction_ids: Dict[str, int],
+    month: int,
+    year: int,
+) -> List[tuple]:
+    """Bentuk tuple upsert (urutan ``UPSERT_COLUMNS``) per pegawai x potongan dari kolom batch."""
+    frame = batch.frame
+    employee_ids = [nip_to_id[nip] for nip in frame.index]
+    statuses = frame["status"].tolist()
+    payment_types = frame["payment_type"].tolist()
+    created = frame["created_at"].tolist()
+    updated = frame["updated_at"].tolist()
+
+    rows: List[tuple] = []
+    for deduction_name in batch.deductions:
+        deduction_id = deduction_ids.get(deduction_name)
+        if deduction_id is None:
+            continue  # jenis potongan dihapus setelah batch dinormalisasi
+        amounts = frame[deduction_name].to_numpy(dtype=object, na_value=None).tolist()
+        rows.extend(zip(
+            employee_ids, repeat(deduction_id), amounts, statuses, payment_types,
+            repeat(month), repeat(year), created, updated,
+        ))
+    return rows
+
+
+def load_deduction_ids(session=None) -> Dict[str, int]:
+    """Mapping nama kolom potongan CSV (nama di katalog) -> deduction id."""
+    return reference_cache.deduction_ids(session)
+
+
+def write_batch(
+    session,
+    batch: NormalizedBatch,
+    deduction_ids: Dict[str, int],
+    month: int,
+    year: int,
+    report: ImportReport,
+) -> None:
+    """Resolve pegawai lalu upsert baris batch yang berubah (tanpa commit).
+
+    Baris yang sidik jarinya sama dengan import sebelumnya untuk pegawai dan
+    periode yang sama dilewati.
+    """
+    nip_to_id, created = resolve_employees(session, batch.frame["name"].fillna("").to_dict())
+    report.employees_created += created
+
+    employee_ids = [nip_to_id[nip] for nip in batch.frame.index]
+    fingerprints = row_fingerprints(batch, month, year)
+    previous = load_fingerprints(session, employee_ids, year, month)
+    changed = np.array([
+        previous.get(employee_id) != fingerprint
+        for employee_id, fingerprint in zip(employee_ids, fingerprints.tolist())
+    ], dtype=bool)
+    report.unchanged += int((~changed).sum())
+    if not changed.any():
+        return
+
+    changed_ids = [employee_id for employee_id, flag in zip(employee_ids, changed) if flag]
+    # Pegawai tanpa sidik jari bisa saja sudah punya data (diisi manual atau sebelum fitur ini)
+    unknown = [employee_id for employee_id in changed_ids if employee_id not in previous]
+    existing = employees_with_rows(session, unknown, year, month) if unknown else set()
+    report.updated += sum(1 for employee_id in changed_ids if employee_id in previous or employee_id in existing)
+    report.inserted += sum(1 for employee_id in unknown if employee_id not in existing)
+
+    changed_batch = NormalizedBatch(frame=batch.frame[changed], deductions=batch.deductions)
+    rows = batch_rows(changed_batch, nip_to_id, deduction_ids, month, year)
+    report.upserted += upsert_employee_deductions(session, rows)
+    store_fingerprints(session, dict(zip(changed_ids, fingerprints[changed].tolist())), year, month)
+
+
+def import_batches(
+    session,
+    batches: Iterable[pd.DataFrame],
+    month: int,
+    year: int,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    content_hash: Optional[str] = None,
+    filename: str = "",
+) -> ImportReport:
+    """Import CSV potongan (per batch DataFrame) untuk satu periode dalam satu transaksi.
+
+    Batch ditulis berurutan, jadi baris yang muncul belakangan tetap menang
+    untuk key periode yang sama. Commit hanya dilakukan setelah semua batch
+    selesai; jika ``is_cancelled`` mengembalikan True, transaksi di-rollback
+    dan ``ImportCancelled`` dilempar.
+
+    Jika ``content_hash`` sama dengan file terakhir yang diimport ke periode
+    ini, batch tidak dibaca sama sekali (``report.file_unchanged``).
+
+    Args:
+        session: Session database aktif (di-commit oleh fungsi ini).
+        batches: DataFrame berkolom Nama, NIP, potongan, Date, Status, Type.
+        month: Bulan periode tujuan.
+        year: Tahun periode tujuan.
+        on_progress: Dipanggil dengan laporan sementara setelah tiap batch.
+        is_cancelled: Dicek sebelum tiap batch dan sebelum commit.
+        content_hash: SHA-256 isi file (lihat ``fingerprints.file_sha256``).
+        filename: Nama file asal, dicatat bersama ``content_hash``.
+
+    Returns:
+        ImportReport berisi jumlah baris, error dan throughput (rows/second).
+    """
+    started = time.perf_counter()
+    report = ImportReport()
+
+    def check_cancelled():
+        if is_cancelled is not None and is_cancelled():
+            session.rollback()
+            raise ImportCancelled()
+
+    if content_hash is not None:
+        previous = imported_file(session, year, month)
+        if previous is not None and previous[0] == content_hash:
+            report.rows = report.unchanged = previous[1]
+            report.file_unchanged = True
+            report.elapsed = time.perf_counter() - started
+            return report
+
+    deduction_ids = load_deduction_ids(session)
+
+    try:
+        for df in batches:
+            check_cancelled()
+            # Nomor baris file (baris 1 adalah header)
+            first_line = report.rows + 2
+            report.rows += len(df)
+            batch = normalize_batch(df, first_line, report, list(deduction_ids))
+            write_batch(session, batch, deduction_ids, month, year, report)
+            report.elapsed = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(report)
+
+        check_cancelled()
+        if report.changed:
+            refresh_periods(session, [(year, month)])
+            # Pegawai baru muncul di tabel setiap bulan; selain itu hanya periode import yang berubah
+            bump_data_version(session, None if report.employees_created else [(year, month)])
+        if content_hash is not None:
+            record_imported_file(session, year, month, content_hash, filename, report.rows)
+        session.commit()
+    except BaseException:
+        if report.employees_created:
+            # Id pegawai baru yang di-rollback mungkin sudah masuk reference cache
+            reference_cache.invalidate_employees()
+        raise
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def bulk_import_deductions(
+    session,
+    df: pd.DataFrame,
+    month: int,
+    year: int,
+) -> ImportReport:
+    """Import satu DataFrame CSV potongan untuk satu periode (lihat ``import_batches``)."""
+    return import_batches(session, [df], month, year)
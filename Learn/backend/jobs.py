@@ -0,0 +1,132 @@
+"""Job import CSV yang berjalan di background.
+
+Handler upload hanya menyimpan file ke disk dan mendaftarkan ``ImportJob``;
+pekerjaan sebenarnya (parse per batch + upsert) berjalan di thread pool lewat
+``run_import_job``. Thread pekerja menulis progress ke objek job, dan task
+background di State membacanya secara berkala untuk dikirim ke UI.
+
+Registry ini per proses: job hanya bisa dibatalkan dari worker backend
+yang menjalankannya.
+"""
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+import reflex as rx
+
+from .cache import sync_versions
+from .fingerprints import file_sha256
+from .importer import IMPORT_BATCH_ROWS, ImportCancelled, ImportReport, import_batches
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class ImportJob:
+    """Satu import CSV beserta progress-nya."""
+    id: str
+    path: Path
+    filename: str
+    month: int
+    year: int
+    status: str = JOB_QUEUED
+    report: ImportReport = field(default_factory=ImportReport)
+    error: str = ""
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+_jobs: Dict[str, ImportJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def import_dir() -> Path:
+    """Direktori file CSV yang menunggu/sedang diimport."""
+    path = rx.get_upload_dir() / "imports"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def create_job(filename: str, month: int, year: int) -> ImportJob:
+    """Daftarkan job baru; file CSV ditulis pemanggil ke ``job.path``."""
+    job_id = uuid.uuid4().hex[:12]
+    job = ImportJob(
+        id=job_id,
+        path=import_dir() / f"{job_id}.csv",
+        filename=filename,
+        month=month,
+        year=year,
+    )
+    with _jobs_lock:
+        _jobs[job_id] = job
+    return job
+
+
+def get_job(job_id: str) -> ImportJob | None:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    """Minta job berhenti sebelum batch berikutnya; False jika job tidak ditemukan."""
+    job = get_job(job_id)
+    if job is None:
+        return False
+    job.cancel_event.set()
+    return True
+
+
+def finish_job(job_id: str) -> None:
+    """Hapus job dari registry beserta file CSV-nya."""
+    with _jobs_lock:
+        job = _jobs.pop(job_id, None)
+    if job is not None:
+        job.path.unlink(missing_ok=True)
+
+
+def run_import_job(job: ImportJob) -> ImportJob:
+    """Jalankan import satu job (blocking; dipanggil lewat ``run_blocking``)."""
+    job.status = JOB_RUNNING
+
+    def on_progress(report: ImportReport) -> None:
+        job.report = report
+
+    try:
+        content_hash = file_sha256(job.path)
+        with open(job.path, encoding="utf-8-sig") as file:
+            header = pd.read_csv(file, nrows=0).columns
+            if "NIP" not in header:
+                job.status = JOB_FAILED
+                job.error = "CSV file is missing 'NIP' column."
+                return job
+            file.seek(0)
+            # Pegawai yang dihapus/diganti NIP oleh worker lain tidak boleh dipetakan dari cache lama
+            sync_versions()
+            batches = pd.read_csv(
+                file, thousands=".", dtype={"NIP": str}, chunksize=IMPORT_BATCH_ROWS
+            )
+            with rx.session() as session:
+                job.report = import_batches(
+                    session,
+                    batches,
+                    month=job.month,
+                    year=job.year,
+                    on_progress=on_progress,
+                    is_cancelled=job.cancel_event.is_set,
+                    content_hash=content_hash,
+                    filename=job.filename,
+                )
+        job.status = JOB_DONE
+    except ImportCancelled:
+        job.status = JOB_CANCELLED
+    except Exception as e:
+        print(f"Import job {job.id} failed: {e}")
+        job.status = JOB_FAILED
+        job.error = str(e)
+    return job
@@ -0,0 +1,197 @@
+"""Pivot tabel potongan satu bulan di memori proses.
+
+``month_pivot`` membaca pivot lengkap satu periode (semua pegawai, semua
+jenis potongan) sekali lalu menyimpannya di ``month_pivot_cache`` per
+(tahun, bulan). Jalur tulis menaikkan versi periode yang berubah (lihat
+``cache.bump_data_version``), jadi pindah bulan bolak-balik, ganti urutan
+atau pencarian tidak menjalankan query pivot lagi selama data periode itu
+tidak berubah. Setelah bulan dimuat, ``State.prefetch_adjacent_months``
+membaca pivot bulan sebelum dan sesudahnya di latar belakang, sehingga
+klik navigasi bulan berikutnya langsung dilayani dari cache.
+
+Pencarian, urutan, jumlah baris, halaman keyset dan indeks batas halaman
+dihitung di memori dengan urutan yang sama dengan SQL di ``queries``
+(NULL di awal urutan naik dan di akhir urutan turun, seri diurutkan id).
+Periode yang perkiraan ukurannya melebihi batas memori cache tidak dibaca
+ke memori; ``month_pivot`` mengembalikan None dan pemanggil memakai SQL.
+"""
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+
+import reflex as rx
+from sqlalchemy import text
+
+from .cache import month_pivot_cache, period_version
+from .catalog import Catalog
+from .queries import CURSOR_AFTER, CURSOR_BEFORE, CURSOR_FROM, entries_query, fold_case, search_term
+
+# Jumlah kombinasi (pencarian, urutan) yang disimpan per bulan
+_MAX_VIEWS = 4
+# Perkiraan byte per baris per view (list baris + key sort)
+_VIEW_ROW_BYTES = 120
+# Jumlah baris yang diukur untuk memperkirakan ukuran pivot
+_SIZE_SAMPLE = 100
+
+# Perkiraan byte per baris dari pivot terakhir yang dihitung (untuk menolak bulan yang terlalu besar)
+_row_bytes: Dict[int, int] = {}
+# (tahun, bulan, versi katalog) -> versi periode saat pivot terlalu besar untuk cache
+_too_large: Dict[tuple, Tuple[int, int]] = {}
+# Satu lock per pivot yang sedang dibaca (dibuang setelah selesai), agar prefetch dan klik navigasi tidak menghitung pivot yang sama dua kali
+_loading: Dict[tuple, threading.Lock] = {}
+_loading_lock = threading.Lock()
+
+
+class _Descending:
+    """Pembungkus nilai untuk urutan turun di dalam key sort/bisect."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _sort_key(value: Any, employee_id: int, descending: bool) -> tuple:
+    """Key yang urutannya sama dengan ``queries._order_by`` (ASC NULLS FIRST / DESC NULLS LAST, lalu id)."""
+    if descending:
+        return (value is None, None if value is None else _Descending(value), employee_id)
+    return (value is not None, value, employee_id)
+
+
+class MonthPivot:
+    """Baris pivot satu bulan (mapping seperti hasil ``entries_query``), urut id."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._views: "OrderedDict[tuple, Tuple[List[Dict[str, Any]], List[tuple]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        sample = rows[:_SIZE_SAMPLE]
+        sample_bytes = sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row.values())) for row in sample)
+        row_bytes = sample_bytes // len(sample) if sample else 0
+        self.nbytes = (row_bytes + _MAX_VIEWS * _VIEW_ROW_BYTES) * len(rows)
+
+    def _view(self, search_value: str, sort_column: str, sort_reverse: bool):
+        """(baris, key sort) yang cocok dengan pencarian, dalam urutan tabel."""
+        search = search_term(search_value)
+        descending = bool(sort_column) and sort_reverse
+        view_key = (search, sort_column, descending)
+        with self._lock:
+            view = self._views.get(view_key)
+            if view is not None:
+                self._views.move_to_end(view_key)
+                return view
+
+        rows = self.rows
+        if search:
+            rows = [
+                row for row in rows
+                if search in fold_case(row["name"]) or search in fold_case(row["nip"])
+            ]
+        if sort_column:
+            keyed = sorted(
+                ((_sort_key(row[sort_column], row["id"], descending), row) for row in rows), key=itemgetter(0)
+            )
+        else:
+            keyed = [((row["id"],), row) for row in rows]
+        view = ([row for _, row in keyed], [key for key, _ in keyed])
+        with self._lock:
+            self._views[view_key] = view
+            while len(self._views) > _MAX_VIEWS:
+                self._views.popitem(last=False)
+        return view
+
+    def count(self, search_value: str) -> int:
+        return len(self._view(search_value, "", False)[0])
+
+    def page(
+        self,
+        search_value: str,
+        sort_column: str,
+        sort_reverse: bool,
+        limit: int,
+        cursor: Tuple[Any, int] | None = None,
+        mode: str = CURSOR_AFTER,
+    ) -> List[Dict[str, Any]]:
+        """Satu halaman dalam urutan tabel; ``cursor``/``mode`` seperti ``queries.keyset_query``."""
+        rows, keys = self._view(search_value, sort_column, sort_reverse)
+        if cursor is None:
+            return rows[:limit]
+        if sort_column:
+            cursor_key = _sort_key(cursor[0], cursor[1], bool(sort_reverse))
+        else:
+            cursor_key = (cursor[1],)
+        if mode == CURSOR_BEFORE:
+            end = bisect_left(keys, cursor_key)
+            return rows[max(end - limit, 0):end]
+        start = bisect_right(keys, cursor_key) if mode != CURSOR_FROM else bisect_left(keys, cursor_key)
+        return rows[start:start + limit]
+
+    def boundaries(self, search_value: str, sort_column: str, sort_reverse: bool, limit: int) -> List[tuple]:
+        """Kursor (nilai kolom sort, id) baris pertama tiap halaman, seperti ``page_boundaries_query``."""
+        rows = self._view(search_value, sort_column, sort_reverse)[0]
+        return [(row[sort_column] if sort_column else None, row["id"]) for row in rows[::limit]]
+
+
+def month_pivot(catalog: Catalog, year: int, month: int) -> MonthPivot | None:
+    """Pivot bulan dari cache, atau dibaca dari database jika belum ada / data periode berubah.
+
+    Returns:
+        None jika perkiraan ukuran pivot melebihi ``month_pivot_cache.max_bytes``.
+    """
+    pivot = month_pivot_cache.get(year, month, catalog.version)
+    if pivot is not None:
+        return pivot
+
+    key = (year, month, catalog.version)
+    with _loading_lock:
+        lock = _loading.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            # Pemanggil lain (misalnya prefetch) mungkin baru selesai membaca pivot ini
+            pivot = month_pivot_cache.get(year, month, catalog.version)
+            if pivot is not None:
+                return pivot
+            return _load_month_pivot(catalog, year, month, key)
+    finally:
+        # Lock hanya diperlukan selama pivot dibaca; pemanggil berikutnya memakai cache
+        with _loading_lock:
+            if _loading.get(key) is lock:
+                del _loading[key]
+
+
+def _load_month_pivot(catalog: Catalog, year: int, month: int, key: tuple) -> MonthPivot | None:
+    version = period_version(year, month)
+    if _too_large.get(key) == version:
+        return None
+    sql, params, _ = entries_query(catalog, month, year)
+    with rx.session() as session:
+        row_bytes = _row_bytes.get(catalog.version)
+        if row_bytes is not None:
+            employees = session.execute(text("SELECT COUNT(*) FROM employees")).scalar_one()
+            if employees * row_bytes > month_pivot_cache.max_bytes:
+                _too_large[key] = version
+                return None
+        result = session.execute(text(sql), params)
+        columns = list(result.keys())
+        rows = [dict(zip(columns, row)) for row in result]
+    pivot = MonthPivot(rows)
+    if rows:
+        _row_bytes[catalog.version] = pivot.nbytes // len(rows)
+    if not month_pivot_cache.put(year, month, catalog.version, pivot, pivot.nbytes, version):
+        _too_large[key] = version
+        print(f"Month pivot {year}-{month:02d} ({pivot.nbytes} bytes) exceeds the cache limit; using SQL paging")
+    return pivot
+
+
+def adjacent_periods(year: int, month: int) -> List[Tuple[int, int]]:
+    """Periode (tahun, bulan) sesudah dan sebelum periode ini, urutan prefetch."""
+    index = year * 12 + month - 1
+    return [((index + step) // 12, (index + step) % 12 + 1) for step in (1, -1)]
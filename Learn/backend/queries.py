@@ -0,0 +1,428 @@
+"""Query SQL untuk tabel potongan (pivot per pegawai per bulan).
+
+Pencarian (nama/NIP), ORDER BY dan paging dikerjakan di database. Halaman
+tabel memakai keyset pagination: halaman berikut/sebelumnya dibaca dari
+kursor (nilai kolom sort, id) baris terakhir/pertama halaman aktif, bukan
+OFFSET, sehingga halaman ke-5000 sama murahnya dengan halaman pertama dan
+tidak bergeser saat ada pegawai baru. Lompat ke halaman N memakai indeks
+batas halaman (kursor awal tiap halaman) dari ``page_boundaries_query``.
+"""
+import string
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+from .catalog import Catalog, DeductionType
+
+# Kolom tetap yang boleh dipakai untuk ORDER BY (whitelist, karena disisipkan ke SQL);
+# selain ini, nama jenis potongan di katalog juga boleh dipakai
+SORT_COLUMNS = ("name", "nip", "total_potongan", "date", "status", "payment_type")
+# Urutan yang bisa dibaca langsung dari index tabel employees (tanpa menghitung pivot semua pegawai)
+_EMPLOYEE_SORTS = ("", "name", "nip")
+# Arah kursor keyset: setelah kursor, mulai dari kursor (inklusif), sebelum kursor
+CURSOR_AFTER = "after"
+CURSOR_FROM = "from"
+CURSOR_BEFORE = "before"
+
+_SEARCH_FILTER = """
+    (:search = '' OR LOWER(e.name) LIKE :pattern ESCAPE '\\' OR LOWER(e.nip) LIKE :pattern ESCAPE '\\')
+"""
+
+
+# SQLite LOWER/LIKE hanya mengabaikan huruf besar-kecil untuk huruf ASCII
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_case(value: str) -> str:
+    """Huruf kecil seperti ``LOWER()`` SQLite (hanya A-Z); dipakai semua jalur pencarian.
+
+    ``str.lower`` juga mengubah huruf non-ASCII, sehingga hasil pencarian di
+    memori bisa berbeda dengan SQL untuk nama seperti "Élise".
+    """
+    return (value or "").translate(_ASCII_LOWER)
+
+
+def search_term(search_value: str) -> str:
+    """Kata kunci pencarian yang sudah dinormalisasi (trim + ``fold_case``)."""
+    return fold_case((search_value or "").strip())
+
+
+def _search_params(search_value: str) -> Dict[str, Any]:
+    search = search_term(search_value)
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return {"search": search, "pattern": f"%{escaped}%"}
+
+
+def _pivot_cases(deductions: Iterable[DeductionType]) -> str:
+    return "".join(
+        f"MAX(CASE WHEN ed.deduction_id = {deduction.id} THEN ed.amount END) AS {deduction.alias},\n"
+        for deduction in deductions
+    )
+
+
+def _pivot_select(pivot_cases: str, source: str, where: str = "") -> str:
+    """SELECT pivot satu baris per pegawai dari ``source`` (alias ``e``: id, name, nip)."""
+    return f"""
+            SELECT
+                e.id,
+                e.name,
+                e.nip,
+                {pivot_cases}
+                NULLIF(SUM(ed.amount), 0) AS total_potongan,
+                MAX(ed.updated_at) AS date,
+                MAX(ed.payment_status) AS status,
+                MAX(ed.payment_type) AS payment_type
+            FROM {source}
+            LEFT JOIN employee_deductions ed ON ed.employee_id = e.id
+                AND ed.month = :month
+                AND ed.year = :year
+            {where}
+            GROUP BY e.id, e.name, e.nip
+    """
+
+
+def _order_by(column: str, sort_reverse: bool, backward: bool = False, id_column: str = "id") -> str:
+    """ORDER BY tabel: kolom sort (ASC NULLS FIRST / DESC NULLS LAST) lalu id; ``backward`` membalik semuanya."""
+    if not column:
+        return f"{id_column} DESC" if backward else id_column
+    descending = sort_reverse != backward
+    direction = "DESC NULLS LAST" if descending else "ASC NULLS FIRST"
+    return f"{column} {direction}, {id_column}{' DESC' if backward else ''}"
+
+
+def _keyset_predicate(column: str, sort_reverse: bool, mode: str, value_is_null: bool, id_column: str = "id") -> str:
+    """Kondisi baris setelah / mulai dari / sebelum kursor (:cursor_value, :cursor_id) dalam urutan ``_order_by``."""
+    id_op = {CURSOR_AFTER: ">", CURSOR_FROM: ">=", CURSOR_BEFORE: "<"}[mode]
+    if not column:
+        return f"{id_column} {id_op} :cursor_id"
+    forward = mode != CURSOR_BEFORE
+    # NULL ada di awal urutan naik dan di akhir urutan turun; termasuk rentang jika searah pencarian
+    nulls_in_range = sort_reverse == forward
+    value_op = ">" if forward != sort_reverse else "<"
+    if value_is_null:
+        condition = f"{column} IS NULL AND {id_column} {id_op} :cursor_id"
+        return f"({condition})" if nulls_in_range else f"(({condition}) OR {column} IS NOT NULL)"
+    condition = f"{column} {value_op} :cursor_value OR ({column} = :cursor_value AND {id_column} {id_op} :cursor_id)"
+    return f"({condition} OR {column} IS NULL)" if nulls_in_range else f"({condition})"
+
+
+def _resolve_sort(catalog: Catalog, sort_value: str, deductions: Tuple[DeductionType, ...]):
+    """(kolom sort, jenis potongan yang dipivot); potongan yang dipakai sort ikut dipivot."""
+    if sort_value in SORT_COLUMNS:
+        return sort_value, deductions
+    sorted_deduction = catalog.by_name().get(sort_value)
+    if sorted_deduction is None:
+        return "", deductions
+    if sorted_deduction not in deductions:
+        deductions = catalog.select({*(d.name for d in deductions), sort_value})
+    return sorted_deduction.alias, deductions
+
+
+def resolve_sort_column(catalog: Catalog, sort_value: str) -> str:
+    """Nama kolom hasil pivot untuk ``sort_value`` ("" berarti urut id)."""
+    return _resolve_sort(catalog, sort_value, ())[0]
+
+
+@lru_cache(maxsize=128)
+def _entries_sql(
+    catalog_version: int,
+    deductions: Tuple[DeductionType, ...],
+    sort_column: str,
+    sort_reverse: bool,
+    paged: bool,
+    single: bool = False,
+) -> str:
+    """SQL pivot untuk satu kombinasi kolom/urutan; di-cache per versi katalog."""
+    pivot_cases = _pivot_cases(deductions)
+    order_by = _order_by(sort_column, sort_reverse)
+    employee_filter = "AND e.id = :employee_id" if single else ""
+    pivot = _pivot_select(pivot_cases, "employees e", f"WHERE {_SEARCH_FILTER}{employee_filter}")
+
+    sql = f"""
+        WITH pivot AS ({pivot})
+        SELECT *
+        FROM pivot
+        ORDER BY {order_by}
+    """
+    if paged:
+        sql += "\n        LIMIT :limit OFFSET :offset"
+    return sql
+
+
+def entries_query(
+    catalog: Catalog,
+    month: int,
+    year: int,
+    search_value: str = "",
+    sort_value: str = "",
+    sort_reverse: bool = False,
+    limit: int | None = None,
+    offset: int = 0,
+    columns: Iterable[str] | None = None,
+    employee_id: int | None = None,
+) -> Tuple[str, Dict[str, Any], Tuple[DeductionType, ...]]:
+    """Bangun query pivot potongan satu bulan.
+
+    Satu kolom nominal per jenis potongan di katalog (alias ``DeductionType.alias``);
+    ``columns`` membatasi jenis potongan yang dipivot. ``total_potongan``
+    selalu dihitung dari semua potongan.
+
+    Args:
+        catalog: Katalog potongan (lihat ``catalog.load_catalog``).
+        month: Bulan periode.
+        year: Tahun periode.
+        search_value: Kata kunci nama/NIP (case-insensitive, substring).
+        sort_value: Kolom di ``SORT_COLUMNS`` atau nama potongan; kosong berarti urut id.
+        sort_reverse: Urutan menurun jika True.
+        limit: Jumlah baris per halaman; None berarti semua baris.
+        offset: Jumlah baris yang dilewati.
+        columns: Nama potongan yang dipivot; None berarti semua.
+        employee_id: Hanya baris pegawai ini (tetap dengan filter pencarian).
+
+    Returns:
+        Tuple (sql, params, jenis potongan yang dipivot) untuk
+        ``session.execute(text(sql), params)``.
+    """
+    sort_column, deductions = _resolve_sort(catalog, sort_value, catalog.select(columns))
+    single = employee_id is not None
+    sql = _entries_sql(catalog.version, deductions, sort_column, sort_reverse, limit is not None, single)
+    params = {"month": month, "year": year, **_search_params(search_value)}
+    if single:
+        params["employee_id"] = employee_id
+    if limit is not None:
+        params.update(limit=limit, offset=offset)
+    return sql, params, deductions
+
+
+@lru_cache(maxsize=256)
+def _keyset_sql(
+    catalog_version: int,
+    deductions: Tuple[DeductionType, ...],
+    sort_column: str,
+    sort_reverse: bool,
+    mode: str,
+    value_is_null: bool,
+) -> str:
+    """SQL satu halaman keyset; di-cache per versi katalog, urutan dan arah kursor."""
+    pivot_cases = _pivot_cases(deductions)
+    backward = mode == CURSOR_BEFORE
+    if sort_column in _EMPLOYEE_SORTS:
+        # Urutan dari tabel employees: pilih id halaman lewat index dulu, baru pivot pegawai di halaman itu
+        e_column = f"e.{sort_column}" if sort_column else ""
+        cursor = f"AND {_keyset_predicate(e_column, sort_reverse, mode, value_is_null, 'e.id')}" if mode else ""
+        page = f"""(
+                SELECT e.id, e.name, e.nip
+                FROM employees e
+                WHERE {_SEARCH_FILTER} {cursor}
+                ORDER BY {_order_by(e_column, sort_reverse, backward, 'e.id')}
+                LIMIT :limit
+            ) e"""
+        return f"""
+            {_pivot_select(pivot_cases, page)}
+            ORDER BY {_order_by(e_column, sort_reverse, backward, 'e.id')}
+        """
+    cursor = f"WHERE {_keyset_predicate(sort_column, sort_reverse, mode, value_is_null)}" if mode else ""
+    pivot = _pivot_select(pivot_cases, "employees e", f"WHERE {_SEARCH_FILTER}")
+    return f"""
+        WITH pivot AS ({pivot})
+        SELECT *
+        FROM pivot
+        {cursor}
+        ORDER BY {_order_by(sort_column, sort_reverse, backward)}
+        LIMIT :limit
+    """
+
+
+def keyset_query(
+    catalog: Catalog,
+    month: int,
+    year: int,
+    search_value: str = "",
+    sort_value: str = "",
+    sort_reverse: bool = False,
+    limit: int = 10,
+    cursor: Tuple[Any, int] | None = None,
+    mode: str = CURSOR_AFTER,
+    columns: Iterable[str] | None = None,
+) -> Tuple[str, Dict[str, Any], Tuple[DeductionType, ...], str]:
+    """Bangun query satu halaman tabel dengan keyset pagination.
+
+    Args:
+        catalog: Katalog potongan (lihat ``catalog.load_catalog``).
+        month: Bulan periode.
+        year: Tahun periode.
+        search_value: Kata kunci nama/NIP.
+        sort_value: Kolom di ``SORT_COLUMNS`` atau nama potongan; kosong berarti urut id.
+        sort_reverse: Urutan menurun jika True.
+        limit: Jumlah baris per halaman.
+        cursor: (nilai kolom sort, id) batas halaman; None berarti halaman pertama.
+        mode: ``CURSOR_AFTER`` (halaman berikut), ``CURSOR_FROM`` (halaman yang
+            dimulai di kursor) atau ``CURSOR_BEFORE`` (halaman sebelumnya; baris
+            dikembalikan dalam urutan terbalik).
+        columns: Nama potongan yang dipivot; None berarti semua.
+
+    Returns:
+        Tuple (sql, params, jenis potongan yang dipivot, kolom kursor). Kolom
+        kursor adalah nama kolom hasil yang menjadi nilai kursor ("" untuk urut id).
+    """
+    sort_column, deductions = _resolve_sort(catalog, sort_value, catalog.select(columns))
+    params = {"month": month, "year": year, "limit": limit, **_search_params(search_value)}
+    if cursor is None:
+        mode, value_is_null = "", False
+    else:
+        params.update(cursor_value=cursor[0], cursor_id=cursor[1])
+        value_is_null = cursor[0] is None
+    sql = _keyset_sql(catalog.version, deductions, sort_column, sort_reverse, mode, value_is_null)
+    return sql, params, deductions, sort_column
+
+
+@lru_cache(maxsize=64)
+def _boundaries_sql(catalog_version: int, deduction: DeductionType | None, sort_column: str, sort_reverse: bool) -> str:
+    if sort_column in _EMPLOYEE_SORTS:
+        source = f"""
+            SELECT {f"e.{sort_column}" if sort_column else "NULL"} AS sort_value, e.id
+            FROM employees e
+            WHERE {_SEARCH_FILTER}
+        """
+    else:
+        # Hanya kolom sort yang dipivot (total/tanggal/status/type atau satu potongan)
+        pivot = _pivot_select(_pivot_cases([deduction] if deduction else []), "employees e", f"WHERE {_SEARCH_FILTER}")
+        source = f"SELECT {sort_column} AS sort_value, id FROM ({pivot}) pivot"
+    order_by = _order_by("sort_value" if sort_column else "", sort_reverse)
+    return f"""
+        SELECT sort_value, id
+        FROM (
+            SELECT sort_value, id, ROW_NUMBER() OVER (ORDER BY {order_by}) AS row_number
+            FROM ({source}) keys
+        ) numbered
+        WHERE (row_number - 1) % :limit = 0
+        ORDER BY row_number
+    """
+
+
+def page_boundaries_query(
+    catalog: Catalog,
+    month: int,
+    year: int,
+    search_value: str = "",
+    sort_value: str = "",
+    sort_reverse: bool = False,
+    limit: int = 10,
+) -> Tuple[str, Dict[str, Any]]:
+    """Kursor (nilai kolom sort, id) baris pertama setiap halaman, urut nomor halaman.
+
+    Kursor halaman N dipakai dengan ``keyset_query(..., mode=CURSOR_FROM)``.
+    """
+    sort_column, deductions = _resolve_sort(catalog, sort_value, ())
+    deduction = deductions[0] if deductions else None
+    sql = _boundaries_sql(catalog.version, deduction, sort_column, sort_reverse)
+    params = {"month": month, "year": year, "limit": limit, **_search_params(search_value)}
+    return sql, params
+
+
+def pivot_amounts(row: Mapping[str, Any], deductions: Iterable[DeductionType]) -> Dict[str, Any]:
+    """Nominal per nama potongan dari satu baris hasil ``entries_query``."""
+    return {deduction.name: row[deduction.alias] for deduction in deductions}
+
+
+def count_query(search_value: str = "") -> Tuple[str, Dict[str, Any]]:
+    """Query jumlah baris pivot (satu baris per pegawai yang cocok dengan pencarian)."""
+    sql = f"""
+        SELECT COUNT(*)
+        FROM employees e
+        WHERE {_SEARCH_FILTER}
+    """
+    return sql, _search_params(search_value)
+
+
+# Rekap tahunan satu pegawai per jenis potongan (id) dan bulan (export recap, chart Recap Employees)
+EMPLOYEE_RECAP_SQL = """
+    SELECT 
+        ed.deduction_id,
+        ed.month,
+        SUM(ed.amount) as amount
+    FROM employee_deductions ed
+    WHERE ed.employee_id = :employee_id
+    AND ed.year = :year
+    GROUP BY ed.deduction_id, ed.month
+"""
+
+# Kartu statistik satu periode: jumlah pegawai dan total potongan, dikelompokkan menurut
+# kapan data pegawai itu terakhir diubah (bulan kalender ini / bulan lalu). Memakai
+# index (year, month); hasilnya satu baris berapa pun jumlah pegawainya.
+MONTH_STATS_SQL = """
+    WITH per_employee AS (
+        SELECT
+            employee_deductions.employee_id,
+            MAX(employee_deductions.updated_at) AS updated_at,
+            COALESCE(SUM(employee_deductions.amount), 0) AS total
+        FROM employee_deductions
+        -- Hanya pegawai yang masih ada, sama seperti pivot tabel
+        JOIN employees e ON e.id = employee_deductions.employee_id
+        WHERE employee_deductions.year = :year AND employee_deductions.month = :month
+        GROUP BY employee_deductions.employee_id
+    )
+    SELECT
+        COUNT(CASE WHEN updated_at >= :current_start THEN 1 END) AS current_entries,
+        COALESCE(SUM(CASE WHEN updated_at >= :current_start THEN total END), 0) AS current_total,
+        COUNT(CASE WHEN updated_at >= :previous_start AND updated_at < :current_start THEN 1 END) AS previous_entries,
+        COALESCE(SUM(CASE WHEN updated_at >= :previous_start AND updated_at < :current_start THEN total END), 0)
+            AS previous_total
+    FROM per_employee
+"""
+
+# Jumlah pegawai per status pembayaran (pie chart)
+PAYMENT_STATUS_MONTHLY_SQL = """
+    SELECT 
+        COALESCE(payment_status, 'Unknown') as status,
+        COUNT(DISTINCT employee_id) as count
+    FROM employee_deductions
+    WHERE month = :month AND year = :year
+    GROUP BY payment_status
+"""
+
+PAYMENT_STATUS_YEARLY_SQL = """
+    SELECT 
+        COALESCE(payment_status, 'Unknown') as status,
+        COUNT(DISTINCT employee_id) as count
+    FROM employee_deductions
+    WHERE year = :year
+    GROUP BY payment_status
+"""
+
+
+@lru_cache(maxsize=8)
+def _area_chart_sql(catalog_version: int, deductions: Tuple[DeductionType, ...]) -> str:
+    columns = "".join(
+        f",\n            SUM(CASE WHEN r.deduction_id = {deduction.id} THEN r.total_amount ELSE 0 END) AS {deduction.alias}"
+        for deduction in deductions
+    )
+    return f"""
+        SELECT
+            r.month,
+            r.year{columns}
+        FROM deduction_rollups r
+        WHERE (r.year = :current_year AND r.month <= :current_month)
+        OR (r.year = :previous_year AND r.month > :current_month)
+        GROUP BY r.year, r.month
+        ORDER BY r.year, r.month
+    """
+
+
+def area_chart_query(catalog: Catalog) -> str:
+    """Total per jenis potongan untuk 12 bulan terakhir (area chart), dibaca dari tabel rollup."""
+    return _area_chart_sql(catalog.version, catalog.types)
+
+
+# Rekap tahunan semua pegawai dalam satu query; diurutkan per pegawai agar bisa ditulis secara streaming
+ALL_EMPLOYEES_RECAP_SQL = """
+    SELECT
+        e.id,
+        e.name,
+        ed.deduction_id,
+        ed.month,
+        SUM(ed.amount) AS amount
+    FROM employees e
+    LEFT JOIN employee_deductions ed ON ed.employee_id = e.id AND ed.year = :year
+    GROUP BY e.id, e.name, ed.deduction_id, ed.month
+    ORDER BY e.name, e.id
+"""
@@ -0,0 +1,142 @@
+"""Tabel rekap (rollup) total potongan per periode.
+
+``deduction_rollups`` menyimpan SUM(amount) dan jumlah baris per
+(tahun, bulan, jenis potongan, status pembayaran). Dashboard (area chart)
+membaca tabel kecil ini, bukan meng-agregasi seluruh employee_deductions.
+
+Edit satu pegawai (tambah/ubah/hapus) mencatat nominal dan status lama/baru
+tiap baris yang berubah di ``RollupDelta`` lalu menerapkan selisihnya
+dengan upsert per key rollup, di dalam transaksi yang sama. Import CSV
+menulis banyak baris sekaligus, jadi memanggil ``refresh_periods`` yang
+menghitung ulang periode yang tersentuh lewat index
+``ix_employee_deductions_year_month``. ``rebuild_rollups`` menghitung ulang
+semuanya (lihat ``scripts/rebuild_rollups.py``).
+
+Yang tetap membaca employee_deductions langsung, karena grain rollup
+(periode, potongan, status) tidak memuat pegawai:
+
+- pie chart status pembayaran menghitung pegawai unik (COUNT DISTINCT
+  employee_id) per status; jumlah itu tidak bisa dijumlahkan dari total
+  per potongan, dan untuk timeframe tahunan tidak bisa dijumlahkan per bulan;
+- recap satu pegawai (export ``employee_recap`` dan chart Recap Employees)
+  membaca nominal satu pegawai; query-nya memakai index
+  ``ix_employee_deductions_employee_year`` dan hanya menyentuh baris pegawai itu.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import text
+
+_DELETE_PERIOD_SQL = """
+    DELETE FROM deduction_rollups
+    WHERE year = :year AND month = :month
+"""
+
+_INSERT_SQL = """
+    INSERT INTO deduction_rollups (year, month, deduction_id, payment_status, total_amount, entry_count)
+    SELECT
+        year,
+        month,
+        deduction_id,
+        COALESCE(payment_status, 'unpaid'),
+        COALESCE(SUM(amount), 0),
+        COUNT(*)
+    FROM employee_deductions
+    {where}
+    GROUP BY year, month, deduction_id, COALESCE(payment_status, 'unpaid')
+"""
+
+_UPSERT_DELTA_SQL = """
+    INSERT INTO deduction_rollups (year, month, deduction_id, payment_status, total_amount, entry_count)
+    VALUES (:year, :month, :deduction_id, :payment_status, :amount, :count)
+    ON CONFLICT (year, month, deduction_id, payment_status) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        entry_count = entry_count + excluded.entry_count
+"""
+
+# Key yang tidak lagi punya baris dihapus, sama seperti hasil hitung ulang
+_DELETE_EMPTY_SQL = """
+    DELETE FROM deduction_rollups
+    WHERE year = :year AND month = :month AND deduction_id = :deduction_id
+        AND payment_status = :payment_status AND entry_count <= 0
+"""
+
+_EMPLOYEE_ROWS_SQL = """
+    SELECT year, month, deduction_id, COALESCE(payment_status, 'unpaid'), COALESCE(SUM(amount), 0), COUNT(*)
+    FROM employee_deductions
+    WHERE employee_id = :employee_id
+    GROUP BY year, month, deduction_id, COALESCE(payment_status, 'unpaid')
+"""
+
+
+def refresh_periods(session, periods: Iterable[Tuple[int, int]]) -> None:
+    """Hitung ulang baris rollup untuk periode (tahun, bulan) yang diberikan.
+
+    Tidak melakukan commit; dipanggil sebelum commit oleh penulis data.
+    """
+    insert_period = text(_INSERT_SQL.format(where="WHERE year = :year AND month = :month"))
+    for year, month in sorted(set(periods)):
+        params = {"year": year, "month": month}
+        session.execute(text(_DELETE_PERIOD_SQL), params)
+        session.execute(insert_period, params)
+
+
+class RollupDelta:
+    """Selisih rollup dari baris employee_deductions yang diubah satu per satu.
+
+    Setiap baris yang berubah dicatat dengan ``remove`` (nilai lama) dan/atau
+    ``add`` (nilai baru); ``apply`` menulis selisih per key rollup tanpa
+    membaca employee_deductions lagi.
+    """
+
+    def __init__(self):
+        self._changes: Dict[Tuple[int, int, int, str], List[int]] = {}
+
+    def add(self, year: int, month: int, deduction_id: int, payment_status: str | None,
+            amount: int | None, count: int = 1) -> None:
+        """Baris baru (atau nilai baru baris yang diubah); ``count`` > 1 untuk baris yang sudah dijumlahkan."""
+        change = self._changes.setdefault((year, month, deduction_id, payment_status or "unpaid"), [0, 0])
+        change[0] += amount or 0
+        change[1] += count
+
+    def remove(self, year: int, month: int, deduction_id: int, payment_status: str | None,
+               amount: int | None, count: int = 1) -> None:
+        """Baris yang dihapus (atau nilai lama baris yang diubah)."""
+        self.add(year, month, deduction_id, payment_status, -(amount or 0), -count)
+
+    @property
+    def periods(self) -> Set[Tuple[int, int]]:
+        return {(year, month) for year, month, _, _ in self._changes}
+
+    def apply(self, session) -> None:
+        """Terapkan selisih ke deduction_rollups (tanpa commit)."""
+        params = [
+            {"year": year, "month": month, "deduction_id": deduction_id, "payment_status": status,
+             "amount": amount, "count": count}
+            for (year, month, deduction_id, status), (amount, count) in sorted(self._changes.items())
+            if amount or count
+        ]
+        if not params:
+            return
+        session.execute(text(_UPSERT_DELTA_SQL), params)
+        emptied = [param for param in params if param["count"] < 0]
+        if emptied:
+            session.execute(text(_DELETE_EMPTY_SQL), emptied)
+
+
+def remove_employee_rows(session, employee_id: int, delta: RollupDelta) -> None:
+    """Catat semua baris potongan satu pegawai sebagai dihapus (satu query agregat lewat index pegawai)."""
+    rows = session.execute(text(_EMPLOYEE_ROWS_SQL), {"employee_id": employee_id})
+    for year, month, deduction_id, status, amount, count in rows:
+        delta.remove(year, month, deduction_id, status, amount, count)
+
+
+def rebuild_rollups(session) -> int:
+    """Bangun ulang seluruh tabel rollup dari employee_deductions.
+
+    Returns:
+        Jumlah baris rollup yang ditulis (di-commit oleh fungsi ini).
+    """
+    session.execute(text("DELETE FROM deduction_rollups"))
+    session.execute(text(_INSERT_SQL.format(where="")))
+    session.commit()
+    return session.execute(text("SELECT COUNT(*) FROM deduction_rollups")).scalar_one()
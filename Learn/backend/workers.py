@@ -0,0 +1,90 @@
+"""Pool thread terbatas untuk pekerjaan blocking (pandas, query database) dari handler async.
+
+Handler async Reflex berjalan di event loop yang sama untuk semua sesi. Kode
+sinkron seperti ``pd.read_csv`` atau ``rx.session()`` yang dijalankan langsung
+di handler membuat event milik sesi lain tertahan sampai kode itu selesai.
+``run_blocking`` memindahkan pekerjaan tersebut ke thread pool:
+
+- ``MAX_WORKERS`` membatasi jumlah pekerjaan yang berjalan bersamaan
+  (juga jumlah koneksi database yang dipakai pool ini).
+- ``MAX_PENDING`` membatasi pekerjaan yang sedang berjalan + mengantre. Jika
+  penuh, pemanggil menunggu (tanpa memblokir event loop) sampai ada slot
+  kosong; ini backpressure agar antrean tidak tumbuh tanpa batas.
+
+``LoopLagMonitor`` mengukur keterlambatan event loop (lag) secara berkala
+sehingga dampak pekerjaan blocking yang tersisa bisa terlihat.
+"""
+import asyncio
+import functools
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+MAX_WORKERS = int(os.environ.get("BLOCKING_POOL_WORKERS", "4"))
+MAX_PENDING = int(os.environ.get("BLOCKING_POOL_MAX_PENDING", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="blocking")
+# Satu semaphore per event loop (asyncio.Semaphore terikat pada loop tempat ia dipakai)
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_pending = 0
+
+
+def _loop_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = _slots[loop] = asyncio.Semaphore(MAX_PENDING)
+    return slots
+
+
+def pending_jobs() -> int:
+    """Jumlah pekerjaan yang sedang berjalan atau mengantre di pool."""
+    return _pending
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Jalankan fungsi sinkron di thread pool dan tunggu hasilnya tanpa memblokir event loop."""
+    global _pending
+    async with _loop_slots():
+        _pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            _pending -= 1
+
+
+class LoopLagMonitor:
+    """Ukur lag event loop: selisih antara waktu bangun yang diharapkan dan yang terjadi."""
+
+    def __init__(self, interval: float = 0.1, warn_after: float = 0.25):
+        self.interval = interval
+        self.warn_after = warn_after
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.samples = 0
+
+    def reset(self) -> None:
+        self.max_lag = self.last_lag = 0.0
+        self.samples = 0
+
+    async def run(self) -> None:
+        """Loop pengukuran; dijalankan sebagai lifespan task aplikasi."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.samples += 1
+            if lag >= self.warn_after:
+                print(f"Event loop lag {lag * 1000:.0f}ms ({pending_jobs()} blocking jobs pending)")
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -91,10 +91,10 @@ def stats_card(
 def stats_cards_group() -> rx.Component:
     return rx.flex(
         stats_card(
-            "Total Customers",
-            State.current_month_values.num_customers,
-            State.previous_month_values.num_customers,
-            State.customers_change,
+            "Total Entries",
+            State.current_month_values.num_entries,
+            State.previous_month_values.num_entries,
+            State.entries_change,
             "users",
             "blue",
         ),
@@ -107,14 +107,6 @@ def stats_cards_group() -> rx.Component:
             "orange",
             "$",
         ),
-        stats_card(
-            "Total Delivers",
-            State.current_month_values.num_delivers,
-            State.previous_month_values.num_delivers,
-            State.delivers_change,
-            "truck",
-            "ruby",
-        ),
         spacing="5",
         width="100%",
         wrap="wrap",
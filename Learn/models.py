@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Dict, Union
+
+import reflex as rx
+import sqlalchemy
+from sqlmodel import Field
+
+# ---------------------------
+# Model-Model Baru
+# ---------------------------
+
+class Employee(rx.Model, table=True):
+    """Model untuk data pegawai."""
+    __tablename__ = "employees"
+    __table_args__ = (
+        sqlalchemy.Index("ux_employees_nip", "nip", unique=True),
+        sqlalchemy.Index("ix_employees_name", "name", "id"),
+    )
+    name: str
+    nip: str
+
+
+class Deduction(rx.Model, table=True):
+    """Model untuk jenis potongan."""
+    __tablename__ = "deductions"
+    __table_args__ = (
+        sqlalchemy.Index("ux_deductions_name", "name", unique=True),
+    )
+    name: str
+
+
+class EmployeeDeduction(rx.Model, table=True):
+    """Model untuk data potongan tiap pegawai per periode."""
+    __tablename__ = "employee_deductions"
+    __table_args__ = (
+        # Satu baris per (pegawai, potongan, bulan, tahun); dipakai oleh upsert import CSV
+        sqlalchemy.Index(
+            "uq_employee_deductions_period",
+            "employee_id", "deduction_id", "month", "year",
+            unique=True,
+        ),
+        # Query per periode (pivot bulanan, pie chart, area chart); covering untuk agregat
+        sqlalchemy.Index(
+            "ix_employee_deductions_year_month",
+            "year", "month", "deduction_id", "payment_status", "employee_id", "amount",
+        ),
+        # Query per pegawai per tahun (chart Recap Employees, export recap, join pivot)
+        sqlalchemy.Index(
+            "ix_employee_deductions_employee_year",
+            "employee_id", "year", "month", "deduction_id", "amount",
+        ),
+    )
+    employee_id: int
+    deduction_id: int
+    amount: int | None = None
+    payment_status: str = "unpaid"  # nilai default 'unpaid'
+    payment_type: Union[str, None] = None  # 'cash' atau 'transfer'
+    month: int
+    year: int
+    created_at: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    updated_at: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+class DeductionRollup(rx.Model, table=True):
+    """Rekap total potongan per (tahun, bulan, potongan, status pembayaran).
+
+    Dipelihara oleh ``backend.rollup`` setiap kali employee_deductions ditulis.
+    """
+    __tablename__ = "deduction_rollups"
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ux_deduction_rollups_period",
+            "year", "month", "deduction_id", "payment_status",
+            unique=True,
+        ),
+    )
+    year: int
+    month: int
+    deduction_id: int
+    payment_status: str
+    total_amount: int = 0
+    entry_count: int = 0
+
+
+class ImportFingerprint(rx.Model, table=True):
+    """Sidik jari baris CSV terakhir yang diimport per (pegawai, periode).
+
+    Hash dari NIP, periode, semua nominal potongan, status dan type; dipakai
+    import untuk melewati baris yang tidak berubah (lihat ``backend.fingerprints``).
+    """
+    __tablename__ = "import_fingerprints"
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ux_import_fingerprints_period",
+            "year", "month", "employee_id",
+            unique=True,
+        ),
+        sqlalchemy.Index("ix_import_fingerprints_employee", "employee_id"),
+    )
+    employee_id: int
+    year: int
+    month: int
+    fingerprint: int = Field(sa_type=sqlalchemy.BigInteger)
+
+
+class ImportedFile(rx.Model, table=True):
+    """File CSV terakhir yang diimport ke satu periode (hash SHA-256 isinya)."""
+    __tablename__ = "imported_files"
+    __table_args__ = (
+        sqlalchemy.Index("ux_imported_files_period", "year", "month", unique=True),
+    )
+    year: int
+    month: int
+    sha256: str
+    filename: str
+    row_count: int = 0
+    imported_at: str = Field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+class DataVersion(rx.Model, table=True):
+    """Versi data bersama untuk semua proses worker (lihat ``backend.cache``).
+
+    Satu baris per scope: ``data`` (naik di setiap penulisan), ``epoch``
+    (perubahan yang menyentuh semua periode), ``deductions`` (katalog) dan
+    ``period:YYYY-MM``. Dinaikkan di transaksi yang sama dengan penulisannya.
+    """
+    __tablename__ = "data_versions"
+    __table_args__ = (
+        sqlalchemy.Index("ux_data_versions_scope", "scope", unique=True),
+    )
+    scope: str
+    version: int = 0
+
+
+# Jika dibutuhkan, model untuk _view data_ (bukan tabel) bisa dibuat secara dinamis
+# Contoh: EmployeeDeductionEntry (dipakai untuk menampung hasil join/pivot)
+class EmployeeDeductionEntry(rx.Model):
+    id: int
+    name: str
+    nip: str
+    # Nominal per nama jenis potongan (katalog dari tabel deductions)
+    amounts: Dict[str, int | None] = {}
+    total_potongan: int | None = None
+    date: str | None = None
+    status: str | None = None
+    payment_type: str | None = None
@@ -6,16 +6,12 @@ from .. import styles
 from ..templates import template
 from ..components.card import card
 from ..views.acquisition_view import barchart_v2
+from ..backend.backend import State
 from ..views.charts import (
     StatsState,
+    active_deduction_tab,
     area_toggle,
-    arisan_chart,
-    iuran_dw_chart,
-    simpanan_wajib_koperasi_chart,
-    belanja_koperasi_chart,
-    simpanan_pokok_chart,
-    kredit_khusus_chart,
-    kredit_barang_chart,
+    deduction_charts,
     timeframe_select,
     pie_chart,
 )
@@ -63,30 +59,18 @@ def index() -> rx.Component:
             rx.hstack(
                 tab_content_header(),
                 rx.segmented_control.root(
-                    rx.segmented_control.item("Arisan", value="arisan"),
-                    rx.segmented_control.item("Iuran DW", value="iuran_dw"),
-                    rx.segmented_control.item("S. Wajib", value="simpanan_wajib_koperasi"),
-                    rx.segmented_control.item("B. Koperasi", value="belanja_koperasi"),
-                    rx.segmented_control.item("S. Pokok", value="simpanan_pokok"),
-                    rx.segmented_control.item("K. Khusus", value="kredit_khusus"),
-                    rx.segmented_control.item("K. Barang", value="kredit_barang"),
+                    rx.foreach(
+                        State.deduction_tabs,
+                        lambda tab: rx.segmented_control.item(tab["label"], value=tab["name"]),
+                    ),
                     margin_bottom="1.5em",
-                    default_value="arisan",
+                    value=active_deduction_tab(),
                     on_change=StatsState.set_selected_tab,
                 ),
                 width="100%",
                 justify="between",
             ),
-            rx.match(
-                StatsState.selected_tab,
-                ("arisan", arisan_chart()),
-                ("iuran_dw", iuran_dw_chart()),
-                ("simpanan_wajib_koperasi", simpanan_wajib_koperasi_chart()),
-                ("belanja_koperasi", belanja_koperasi_chart()),
-                ("simpanan_pokok", simpanan_pokok_chart()),
-                ("kredit_khusus", kredit_khusus_chart()),
-                ("kredit_barang", kredit_barang_chart()),
-            ),
+            deduction_charts(active_deduction_tab()),
         ),
         rx.grid(
             card(
@@ -88,8 +88,7 @@ def barchart_v2()-> rx.Component:
                     on_click=State.search_employee,
                 ),
                 rx.select(
-                    ["Arisan", "Iuran DW", "Simpanan Wajib Koperasi", "Belanja Koperasi", 
-                     "Simpanan Pokok", "Kredit Khusus", "Kredit Barang"],
+                    State.deduction_names,
                     placeholder="Deductions",
                     value=State.selected_deduction,
                     color_scheme="grass",
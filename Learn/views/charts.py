@@ -2,13 +2,10 @@ import datetime
 import random
 from ..backend.backend import State
 import reflex as rx
-from reflex.components.radix.themes.base import (
-    LiteralAccentColor,
-)
 
 class StatsState(rx.State):
     area_toggle: bool = True
-    selected_tab: str = "arisan"
+    selected_tab: str = ""  # nama potongan; kosong berarti potongan pertama di katalog
     # timeframe: str = "Monthly"
 
     @rx.event
@@ -39,57 +36,52 @@ def area_toggle() -> rx.Component:
         ),
     )
 
-def _create_gradient(color: LiteralAccentColor, id: str) -> rx.Component:
-    return (
-        rx.el.svg.defs(
-            rx.el.svg.linear_gradient(
-                rx.el.svg.stop(
-                    stop_color=rx.color(color, 7), offset="5%", stop_opacity=0.8
-                ),
-                rx.el.svg.stop(
-                    stop_color=rx.color(color, 7), offset="95%", stop_opacity=0
-                ),
-                x1=0,
-                x2=0,
-                y1=0,
-                y2=1,
-                id=id,
-            ),
+def _tab_gradient(tab) -> rx.Component:
+    """Gradient area chart dengan warna tab (warna dari State.deduction_tabs)."""
+    return rx.el.svg.defs(
+        rx.el.svg.linear_gradient(
+            rx.el.svg.stop(stop_color=tab["fill"], offset="5%", stop_opacity=0.8),
+            rx.el.svg.stop(stop_color=tab["fill"], offset="95%", stop_opacity=0),
+            x1=0,
+            x2=0,
+            y1=0,
+            y2=1,
+            id=tab["gradient"],
         ),
     )
 
-def _custom_tooltip(color: LiteralAccentColor) -> rx.Component:
-    return (
-        rx.recharts.graphing_tooltip(
-            separator=" : ",
-            content_style={
-                "backgroundColor": rx.color("gray", 1),
-                "borderRadius": "var(--radius-2)",
-                "borderWidth": "1px",
-                "borderColor": rx.color(color, 7),
-                "padding": "0.5rem",
-                "boxShadow": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
-            },
-            is_animation_active=True,
-        ),
+
+def _tab_tooltip(tab) -> rx.Component:
+    return rx.recharts.graphing_tooltip(
+        separator=" : ",
+        content_style={
+            "backgroundColor": rx.color("gray", 1),
+            "borderRadius": "var(--radius-2)",
+            "borderWidth": "1px",
+            "borderColor": tab["fill"],
+            "padding": "0.5rem",
+            "boxShadow": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+        },
+        is_animation_active=True,
     )
 
-def arisan_chart() -> rx.Component:
-    """Chart visualization for Arisan deductions."""
-    # CHANGED: Use area_chart_data directly instead of get_deduction_data_last_12_months
+
+def deduction_chart(tab) -> rx.Component:
+    """Chart 12 bulan terakhir untuk satu jenis potongan (satu item State.deduction_tabs)."""
+    # Data di-refresh sekali oleh deduction_charts(), bukan on_mount tiap chart
     return rx.cond(
         StatsState.area_toggle,
         # Area Chart Version
         rx.recharts.area_chart(
-            _create_gradient("lime", "colorLime"),
-            _custom_tooltip("lime"),
+            _tab_gradient(tab),
+            _tab_tooltip(tab),
             rx.recharts.cartesian_grid(
                 stroke_dasharray="3 3",
             ),
             rx.recharts.area(
-                data_key="Arisan",
-                stroke=rx.color("lime", 9),
-                fill="url(#colorLime)",
+                data_key=tab["name"],
+                stroke=tab["stroke"],
+                fill="url(#" + tab["gradient"] + ")",
                 type_="monotone",
             ),
             rx.recharts.x_axis(
@@ -102,22 +94,19 @@ def arisan_chart() -> rx.Component:
                 width=100,
             ),
             rx.recharts.legend(),
-            # CHANGED: Use area_chart_data directly
             data=State.area_chart_data,
             height=425,
-            # ADDED: Add on_mount event to load data
-            on_mount=State.refresh_area_chart,
         ),
         # Bar Chart Version
         rx.recharts.bar_chart(
             rx.recharts.cartesian_grid(
                 stroke_dasharray="3 3",
             ),
-            _custom_tooltip("lime"),
+            _tab_tooltip(tab),
             rx.recharts.bar(
-                data_key="Arisan",
-                stroke=rx.color("lime", 9),
-                fill=rx.color("lime", 7),
+                data_key=tab["name"],
+                stroke=tab["stroke"],
+                fill=tab["fill"],
             ),
             rx.recharts.x_axis(
                 data_key="month", 
@@ -129,344 +118,30 @@ def arisan_chart() -> rx.Component:
                 width=100,
             ),
             rx.recharts.legend(),
-            # CHANGED: Use area_chart_data directly
             data=State.area_chart_data,
             height=425,
-            # ADDED: Add on_mount event to load data
-            on_mount=State.refresh_area_chart,
         ),
     )
 
-def iuran_dw_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("blue", "colorBlue"),
-            _custom_tooltip("blue"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Iuran DW",
-                stroke=rx.color("blue", 9),
-                fill="url(#colorBlue)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("blue"),
-            rx.recharts.bar(
-                data_key="Iuran DW",
-                stroke=rx.color("blue", 9),
-                fill=rx.color("blue", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-    )
 
-def simpanan_wajib_koperasi_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("green", "colorGreen"),
-            _custom_tooltip("green"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Simpanan Wajib Koperasi",
-                stroke=rx.color("green", 9),
-                fill="url(#colorGreen)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("green"),
-            rx.recharts.bar(
-                data_key="Simpanan Wajib Koperasi",
-                stroke=rx.color("green", 9),
-                fill=rx.color("green", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-    )
+def active_deduction_tab() -> rx.Var:
+    """Tab potongan yang dipilih; sebelum ada pilihan, potongan pertama di katalog."""
+    return rx.cond(StatsState.selected_tab != "", StatsState.selected_tab, State.deduction_names[0])
 
-def belanja_koperasi_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("orange", "colorOrange"),
-            _custom_tooltip("orange"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Belanja Koperasi",
-                stroke=rx.color("orange", 9),
-                fill="url(#colorOrange)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("orange"),
-            rx.recharts.bar(
-                data_key="Belanja Koperasi",
-                stroke=rx.color("orange", 9),
-                fill=rx.color("orange", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-    )
-
-def simpanan_pokok_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("purple", "colorPurple"),
-            _custom_tooltip("purple"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Simpanan Pokok",
-                stroke=rx.color("purple", 9),
-                fill="url(#colorPurple)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("purple"),
-            rx.recharts.bar(
-                data_key="Simpanan Pokok",
-                stroke=rx.color("purple", 9),
-                fill=rx.color("purple", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-    )
-
-def kredit_khusus_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("brown", "colorBrown"),
-            _custom_tooltip("brown"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Kredit Khusus",
-                stroke=rx.color("brown", 9),
-                fill="url(#colorBrown)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("brown"),
-            rx.recharts.bar(
-                data_key="Kredit Khusus",
-                stroke=rx.color("brown", 9),
-                fill=rx.color("brown", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-    )
 
-def kredit_barang_chart() -> rx.Component:
-    data = State.get_deduction_data_last_12_months
+def deduction_charts(selected_tab) -> rx.Component:
+    """Tab switcher chart potongan (satu per jenis potongan di katalog) dengan satu refresh data bersama.
 
-    return rx.cond(
-        StatsState.area_toggle,
-        rx.recharts.area_chart(
-            _create_gradient("pink", "colorPink"),
-            _custom_tooltip("pink"),
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            rx.recharts.area(
-                data_key="Kredit Barang",
-                stroke=rx.color("pink", 9),
-                fill="url(#colorPink)",
-                type_="monotone",
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
-        ),
-        rx.recharts.bar_chart(
-            rx.recharts.cartesian_grid(
-                stroke_dasharray="3 3",
-            ),
-            _custom_tooltip("pink"),
-            rx.recharts.bar(
-                data_key="Kredit Barang",
-                stroke=rx.color("pink", 9),
-                fill=rx.color("pink", 7),
-            ),
-            rx.recharts.x_axis(
-                data_key="month", 
-                scale="auto",
-                tick_line=False, 
-            ),
-            rx.recharts.y_axis(
-                tick_line=False, 
-                width=100,
-            ),
-            rx.recharts.legend(),
-            data=State.area_chart_data,
-            height=425,
-            on_mount=State.refresh_area_chart,
+    Semua chart membaca State.area_chart_data yang sama, jadi data cukup
+    di-refresh sekali saat container ini di-mount, bukan setiap chart/tab.
+    """
+    return rx.box(
+        rx.foreach(
+            State.deduction_tabs,
+            lambda tab: rx.cond(tab["name"] == selected_tab, deduction_chart(tab)),
         ),
+        width="100%",
+        on_mount=State.refresh_area_chart,
     )
 
 
@@ -19,13 +19,8 @@ def show_employee_deduction(entry: EmployeeDeductionEntry) -> rx.Component:
     return rx.table.row(
         rx.table.cell(entry.name),
         rx.table.cell(entry.nip),
-        rx.table.cell(entry.arisan),
-        rx.table.cell(entry.iuran_dw),
-        rx.table.cell(entry.simpanan_wajib_koperasi),
-        rx.table.cell(entry.belanja_koperasi),
-        rx.table.cell(entry.simpanan_pokok),
-        rx.table.cell(entry.kredit_khusus),
-        rx.table.cell(entry.kredit_barang),
+        # Satu kolom per jenis potongan di katalog
+        rx.foreach(State.deduction_names, lambda name: rx.table.cell(entry.amounts[name])),
         rx.table.cell(entry.total_potongan),
         rx.table.cell(entry.date),
         rx.table.cell(
@@ -101,14 +96,11 @@ def add_employee_button() -> rx.Component:
                         # Nama & NIP
                         form_field("Nama", "Employee Name", "text", "name", "user"),
                         form_field("NIP", "Employee NIP", "text", "nip", "id-card"),
-                        # Deduction amounts
-                        form_field("Arisan", "Amount for Arisan", "number", "arisan", "dollar-sign"),
-                        form_field("Iuran DW", "Amount for Iuran DW", "number", "iuran_dw", "dollar-sign"),
-                        form_field("Simpanan Wajib Koperasi", "Amount for Simpanan Wajib Koperasi", "number", "simpanan_wajib_koperasi", "dollar-sign"),
-                        form_field("Belanja Koperasi", "Amount for Belanja Koperasi", "number", "belanja_koperasi", "dollar-sign"),
-                        form_field("Simpanan Pokok", "Amount for Simpanan Pokok", "number", "simpanan_pokok", "dollar-sign"),
-                        form_field("Kredit Khusus", "Amount for Kredit Khusus", "number", "kredit_khusus", "dollar-sign"),
-                        form_field("Kredit Barang", "Amount for Kredit Barang", "number", "kredit_barang", "dollar-sign"),
+                        # Deduction amounts (nama field = nama potongan)
+                        rx.foreach(
+                            State.deduction_names,
+                            lambda name: form_field(name, "Amount for " + name, "number", name, "dollar-sign"),
+                        ),
                         # Payment Status
                         rx.vstack(
                             rx.hstack(
@@ -172,7 +164,52 @@ def add_employee_button() -> rx.Component:
             border_radius="25px",
         ),
     )
-    
+
+
+def add_deduction_button() -> rx.Component:
+    """Dialog untuk menambah jenis potongan baru ke katalog."""
+    return rx.dialog.root(
+        rx.dialog.trigger(
+            rx.button(
+                rx.icon("list-plus", size=26),
+                rx.text("New Deduction", size="4", display=["none", "none", "block"]),
+                size="3",
+                variant="soft",
+            ),
+        ),
+        rx.dialog.content(
+            rx.dialog.title("New Deduction", weight="bold"),
+            rx.dialog.description("The new deduction becomes a table column, a chart tab and a CSV column."),
+            rx.form.root(
+                rx.flex(
+                    form_field("Name", "Deduction Name", "text", "name", "tag"),
+                    rx.flex(
+                        rx.dialog.close(
+                            rx.button("Cancel", variant="soft", color_scheme="gray"),
+                        ),
+                        rx.form.submit(
+                            rx.dialog.close(
+                                rx.button("Add Deduction"),
+                            ),
+                            as_child=True,
+                        ),
+                        spacing="3",
+                        justify="end",
+                    ),
+                    direction="column",
+                    spacing="4",
+                    padding_top="1em",
+                ),
+                on_submit=State.add_deduction_type,
+                reset_on_submit=True,
+            ),
+            max_width="450px",
+            padding="1.5em",
+            border=f"2px solid {rx.color('accent', 7)}",
+            border_radius="25px",
+        ),
+    )
+
 # def upload_csv_button() -> rx.Component:
 #     """Button untuk mengunggah file CSV."""
 #     return rx.upload(
@@ -211,6 +248,95 @@ def upload_csv_button() -> rx.Component:
         border="none",  # Hilangkan border upload
         padding="0",  # Hilangkan padding default
     )
+
+
+def backfill_csv_button() -> rx.Component:
+    """Upload banyak CSV bulanan sekaligus; periode tiap file diambil dari nama filenya."""
+    return rx.upload(
+        rx.button(
+            rx.hstack(
+                rx.icon("files", size=20),
+                rx.text("Backfill"),
+            ),
+            size="3",
+            variant="surface",
+            color_scheme="yellow",
+            border_radius="8px",
+            padding_x="1em",
+            padding_y="0.5em",
+        ),
+        id="backfill_csv",
+        accept=".csv",
+        multiple=True,
+        on_drop=State.import_backfill(rx.upload_files(upload_id="backfill_csv")),
+        width="auto",
+        border="none",
+        padding="0",
+    )
+
+
+def import_progress() -> rx.Component:
+    """Panel progress job import CSV: jumlah baris, tombol cancel, lalu ringkasan akhir."""
+    return rx.cond(
+        State.import_status != "",
+        rx.callout.root(
+            rx.hstack(
+                rx.cond(
+                    State.import_running,
+                    rx.spinner(size="2"),
+                    rx.icon("file-check-2", size=20),
+                ),
+                rx.vstack(
+                    rx.text(
+                        State.import_filename, ": ",
+                        State.import_rows_parsed, " rows parsed (",
+                        State.import_rows_inserted, " inserted, ",
+                        State.import_rows_updated, " updated, ",
+                        State.import_rows_unchanged, " unchanged), ",
+                        State.import_rows_upserted, " deductions written, ",
+                        State.import_error_count, " errors",
+                        weight="medium",
+                    ),
+                    rx.cond(
+                        State.import_summary != "",
+                        rx.text(State.import_summary, size="2"),
+                    ),
+                    rx.foreach(
+                        State.import_errors,
+                        lambda error: rx.text(error, size="1", color_scheme="red"),
+                    ),
+                    spacing="1",
+                    width="100%",
+                ),
+                rx.cond(
+                    State.import_running,
+                    # Backfill banyak file tidak bisa dibatalkan
+                    rx.cond(
+                        ~State.import_is_backfill,
+                        rx.button(
+                            rx.cond(State.import_cancel_requested, "Cancelling...", "Cancel"),
+                            color_scheme="red",
+                            variant="soft",
+                            disabled=State.import_cancel_requested,
+                            on_click=State.cancel_import,
+                        ),
+                    ),
+                    rx.icon_button(
+                        rx.icon("x", size=16),
+                        variant="ghost",
+                        on_click=State.clear_import_status,
+                    ),
+                ),
+                align="start",
+                spacing="3",
+                width="100%",
+            ),
+            color_scheme=rx.cond(State.import_error_count > 0, "amber", "grass"),
+            width="100%",
+            margin_bottom="1em",
+        ),
+    )
+
     
 def update_employee_dialog(entry) -> rx.Component:
     """Dialog untuk mengedit data employee_deduction yang sudah ada."""
@@ -266,61 +392,16 @@ def update_employee_dialog(entry) -> rx.Component:
                             "id-card", 
                             entry.nip,
                         ),
-                        form_field(
-                            "Arisan", 
-                            "Amount for Arisan", 
-                            "number", 
-                            "arisan", 
-                            "dollar-sign", 
-                            entry.arisan.to(str),
-                        ),
-                        form_field(
-                            "Iuran DW", 
-                            "Amount for Iuran DW", 
-                            "number", 
-                            "iuran_dw", 
-                            "dollar-sign", 
-                            entry.iuran_dw.to(str),
-                        ),
-                        form_field(
-                            "Simpanan Wajib Koperasi", 
-                            "Amount for Simpanan Wajib Koperasi", 
-                            "number", 
-                            "simpanan_wajib_koperasi", 
-                            "dollar-sign", 
-                            entry.simpanan_wajib_koperasi.to(str),
-                        ),
-                        form_field(
-                            "Belanja Koperasi", 
-                            "Amount for Belanja Koperasi", 
-                            "number", 
-                            "belanja_koperasi", 
-                            "dollar-sign", 
-                            entry.belanja_koperasi.to(str),
-                        ),
-                        form_field(
-                            "Simpanan Pokok", 
-                            "Amount for Simpanan Pokok", 
-                            "number", 
-                            "simpanan_pokok", 
-                            "dollar-sign", 
-                            entry.simpanan_pokok.to(str),
-                        ),
-                        form_field(
-                            "Kredit Khusus", 
-                            "Amount for Kredit Khusus", 
-                            "number", 
-                            "kredit_khusus", 
-                            "dollar-sign", 
-                            entry.kredit_khusus.to(str),
-                        ),
-                        form_field(
-                            "Kredit Barang", 
-                            "Amount for Kredit Barang", 
-                            "number", 
-                            "kredit_barang", 
-                            "dollar-sign", 
-                            entry.kredit_barang.to(str),
+                        rx.foreach(
+                            State.deduction_names,
+                            lambda name: form_field(
+                                name,
+                                "Amount for " + name,
+                                "number",
+                                name,
+                                "dollar-sign",
+                                entry.amounts[name].to(str),
+                            ),
                         ),
                         # Status
                         rx.vstack(
@@ -476,6 +557,17 @@ def _pagination_view() -> rx.Component:
                 color_scheme=rx.cond(State.page_number == 1, "gray", "accent"),
                 variant="soft",
             ),
+            rx.input(
+                # key mengikuti nomor halaman agar isi input ikut berubah setelah navigasi
+                key=State.page_number,
+                default_value=State.page_number.to(str),
+                on_blur=State.jump_to_page,
+                placeholder="Page",
+                type="number",
+                min=1,
+                width="5em",
+                size="2",
+            ),
             rx.icon_button(
                 rx.icon("chevron-right", size=18),
                 on_click=State.next_page,
@@ -532,6 +624,7 @@ def main_table() -> rx.Component:
     return rx.fragment(
         rx.flex(
             add_employee_button(),
+            add_deduction_button(),
             rx.spacer(),
             month_navigation(),  # Tambahkan navigasi bulan
             rx.cond(
@@ -587,6 +680,7 @@ def main_table() -> rx.Component:
                 on_click=State.download_table_data,
             ),
             upload_csv_button(),
+            backfill_csv_button(),
             justify="end",
             align="center",
             spacing="3",
@@ -594,18 +688,13 @@ def main_table() -> rx.Component:
             width="100%",
             padding_bottom="1em",
         ),
+        import_progress(),
         rx.table.root(
             rx.table.header(
                 rx.table.row(
                     _header_cell("Nama", "user"),
                     _header_cell("NIP", "id-card"),
-                    _header_cell("Arisan", "dollar-sign"),
-                    _header_cell("Iuran DW", "dollar-sign"),
-                    _header_cell("Simpanan Wajib Koperasi", "dollar-sign"),
-                    _header_cell("Belanja Koperasi", "dollar-sign"),
-                    _header_cell("Simpanan Pokok", "dollar-sign"),
-                    _header_cell("Kredit Khusus", "dollar-sign"),
-                    _header_cell("Kredit Barang", "dollar-sign"),
+                    rx.foreach(State.deduction_names, lambda name: _header_cell(name, "dollar-sign")),
                     _header_cell("Total Potongan", "dollar-sign"),
                     _header_cell("Date", "calendar"),
                     _header_cell("Status", "truck"),
@@ -625,6 +714,7 @@ def main_table() -> rx.Component:
             on_mount=lambda: [
                 State.reset_table_filters(),  # Reset filters saat komponen dimount
                 State.load_entries(),  # Load entries setelah reset
+                State.prefetch_adjacent_months(),
             ],
         ),
         _pagination_view(),
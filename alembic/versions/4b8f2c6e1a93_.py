@@ -0,0 +1,57 @@
+"""import fingerprints and imported files for idempotent CSV import
+
+Revision ID: 4b8f2c6e1a93
+Revises: e7a3d91c6b20
+Create Date: 2026-10-18 15:42:10.512377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8f2c6e1a93'
+down_revision: Union[str, None] = 'e7a3d91c6b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_fingerprints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ux_import_fingerprints_period',
+        'import_fingerprints',
+        ['year', 'month', 'employee_id'],
+        unique=True,
+    )
+    op.create_index('ix_import_fingerprints_employee', 'import_fingerprints', ['employee_id'])
+    op.create_table(
+        'imported_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('filename', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('imported_at', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ux_imported_files_period', 'imported_files', ['year', 'month'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_imported_files_period', table_name='imported_files')
+    op.drop_table('imported_files')
+    op.drop_index('ix_import_fingerprints_employee', table_name='import_fingerprints')
+    op.drop_index('ux_import_fingerprints_period', table_name='import_fingerprints')
+    op.drop_table('import_fingerprints')
@@ -0,0 +1,53 @@
+"""unique period key on employee_deductions
+
+Revision ID: 8f2c41d7a9e3
+Revises: 23db4d8589c7
+Create Date: 2026-10-18 09:12:04.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c41d7a9e3'
+down_revision: Union[str, None] = '23db4d8589c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _assert_no_duplicate_periods() -> None:
+    """Gagal dengan daftar key yang duplikat; baris potongan tidak dihapus diam-diam."""
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT employee_id, deduction_id, month, year, COUNT(*)
+        FROM employee_deductions
+        GROUP BY employee_id, deduction_id, month, year
+        HAVING COUNT(*) > 1
+        ORDER BY year, month, employee_id, deduction_id
+    """)).fetchall()
+    if duplicates:
+        keys = ", ".join(
+            f"(employee_id={row[0]}, deduction_id={row[1]}, {row[3]}-{row[2]:02d}: {row[4]} rows)"
+            for row in duplicates[:10]
+        )
+        raise RuntimeError(
+            f"Cannot create unique index uq_employee_deductions_period: {len(duplicates)} duplicate "
+            f"(employee_id, deduction_id, month, year) keys, e.g. {keys}. "
+            f"Merge or delete the duplicate rows first."
+        )
+
+
+def upgrade() -> None:
+    _assert_no_duplicate_periods()
+    op.create_index(
+        'uq_employee_deductions_period',
+        'employee_deductions',
+        ['employee_id', 'deduction_id', 'month', 'year'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_employee_deductions_period', table_name='employee_deductions')
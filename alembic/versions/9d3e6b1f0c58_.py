@@ -0,0 +1,24 @@
+"""employees (name, id) index for keyset pagination
+
+Revision ID: 9d3e6b1f0c58
+Revises: 4b8f2c6e1a93
+Create Date: 2026-10-18 17:05:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3e6b1f0c58'
+down_revision: Union[str, None] = '4b8f2c6e1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_employees_name', 'employees', ['name', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_employees_name', table_name='employees')
@@ -0,0 +1,34 @@
+"""data_versions: cache invalidation shared by all worker processes
+
+Revision ID: b7d25e8c4f16
+Revises: 9d3e6b1f0c58
+Create Date: 2026-10-18 19:12:47.330516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d25e8c4f16'
+down_revision: Union[str, None] = '9d3e6b1f0c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scope', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ux_data_versions_scope', 'data_versions', ['scope'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_data_versions_scope', table_name='data_versions')
+    op.drop_table('data_versions')
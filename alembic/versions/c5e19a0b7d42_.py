@@ -0,0 +1,58 @@
+"""indexes for employee_deductions access paths
+
+Revision ID: c5e19a0b7d42
+Revises: 8f2c41d7a9e3
+Create Date: 2026-10-18 10:41:27.093115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e19a0b7d42'
+down_revision: Union[str, None] = '8f2c41d7a9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _assert_no_duplicates(table: str, column: str) -> None:
+    """Gagal dengan pesan jelas jika masih ada nilai duplikat sebelum membuat unique index."""
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT {column}, COUNT(*) FROM {table} GROUP BY {column} HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        values = ", ".join(str(row[0]) for row in duplicates[:10])
+        raise RuntimeError(
+            f"Cannot create unique index on {table}.{column}: duplicate values ({values}). "
+            f"Merge the duplicate rows first."
+        )
+
+
+def upgrade() -> None:
+    # Filter per periode: pivot bulanan, pie chart (status), area chart 12 bulan
+    op.create_index(
+        'ix_employee_deductions_year_month',
+        'employee_deductions',
+        ['year', 'month', 'deduction_id', 'payment_status', 'employee_id', 'amount'],
+    )
+    # Filter per pegawai per tahun: chart Recap Employees, export recap, join pivot
+    op.create_index(
+        'ix_employee_deductions_employee_year',
+        'employee_deductions',
+        ['employee_id', 'year', 'month', 'deduction_id', 'amount'],
+    )
+
+    _assert_no_duplicates('employees', 'nip')
+    op.create_index('ux_employees_nip', 'employees', ['nip'], unique=True)
+    _assert_no_duplicates('deductions', 'name')
+    op.create_index('ux_deductions_name', 'deductions', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_deductions_name', table_name='deductions')
+    op.drop_index('ux_employees_nip', table_name='employees')
+    op.drop_index('ix_employee_deductions_employee_year', table_name='employee_deductions')
+    op.drop_index('ix_employee_deductions_year_month', table_name='employee_deductions')
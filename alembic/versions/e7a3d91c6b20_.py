@@ -0,0 +1,56 @@
+"""deduction_rollups table for dashboard aggregates
+
+Revision ID: e7a3d91c6b20
+Revises: c5e19a0b7d42
+Create Date: 2026-10-18 13:05:48.220913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3d91c6b20'
+down_revision: Union[str, None] = 'c5e19a0b7d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'deduction_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('deduction_id', sa.Integer(), nullable=False),
+        sa.Column('payment_status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total_amount', sa.Integer(), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ux_deduction_rollups_period',
+        'deduction_rollups',
+        ['year', 'month', 'deduction_id', 'payment_status'],
+        unique=True,
+    )
+    # Isi awal dari data yang sudah ada
+    op.execute("""
+        INSERT INTO deduction_rollups (year, month, deduction_id, payment_status, total_amount, entry_count)
+        SELECT
+            year,
+            month,
+            deduction_id,
+            COALESCE(payment_status, 'unpaid'),
+            COALESCE(SUM(amount), 0),
+            COUNT(*)
+        FROM employee_deductions
+        GROUP BY year, month, deduction_id, COALESCE(payment_status, 'unpaid')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_deduction_rollups_period', table_name='deduction_rollups')
+    op.drop_table('deduction_rollups')
@@ -0,0 +1,230 @@
+"""Generator data sintetis untuk benchmark.
+
+Membuat pegawai dan data ``employee_deductions`` beberapa tahun (berakhir di
+bulan berjalan, karena area chart dan pie chart memakai ``datetime.now()``),
+serta file CSV dengan format yang sama seperti file di ``uploaded_files/``
+(kolom Nama, NIP, tujuh potongan, Total Potongan, Date, Status, Type).
+
+Hasil acak ditentukan oleh ``seed`` sehingga dua versi kode dibandingkan
+terhadap data yang sama persis.
+"""
+import csv
+import hashlib
+import random
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from Learn.backend.rollup import rebuild_rollups
+from Learn.models import Deduction
+
+# Naikkan jika isi data yang dihasilkan berubah, agar database benchmark yang di-cache dibuat ulang
+DATAGEN_VERSION = "1"
+# Jenis potongan pada database sintetis (sama dengan seed "-- SQLite.sql")
+DEDUCTION_COLUMNS = [
+    "Arisan",
+    "Iuran DW",
+    "Simpanan Wajib Koperasi",
+    "Belanja Koperasi",
+    "Simpanan Pokok",
+    "Kredit Khusus",
+    "Kredit Barang",
+]
+CSV_HEADERS = ["Nama", "NIP", *DEDUCTION_COLUMNS, "Total Potongan", "Date", "Status", "Type"]
+
+FIRST_NAMES = [
+    "Andi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hermawan", "Indah", "Joko",
+    "Kartika", "La Ode", "Made", "Nurul", "Putri", "Rahmat", "Sri", "Taufik", "Wa Ode", "Yusuf",
+]
+LAST_NAMES = [
+    "Saputra", "Rahmawati", "Hidayat", "Pratama", "Lestari", "Wijaya", "Marjanawati",
+    "Kurniawan", "Susanti", "Halim", "Syahputra", "Nugroho", "Oba", "Setiawan",
+]
+TITLES = ["", "", ", SE", ", SST", ", S.Si", ", M.Si", ", SE.Msi"]
+
+# (peluang punya potongan ini, pilihan nominal)
+DEDUCTION_PROFILES = {
+    "Arisan": (0.3, [50_000, 100_000, 110_000]),
+    "Iuran DW": (0.4, [10_000, 20_000]),
+    "Simpanan Wajib Koperasi": (1.0, [20_000, 50_000, 100_000]),
+    "Belanja Koperasi": (0.3, [25_000, 41_500, 150_000, 320_000]),
+    "Simpanan Pokok": (0.05, [100_000]),
+    "Kredit Khusus": (0.1, [500_000, 1_250_000, 2_500_000]),
+    "Kredit Barang": (0.1, [150_000, 300_000, 750_000]),
+}
+STATUS_WEIGHTS = {"paid": 0.8, "installment": 0.1, "unpaid": 0.1}
+
+
+@dataclass
+class SyntheticEmployee:
+    name: str
+    nip: str
+    # Nominal tetap per jenis potongan (None jika pegawai tidak punya potongan tsb)
+    amounts: Dict[str, int | None]
+
+
+@dataclass
+class PeriodRow:
+    """Satu baris CSV / satu pegawai dalam satu periode."""
+    employee: SyntheticEmployee
+    amounts: Dict[str, int | None]
+    date: str
+    status: str
+    payment_type: str
+
+
+def make_employees(count: int, seed: int = 0) -> List[SyntheticEmployee]:
+    """Buat ``count`` pegawai dengan NIP 18 digit yang unik."""
+    rng = random.Random(seed)
+    employees = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.choice(TITLES)}"
+        # Tanggal lahir (8 digit) + nomor urut (10 digit)
+        nip = f"{1960 + i % 40}{1 + i % 12:02d}{1 + i % 28:02d}{i:010d}"
+        amounts = {
+            deduction: rng.choice(choices) if rng.random() < chance else None
+            for deduction, (chance, choices) in DEDUCTION_PROFILES.items()
+        }
+        employees.append(SyntheticEmployee(name=name, nip=nip, amounts=amounts))
+    return employees
+
+
+def last_periods(months: int, until: datetime | None = None) -> List[Tuple[int, int]]:
+    """Daftar (tahun, bulan) sebanyak ``months``, berakhir di bulan ``until`` (default sekarang)."""
+    until = until or datetime.now()
+    index = until.year * 12 + until.month - 1
+    return [(i // 12, i % 12 + 1) for i in range(index - months + 1, index + 1)]
+
+
+def period_rows(
+    employees: List[SyntheticEmployee], month: int, year: int, seed: int = 0
+) -> Iterator[PeriodRow]:
+    """Baris potongan semua pegawai untuk satu periode."""
+    rng = random.Random(f"{seed}-{year}-{month}")
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    for employee in employees:
+        amounts = dict(employee.amounts)
+        # Belanja koperasi berubah tiap bulan
+        if amounts["Belanja Koperasi"] is not None:
+            amounts["Belanja Koperasi"] = rng.randrange(10, 500) * 1_000
+        day = rng.randint(1, 28)
+        yield PeriodRow(
+            employee=employee,
+            amounts=amounts,
+            date=f"{year:04d}-{month:02d}-{day:02d} {rng.randint(7, 16):02d}:{rng.randint(0, 59):02d}:00",
+            status=rng.choices(statuses, weights)[0],
+            payment_type=rng.choice(("cash", "transfer")),
+        )
+
+
+def _format_amount(amount: int | None) -> str:
+    return f"{amount:,}".replace(",", ".") if amount else ""
+
+
+def write_csv(path: Path, employees: List[SyntheticEmployee], month: int, year: int, seed: int = 0) -> int:
+    """Tulis CSV satu periode dalam format yang diharapkan ``import_csv``.
+
+    Returns:
+        Ukuran file dalam byte.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADERS)
+        for row in period_rows(employees, month, year, seed):
+            values = [row.amounts[name] for name in DEDUCTION_COLUMNS]
+            writer.writerow([
+                row.employee.name,
+                row.employee.nip,
+                *[_format_amount(value) for value in values],
+                _format_amount(sum(value or 0 for value in values)),
+                row.date,
+                row.status,
+                row.payment_type,
+            ])
+    return path.stat().st_size
+
+
+def schema_version() -> str:
+    """Sidik jari skema model (DDL SQLite semua tabel dan index) dan versi generator.
+
+    Dipakai di nama file database benchmark yang di-cache, sehingga database
+    lama dibuat ulang setelah model/migrasi berubah (tabel atau index baru).
+    """
+    dialect = sqlite.dialect()
+    ddl = [DATAGEN_VERSION]
+    for table in Deduction.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        )
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()[:12]
+
+
+def create_database(path: Path, employees: List[SyntheticEmployee], months: int, seed: int = 0) -> int:
+    """Buat database SQLite berisi skema model, pegawai dan potongan ``months`` bulan terakhir.
+
+    Returns:
+        Jumlah baris employee_deductions.
+    """
+    path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    Deduction.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executemany("INSERT INTO deductions (name) VALUES (?)", [(name,) for name in DEDUCTION_COLUMNS])
+    conn.executemany(
+        "INSERT INTO employees (name, nip) VALUES (?, ?)",
+        [(employee.name, employee.nip) for employee in employees],
+    )
+    deduction_ids = dict(conn.execute("SELECT name, id FROM deductions"))
+    employee_ids = dict(conn.execute("SELECT nip, id FROM employees"))
+
+    total = 0
+    for year, month in last_periods(months):
+        values = [
+            (
+                employee_ids[row.employee.nip],
+                deduction_ids[name],
+                row.amounts[name],
+                row.status,
+                row.payment_type,
+                month,
+                year,
+                row.date,
+                row.date,
+            )
+            for row in period_rows(employees, month, year, seed)
+            for name in DEDUCTION_COLUMNS
+        ]
+        conn.executemany(
+            """
+            INSERT INTO employee_deductions
+                (employee_id, deduction_id, amount, payment_status, payment_type,
+                 month, year, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            values,
+        )
+        total += len(values)
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        rebuild_rollups(session)
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return total
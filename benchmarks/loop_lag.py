@@ -0,0 +1,79 @@
+"""Ukur lag event loop terburuk selama import CSV berjalan bersamaan.
+
+Dua skenario pada database sintetis yang sama:
+
+- ``inline``: parse + upsert + refresh dijalankan langsung di event loop
+  (perilaku import_csv sebelum memakai ``run_blocking``).
+- ``import_csv``: job import apa adanya (pekerjaan blocking di thread pool).
+
+Selama import, ``LoopLagMonitor`` mengukur keterlambatan loop; lag itu
+adalah waktu tunggu tambahan untuk event sesi lain. Jalankan dari root repo:
+
+    python benchmarks/loop_lag.py --employees 10000
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import reflex as rx  # noqa: E402
+
+from benchmarks.datagen import make_employees, write_csv  # noqa: E402
+from benchmarks.run_benchmarks import DATA_DIR, _prepare_database, _quiet, import_job  # noqa: E402
+from Learn.backend.backend import State  # noqa: E402
+from Learn.backend.workers import LoopLagMonitor  # noqa: E402
+
+
+async def _measure(run_import) -> dict:
+    monitor = LoopLagMonitor(interval=0.01, warn_after=float("inf"))
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.05)
+    monitor.reset()
+    started = time.perf_counter()
+    await run_import()
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.05)
+    task.cancel()
+    return {"import_seconds": elapsed, "max_lag_ms": monitor.max_lag * 1000, "samples": monitor.samples}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rx.toast.provider()
+    employees = make_employees(args.employees, args.seed)
+    base_path, _, _ = _prepare_database(employees, args.months, args.seed, regenerate=False)
+    csv_path = DATA_DIR / f"import_{args.employees}.csv"
+    write_csv(csv_path, employees, 1, 2000, args.seed + 1)
+    content = csv_path.read_bytes()
+
+    now = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    results = {}
+    for scenario in ("inline", "import_csv"):
+        work_path = DATA_DIR / f"work_{args.employees}.db"
+        shutil.copyfile(base_path, work_path)
+        rx.config.get_config().db_url = f"sqlite:///{work_path}"
+        state = State(_reflex_internal_init=True)
+        state.current_month = now.replace(year=now.year + 1)
+
+        async def run_import():
+            await import_job(state, content, csv_path.name, inline=scenario == "inline")
+
+        results[scenario] = _quiet(lambda: asyncio.run(_measure(run_import)))
+
+    print(json.dumps({"employees": args.employees, "csv_bytes": len(content), "scenarios": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Bandingkan normalisasi CSV per baris (iterrows + parse_int) dengan versi vektor.
+
+Hanya tahap parse/validasi sampai baris siap di-upsert yang diukur (tanpa
+database). Jalankan dari root repo:
+
+    python benchmarks/normalize_csv.py --rows 50000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+import reflex as rx  # noqa: E402,F401
+
+from benchmarks.datagen import DEDUCTION_COLUMNS, make_employees, write_csv  # noqa: E402
+from benchmarks.run_benchmarks import DATA_DIR  # noqa: E402
+from Learn.backend.backend import State  # noqa: E402
+from Learn.backend.importer import (  # noqa: E402
+    PAYMENT_STATUSES,
+    PAYMENT_TYPES,
+    ImportReport,
+    batch_rows,
+    normalize_batch,
+)
+
+parse_int = State.parse_int.fn
+
+
+def per_row(df: pd.DataFrame, deduction_ids: dict, month: int, year: int) -> list:
+    """Normalisasi lama: satu iterasi Python per baris, parse_int per sel."""
+    rows = []
+    for line, row in df.iterrows():
+        nip = row["NIP"]
+        if pd.isna(nip) or not str(nip).strip():
+            continue
+        status = row["Status"] if row["Status"] in PAYMENT_STATUSES else "unpaid"
+        payment_type = row["Type"] if row["Type"] in PAYMENT_TYPES else None
+        date = row["Date"] if pd.notna(row["Date"]) and str(row["Date"]).strip() != "" else ""
+        for name in DEDUCTION_COLUMNS:
+            rows.append((
+                line, deduction_ids[name], parse_int(None, row[name]),
+                status, payment_type, month, year, date, date,
+            ))
+    return rows
+
+
+def vectorized(df: pd.DataFrame, deduction_ids: dict, month: int, year: int) -> list:
+    batch = normalize_batch(df, 2, ImportReport(), list(deduction_ids))
+    nip_to_id = {nip: i for i, nip in enumerate(batch.frame.index)}
+    return batch_rows(batch, nip_to_id, deduction_ids, month, year)
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f"normalize_{args.rows}.csv"
+    write_csv(path, make_employees(args.rows), 1, 2025)
+    df = pd.read_csv(path, thousands=".", dtype={"NIP": str})
+    deduction_ids = {name: i + 1 for i, name in enumerate(DEDUCTION_COLUMNS)}
+
+    old = _best(lambda: per_row(df, deduction_ids, 1, 2025), args.repeat)
+    new = _best(lambda: vectorized(df, deduction_ids, 1, 2025), args.repeat)
+    print(json.dumps({
+        "rows": len(df),
+        "per_row_seconds": old,
+        "vectorized_seconds": new,
+        "speedup": old / new,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
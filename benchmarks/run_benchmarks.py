@@ -0,0 +1,333 @@
+"""Benchmark event handler State terhadap database SQLite lokal berisi data sintetis.
+
+Untuk tiap skala (jumlah pegawai), database dibuat sekali oleh ``datagen`` dan
+disimpan di ``benchmarks/.data/`` (nama file memuat versi skema model, jadi
+database lama dibuat ulang setelah skema berubah); setiap run memakai salinannya. Waktu tiap
+handler diukur beberapa kali lalu ditulis ke laporan JSON. Dengan
+``--baseline`` laporan lama (misalnya dari commit sebelumnya) dibandingkan
+dan handler yang melambat ditandai.
+
+Jalankan dari root repo (rxconfig.py harus ada di direktori kerja):
+
+    python benchmarks/run_benchmarks.py --scales 1000,10000,100000 --output bench.json
+    python benchmarks/run_benchmarks.py --scales 1000 --baseline bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import reflex as rx  # noqa: E402
+from reflex import UploadFile  # noqa: E402
+
+from benchmarks.datagen import create_database, make_employees, schema_version, write_csv  # noqa: E402
+from Learn.backend.backend import State  # noqa: E402
+from Learn.backend.cache import (  # noqa: E402
+    area_chart_cache,
+    employee_year_cache,
+    month_pivot_cache,
+    month_stats_cache,
+    page_boundaries_cache,
+    payment_status_cache,
+    reference_cache,
+)
+from Learn.backend.dashboard import load_dashboard, prefetch_month  # noqa: E402
+from Learn.backend.exports import EXPORTERS, stream_csv  # noqa: E402
+from Learn.backend.jobs import ImportJob, finish_job, get_job, run_import_job  # noqa: E402
+from Learn.backend.month_pivot import adjacent_periods  # noqa: E402
+from Learn.backend.workers import run_blocking  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+DEFAULT_SCALES = "1000,10000,100000"
+# Handler dianggap regresi jika median lebih lambat dari baseline sebesar faktor ini
+REGRESSION_RATIO = 1.2
+
+
+def _quiet(fn: Callable[[], Any]) -> Any:
+    """Jalankan fn tanpa output print dari handler."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+
+def _measure(fn: Callable[[], Any], repeat: int, setup: Callable[[], Any] | None = None) -> Dict[str, Any]:
+    """Ukur waktu fn sebanyak ``repeat`` kali; setup dijalankan di luar pengukuran."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            _quiet(setup)
+        started = time.perf_counter()
+        result = _quiet(fn)
+        timings.append(time.perf_counter() - started)
+    stats = {
+        "runs": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+    if isinstance(result, dict):
+        stats.update(result)
+    return stats
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_database(employees: List, months: int, seed: int, regenerate: bool) -> tuple[Path, int, float | None]:
+    """Database dasar untuk satu skala (dibuat sekali, lalu dipakai ulang selama skemanya sama).
+
+    Nama file memuat ``schema_version()``; setelah model atau index berubah
+    database dibuat ulang, bukan dipakai dengan tabel yang kurang.
+    """
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f"bench_{len(employees)}_{months}m_s{seed}_{schema_version()}.db"
+    generate_seconds = None
+    if regenerate or not path.exists():
+        started = time.perf_counter()
+        create_database(path, employees, months, seed)
+        generate_seconds = time.perf_counter() - started
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM employee_deductions").fetchone()[0]
+    return path, rows, generate_seconds
+
+
+async def import_job(state: State, content: bytes, filename: str, inline: bool = False) -> ImportJob:
+    """Upload + job import seperti ``import_csv`` -> ``run_import_job``, tanpa websocket.
+
+    Dengan ``inline=True`` pekerjaan blocking dijalankan langsung di event loop.
+    """
+    await state.import_csv([UploadFile(file=io.BytesIO(content), filename=filename)])
+    job = get_job(state.import_job_id)
+    if inline:
+        run_import_job(job)
+        state.load_entries()
+    else:
+        await run_blocking(run_import_job, job)
+        state._apply_dashboard(await run_blocking(load_dashboard, *state._dashboard_params()))
+    finish_job(job.id)
+    state.import_status = job.status
+    return job
+
+
+def _import(state: State, content: bytes, filename: str) -> Dict[str, Any]:
+    job = asyncio.run(import_job(state, content, filename))
+    return {"status": job.status, "errors": job.report.error_count}
+
+
+def _consume_export(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    size = sum(len(chunk) for chunk in stream_csv(kind, params))
+    return {"bytes": size}
+
+
+def bench_scale(count: int, months: int, repeat: int, seed: int, regenerate: bool) -> Dict[str, Any]:
+    """Jalankan semua benchmark untuk satu skala jumlah pegawai."""
+    employees = make_employees(count, seed)
+    base_path, rows, generate_seconds = _prepare_database(employees, months, seed, regenerate)
+
+    work_path = DATA_DIR / f"work_{count}.db"
+    shutil.copyfile(base_path, work_path)
+    rx.config.get_config().db_url = f"sqlite:///{work_path}"
+
+    now = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    state = State(_reflex_internal_init=True)
+    state.current_month = now
+    # Database baru per skala: id pegawai/potongan dari skala sebelumnya tidak berlaku
+    reference_cache.invalidate_employees()
+    reference_cache.invalidate_deductions()
+
+    def cold_caches():
+        area_chart_cache.clear()
+        employee_year_cache.clear()
+        month_pivot_cache.clear()
+        month_stats_cache.clear()
+        page_boundaries_cache.clear()
+        payment_status_cache.clear()
+        state._area_chart_version = -1
+
+    def reset_table():
+        state.offset = 0
+        state.search_value = ""
+        state.sort_value = ""
+        state.sort_reverse = False
+        state.first_page()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    results["load_entries (cold caches)"] = _measure(state.load_entries, repeat, setup=cold_caches)
+    results["load_entries (warm caches)"] = _measure(state.load_entries, repeat)
+    results["next_page"] = _measure(state.next_page, repeat, setup=reset_table)
+
+    def flip_months():
+        state.prev_month()
+        state.next_month()
+
+    results["prev_month + next_month (cached periods)"] = _measure(flip_months, repeat)
+
+    def prefetch_next():
+        # Yang dikerjakan prefetch_adjacent_months di latar belakang setelah bulan tampil
+        cold_caches()
+        state.current_month = now
+        state.load_entries()
+        for period in adjacent_periods(now.year, now.month):
+            prefetch_month(*period)
+
+    results["next_month (prefetched)"] = _measure(state.next_month, repeat, setup=prefetch_next)
+    results["next_month (cold)"] = _measure(
+        state.next_month, repeat, setup=lambda: (cold_caches(), setattr(state, "current_month", now))
+    )
+    state.current_month = now
+    results["jump_to_page (last)"] = _measure(
+        lambda: state.jump_to_page(str(state.total_pages)), repeat, setup=reset_table
+    )
+    results["sort_values (total_potongan)"] = _measure(
+        lambda: state.sort_values("total_potongan"), repeat, setup=reset_table
+    )
+
+    def search():
+        # Query yang dijalankan run_search setelah jeda debounce filter_values
+        state.search_value = employees[len(employees) // 2].nip[-6:]
+        state._reload_table()
+
+    results["filter_values -> run_search"] = _measure(search, repeat, setup=reset_table)
+    _quiet(reset_table)
+
+    results["refresh_area_chart (cold)"] = _measure(state.refresh_area_chart, repeat, setup=cold_caches)
+    results["refresh_pie_chart (cold)"] = _measure(state.refresh_pie_chart, repeat, setup=payment_status_cache.clear)
+
+    def prefetch_payment_status():
+        # Yang dikerjakan prefetch_payment_status di latar belakang setelah refresh_pie_chart
+        for timeframe in ("Monthly", "Yearly"):
+            state.get_payment_status_data(timeframe)
+
+    for timeframe in ("Yearly", "Monthly"):
+        results[f"set_timeframe ({timeframe})"] = _measure(
+            lambda: state.set_timeframe(timeframe), repeat, setup=prefetch_payment_status
+        )
+
+    state.selected_employee_id = 1
+    results["set_selected_deduction"] = _measure(
+        lambda: state.set_selected_deduction("Simpanan Wajib Koperasi"), repeat
+    )
+
+    # Import CSV untuk bulan-bulan setelah data yang ada (insert), lalu import ulang file yang sama
+    csv_path = DATA_DIR / f"import_{count}.csv"
+    csv_bytes = write_csv(csv_path, employees, now.month, now.year, seed + 1)
+    content = csv_path.read_bytes()
+    import_months = iter(range(1, repeat + 1))
+
+    def next_import_month():
+        month_index = now.year * 12 + now.month - 1 + next(import_months)
+        state.current_month = datetime(month_index // 12, month_index % 12 + 1, 1)
+
+    results["import_csv (new period)"] = _measure(
+        lambda: _import(state, content, csv_path.name), repeat, setup=next_import_month
+    )
+    results["import_csv (new period)"]["csv_bytes"] = csv_bytes
+    results["import_csv (re-import unchanged)"] = _measure(lambda: _import(state, content, csv_path.name), repeat)
+    state.current_month = now
+
+    table_params = {"month": now.month, "year": now.year}
+    export_params = {
+        "table": table_params,
+        "slips": table_params,
+        "employee_recap": {"employee_id": 1, "year": now.year},
+        "all_recap": {"year": now.year},
+    }
+    for kind in EXPORTERS:
+        results[f"export {kind}"] = _measure(lambda: _consume_export(kind, export_params[kind]), repeat)
+
+    return {
+        "employees": count,
+        "months": months,
+        "employee_deductions_rows": rows,
+        "database_bytes": base_path.stat().st_size,
+        "generate_seconds": generate_seconds,
+        "reference_cache": reference_cache.stats(),
+        "month_pivot_cache": month_pivot_cache.stats(),
+        "handlers": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], ratio: float = REGRESSION_RATIO) -> List[str]:
+    """Bandingkan median tiap handler dengan laporan baseline; kembalikan baris ringkasan."""
+    lines = []
+    baseline_scales = {scale["employees"]: scale for scale in baseline.get("scales", [])}
+    for scale in report["scales"]:
+        old_scale = baseline_scales.get(scale["employees"])
+        if old_scale is None:
+            continue
+        for name, stats in scale["handlers"].items():
+            old = old_scale["handlers"].get(name)
+            if not old or not old["median"]:
+                continue
+            change = stats["median"] / old["median"]
+            flag = "  REGRESSION" if change > ratio else ""
+            lines.append(
+                f"{scale['employees']:>7} {name:<36} {old['median'] * 1000:>10.1f}ms "
+                f"-> {stats['median'] * 1000:>10.1f}ms  x{change:.2f}{flag}"
+            )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Jumlah pegawai, dipisah koma.")
+    parser.add_argument("--months", type=int, default=24, help="Jumlah bulan data (berakhir di bulan ini).")
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan per handler.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regenerate", action="store_true", help="Buat ulang database sintetis.")
+    parser.add_argument("--output", type=Path, help="Tulis laporan JSON ke file ini (default: stdout).")
+    parser.add_argument("--baseline", type=Path, help="Laporan JSON lama untuk dibandingkan.")
+    args = parser.parse_args()
+
+    # Toaster dibuat oleh layout aplikasi; handler yang mengembalikan toast membutuhkannya
+    rx.toast.provider()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "scales": [],
+    }
+    for count in (int(value) for value in args.scales.split(",") if value.strip()):
+        print(f"Benchmarking {count} employees x {args.months} months...", file=sys.stderr)
+        report["scales"].append(bench_scale(count, args.months, args.repeat, args.seed, args.regenerate))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.baseline:
+        for line in compare(report, json.loads(args.baseline.read_text())):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Import banyak CSV bulanan sekaligus; periode tiap file diambil dari nama file.
+
+Contoh nama file: ``employee_deductions_Januari_2024.csv`` atau
+``..._February_2025.csv``. File di-parse paralel di beberapa proses, lalu
+setiap periode ditulis dalam satu transaksi. Jalankan dari root repo:
+
+    python scripts/backfill_imports.py uploaded_files/*.csv
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import reflex as rx  # noqa: E402,F401
+
+from Learn.backend.backfill import backfill  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", type=Path, help="File CSV yang akan diimport.")
+    parser.add_argument("--workers", type=int, help="Jumlah proses parse (default: jumlah CPU).")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results, skipped = backfill([str(path) for path in args.files], args.workers)
+    for item in skipped:
+        print(f"Skipped {Path(item.path).name}: {item.error}")
+    for result in results:
+        print(result.summary())
+        for error in result.report.errors:
+            print(f"  {error}")
+    rows = sum(result.report.rows for result in results)
+    print(f"Backfilled {len(results)} periods, {rows} rows in {time.perf_counter() - started:.2f}s")
+    if skipped or any(result.error for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Laporan EXPLAIN QUERY PLAN (SQLite) sebelum dan sesudah index employee_deductions.
+
+Skema dan data awal diambil dari "-- SQLite.sql" (tanpa statement CREATE INDEX
+untuk kondisi "before"); kondisi "after" menambahkan semua index yang
+dideklarasikan pada model di Learn/models.py.
+
+Jalankan dari root repo:
+
+    python scripts/explain_query_plan.py > docs/explain_query_plan.md
+"""
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy.dialects import sqlite as sqlite_dialect  # noqa: E402
+from sqlalchemy.schema import CreateIndex  # noqa: E402
+
+from Learn.backend import queries  # noqa: E402
+from Learn.backend.catalog import Catalog, DeductionType  # noqa: E402
+from Learn.models import Deduction, DeductionRollup, Employee, EmployeeDeduction  # noqa: E402
+
+SEED_FILE = ROOT / "-- SQLite.sql"
+
+PARAMS = {
+    "month": 2,
+    "year": 2025,
+    "employee_id": 1,
+    "deduction_id": 1,
+    "deduction_name": "Arisan",
+    "start_month": 1,
+    "end_month": 6,
+    "current_month": 2,
+    "current_year": 2025,
+    "previous_year": 2024,
+    "nip": "198910142013111001",
+    "name": "Arisan",
+}
+
+
+def _backend_queries(catalog: Catalog) -> list[tuple[str, str, dict]]:
+    """Semua query yang dijalankan oleh Learn/backend (nama, sql, params)."""
+    page_sql, page_params, _, _ = queries.keyset_query(
+        catalog, 2, 2025, search_value="1989", sort_value="total_potongan", limit=10,
+        cursor=(100000, 10),
+    )
+    name_sql, name_params, _, _ = queries.keyset_query(
+        catalog, 2, 2025, sort_value="name", limit=10, cursor=("M", 10),
+    )
+    boundaries_sql, boundaries_params = queries.page_boundaries_query(catalog, 2, 2025, sort_value="name", limit=10)
+    full_sql, full_params, _ = queries.entries_query(catalog, 2, 2025)
+    count_sql, count_params = queries.count_query("1989")
+    return [
+        ("next_page: keyset page (search + aggregate sort)", page_sql, page_params),
+        ("next_page: keyset page (sort by name)", name_sql, name_params),
+        ("jump_to_page: page boundaries (sort by name)", boundaries_sql, boundaries_params),
+        ("load_entries: pivot full month", full_sql, full_params),
+        ("load_entries: COUNT for total_pages", count_sql, count_params),
+        ("_employee_year / download_employee_recap", queries.EMPLOYEE_RECAP_SQL, PARAMS),
+        ("get_payment_status_data (Monthly)", queries.PAYMENT_STATUS_MONTHLY_SQL, PARAMS),
+        ("get_payment_status_data (Yearly)", queries.PAYMENT_STATUS_YEARLY_SQL, PARAMS),
+        ("_fetch_area_chart_data", queries.area_chart_query(catalog), PARAMS),
+        (
+            "search_employee / import_csv: employee by NIP",
+            "SELECT id, name, nip FROM employees WHERE nip = :nip",
+            PARAMS,
+        ),
+        (
+            "add/update entry, import_csv: deduction by name",
+            "SELECT id, name FROM deductions WHERE name = :name",
+            PARAMS,
+        ),
+        (
+            "update_employee_entry: period rows (one IN query)",
+            f"""
+            SELECT * FROM employee_deductions
+            WHERE employee_id = :employee_id AND month = :month AND year = :year
+            AND deduction_id IN ({", ".join(str(deduction.id) for deduction in catalog.types)})
+            """,
+            PARAMS,
+        ),
+    ]
+
+
+def _seed_script() -> str:
+    """Skema + data awal dari seed, tanpa statement CREATE INDEX."""
+    script = SEED_FILE.read_text()
+    script = script[:script.index("-- Hapus semua data")]
+    return re.sub(r"CREATE (UNIQUE )?INDEX[^;]*;", "", script)
+
+
+def _connect(with_indexes: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(_seed_script())
+    if with_indexes:
+        for model in (Employee, Deduction, EmployeeDeduction, DeductionRollup):
+            for index in model.__table__.indexes:
+                ddl = str(CreateIndex(index).compile(dialect=sqlite_dialect.dialect()))
+                conn.execute(ddl)
+    conn.execute("ANALYZE")
+    return conn
+
+
+def _catalog(conn: sqlite3.Connection) -> Catalog:
+    """Katalog potongan dari data seed (tanpa cache aplikasi)."""
+    rows = conn.execute("SELECT id, name FROM deductions ORDER BY id").fetchall()
+    return Catalog(version=0, types=tuple(DeductionType(id=id_, name=name) for id_, name in rows))
+
+
+def _plan(conn: sqlite3.Connection, sql: str, params: dict) -> list[str]:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def main() -> None:
+    before = _connect(with_indexes=False)
+    after = _connect(with_indexes=True)
+
+    print("# EXPLAIN QUERY PLAN: before / after employee_deductions indexes")
+    print()
+    print("Generated by `python scripts/explain_query_plan.py` (SQLite "
+          f"{sqlite3.sqlite_version}).")
+    print()
+    for name, sql, params in _backend_queries(_catalog(before)):
+        print(f"## {name}")
+        print()
+        print("Before:")
+        print()
+        print("```")
+        print("\n".join(_plan(before, sql, params)))
+        print("```")
+        print()
+        print("After:")
+        print()
+        print("```")
+        print("\n".join(_plan(after, sql, params)))
+        print("```")
+        print()
+
+
+if __name__ == "__main__":
+    main()
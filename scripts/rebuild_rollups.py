@@ -0,0 +1,28 @@
+"""Bangun ulang tabel deduction_rollups dari employee_deductions.
+
+Dipakai jika data potongan diubah di luar aplikasi (misalnya SQL manual)
+sehingga rollup tidak lagi sinkron. Jalankan dari root repo:
+
+    python scripts/rebuild_rollups.py
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import reflex as rx  # noqa: E402
+
+from Learn.backend.rollup import rebuild_rollups  # noqa: E402
+
+
+def main() -> None:
+    started = time.perf_counter()
+    with rx.session() as session:
+        rows = rebuild_rollups(session)
+    print(f"Rebuilt deduction_rollups: {rows} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
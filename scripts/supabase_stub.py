@@ -0,0 +1,204 @@
+"""Stub lokal endpoint Supabase yang dipakai Learn/api.py (auth + tabel invitation_codes/profiles).
+
+Data disimpan di memori. Berguna untuk menjalankan aplikasi atau menguji
+Learn/api.py tanpa project Supabase:
+
+    python scripts/supabase_stub.py --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=stub reflex run
+
+Dengan ``--smoke`` stub dijalankan di thread latar, lalu alur login,
+registrasi dan pembuatan kode undangan dijalankan lewat Learn/api.py.
+Jumlah koneksi TCP yang dibuka dicetak di akhir; dengan client bersama
+seharusnya satu koneksi per request yang berjalan bersamaan, bukan satu per
+request. ``--latency`` menambah jeda per request (mensimulasikan RTT) dan
+``--fail-every N`` membalas 503 untuk setiap request ke-N (menguji retry).
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class StubData:
+    """Isi "database" stub."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}  # email -> {"id", "password"}
+        self.profiles = {}  # user id -> {"id", "role"}
+        self.invitation_codes = {}  # code -> row
+        self.requests = 0
+        self.connections = 0
+
+
+def _eq_filter(query: str, column: str) -> str | None:
+    value = parse_qs(query).get(column, [None])[0]
+    return value[3:] if value and value.startswith("eq.") else None
+
+
+def make_handler(data: StubData, latency: float = 0.0, fail_every: int = 0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def setup(self):
+            super().setup()
+            # Header dan body ditulis terpisah; tanpa NODELAY tiap respons tertahan Nagle/delayed ACK
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with data.lock:
+                data.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body=None):
+            payload = json.dumps(body if body is not None else {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _handle(self, method: str):
+            body = self._body() if method in ("POST", "PATCH") else {}
+            with data.lock:
+                data.requests += 1
+                fail = fail_every and data.requests % fail_every == 0
+            if latency:
+                time.sleep(latency)
+            if fail:
+                return self._send(503, {"message": "stub: injected failure"})
+            url = urlsplit(self.path)
+            route = (method, url.path)
+            with data.lock:
+                if route == ("POST", "/auth/v1/token"):
+                    user = data.users.get(body.get("email"))
+                    if user is None or user["password"] != body.get("password"):
+                        return self._send(400, {"error": "invalid_grant"})
+                    exp = int((datetime.now() + timedelta(hours=1)).timestamp())
+                    # JWT tanpa tanda tangan yang valid; Learn/api.py hanya membaca "exp"
+                    token = ".".join(_b64(part) for part in ('{"alg":"HS256","typ":"JWT"}', json.dumps({"exp": exp}), "stub"))
+                    return self._send(200, {
+                        "access_token": token,
+                        "expires_in": 3600,
+                        "user": {"id": user["id"], "email": body["email"]},
+                    })
+                if route == ("POST", "/auth/v1/signup"):
+                    if body.get("email") in data.users:
+                        return self._send(400, {"msg": "User already registered"})
+                    user_id = str(uuid.uuid4())
+                    data.users[body["email"]] = {"id": user_id, "password": body.get("password")}
+                    data.profiles[user_id] = {"id": user_id, "role": "employee"}
+                    return self._send(200, {"user": {"id": user_id, "email": body["email"]}})
+                if route == ("POST", "/auth/v1/recover"):
+                    return self._send(200, {})
+                if url.path == "/rest/v1/invitation_codes":
+                    code = _eq_filter(url.query, "code")
+                    if method == "GET":
+                        row = data.invitation_codes.get(code)
+                        return self._send(200, [row] if row else [])
+                    if method == "PATCH" and code in data.invitation_codes:
+                        data.invitation_codes[code].update(body)
+                        return self._send(200, [])
+                    if method == "POST":
+                        data.invitation_codes[body["code"]] = {**body, "is_used": False}
+                        return self._send(201, [])
+                if url.path == "/rest/v1/profiles":
+                    user_id = _eq_filter(url.query, "id")
+                    profile = data.profiles.get(user_id)
+                    if method == "GET":
+                        return self._send(200, [profile] if profile else [])
+                    if method == "PATCH" and profile:
+                        profile.update(body)
+                        return self._send(200, [])
+            return self._send(404, {"message": f"stub: no route {method} {url.path}"})
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def do_PATCH(self):
+            self._handle("PATCH")
+
+    return Handler
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+def serve(port: int, latency: float = 0.0, fail_every: int = 0) -> tuple[ThreadingHTTPServer, StubData]:
+    data = StubData()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(data, latency, fail_every))
+    server.daemon_threads = True
+    return server, data
+
+
+async def smoke(data: StubData) -> None:
+    """Alur registrasi + login lewat Learn/api.py terhadap stub."""
+    sys.path.insert(0, str(ROOT))
+    from Learn import api
+
+    try:
+        code = await api.generate_invitation_code("employee")
+        assert code, "generate_invitation_code failed"
+        started = time.perf_counter()
+        result = await api.user_registration_endpoint("stub@example.com", "secret123", code)
+        registration = time.perf_counter() - started
+        assert result is True, result
+        assert not await api.is_invitation_code_valid(code), "invitation code not marked used"
+        token, _, user_id, _ = await api.user_login_endpoint("stub@example.com", "secret123")
+        assert await api.is_user_authenticated(token)
+        assert await api.get_user_role(user_id) == "employee"
+        # Beberapa login bersamaan memakai pool koneksi yang sama
+        await asyncio.gather(*(api.user_login_endpoint("stub@example.com", "secret123") for _ in range(5)))
+    finally:
+        await api.close_client()
+    print(
+        f"OK: {data.requests} requests over {data.connections} connections "
+        f"(registration {registration * 1000:.0f}ms, http2={api.HTTP2})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda per request (detik).")
+    parser.add_argument("--fail-every", type=int, default=0, help="Balas 503 untuk setiap request ke-N.")
+    parser.add_argument("--smoke", action="store_true", help="Jalankan alur Learn/api.py terhadap stub lalu keluar.")
+    args = parser.parse_args()
+
+    server, data = serve(args.port, args.latency, args.fail_every)
+    if not args.smoke:
+        print(f"Supabase stub listening on http://127.0.0.1:{args.port}")
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("SUPABASE_KEY", "stub")
+    try:
+        asyncio.run(smoke(data))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
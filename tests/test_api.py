@@ -0,0 +1,38 @@
+"""Retry ``api._request``: POST tidak diulang setelah read timeout, GET diulang."""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+from Learn import api  # noqa: E402
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Client bersama diganti transport yang selalu read timeout; mengembalikan daftar request."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.method)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    client = httpx.AsyncClient(base_url="http://supabase.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(api, "get_client", lambda: client)
+    monkeypatch.setattr(api, "RETRY_BACKOFF", 0)
+    return requests
+
+
+def test_post_not_retried_on_read_timeout(calls):
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(api._request("POST", "/auth/v1/signup", json={"email": "a@example.com"}))
+    assert calls == ["POST"]
+
+
+def test_get_retried_on_read_timeout(calls):
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(api._request("GET", "/rest/v1/users"))
+    assert calls == ["GET"] * (api.MAX_RETRIES + 1)
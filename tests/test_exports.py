@@ -0,0 +1,33 @@
+"""Token link export: kedaluwarsa -> 410, rusak/ditandatangani kunci lain -> 403."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from Learn.backend.exports import EXPORT_TOKEN_SECRET, export_endpoint, export_url
+
+
+def _status(token: str) -> int:
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(export_endpoint(token))
+    return error.value.status_code
+
+
+def _token(secret: str = EXPORT_TOKEN_SECRET, **claims) -> str:
+    payload = {"kind": "table", "filename": "table.csv", "params": {}, **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def test_expired_token_is_gone():
+    assert _status(_token(exp=datetime.now(timezone.utc) - timedelta(seconds=1))) == 410
+
+
+def test_tampered_token_is_forbidden():
+    token = export_url("table", "table.csv", month=4, year=2024).rsplit("/", 1)[1]
+    header, payload, signature = token.split(".")
+    forged = _token(kind="all_recap", exp=datetime.now(timezone.utc) + timedelta(minutes=5)).split(".")[1]
+    assert _status(f"{header}.{forged}.{signature}") == 403
+    assert _status(_token(secret="another-secret-" + "0" * 32, exp=datetime.now(timezone.utc) + timedelta(minutes=5))) == 403
+    assert _status("not-a-token") == 403
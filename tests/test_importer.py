@@ -0,0 +1,101 @@
+"""Upsert import CSV (importer + fingerprints) terhadap database SQLite di memori."""
+import pandas as pd
+import pytest
+import reflex as rx
+from sqlalchemy import create_engine, event, text
+from sqlmodel import Session  # setelah reflex: urutan import sebaliknya memicu konflik metaclass
+
+from Learn.backend.cache import reference_cache
+from Learn.backend.importer import import_batches
+from Learn.models import Deduction
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    rx.Model.metadata.create_all(engine)
+    # Reference cache per proses: id pegawai/potongan dari database lain tidak berlaku
+    reference_cache.invalidate_deductions()
+    reference_cache.invalidate_employees()
+    with Session(engine) as session:
+        session.add_all([Deduction(name="Zakat"), Deduction(name="Arisan")])
+        session.commit()
+        yield session
+    reference_cache.invalidate_deductions()
+    reference_cache.invalidate_employees()
+
+
+def _csv(*rows) -> pd.DataFrame:
+    return pd.DataFrame(
+        [{"Nama": name, "NIP": nip, "Zakat": zakat, "Arisan": arisan, "Date": "2024-04-01", "Status": "paid", "Type": "cash"}
+         for name, nip, zakat, arisan in rows]
+    )
+
+
+def _amounts(session) -> dict:
+    return {
+        (nip, name): amount
+        for nip, name, amount in session.execute(text("""
+            SELECT e.nip, d.name, ed.amount
+            FROM employee_deductions ed
+            JOIN employees e ON e.id = ed.employee_id
+            JOIN deductions d ON d.id = ed.deduction_id
+            WHERE ed.year = 2024 AND ed.month = 4
+        """))
+    }
+
+
+def _writes(session) -> list:
+    """Catat statement INSERT/UPDATE/DELETE yang dijalankan lewat session."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    return statements
+
+
+def test_upsert_inserts_updates_and_skips_unchanged(session):
+    first = import_batches(session, [_csv(("Ani", "1", 100, 50), ("Budi", "2", 200, None))], month=4, year=2024)
+    assert (first.inserted, first.updated, first.unchanged, first.employees_created) == (2, 0, 0, 2)
+
+    # Ani berubah, Budi sama, Cici baru
+    second = import_batches(
+        session, [_csv(("Ani", "1", 150, 50), ("Budi", "2", 200, None), ("Cici", "3", 300, 25))], month=4, year=2024
+    )
+    assert (second.inserted, second.updated, second.unchanged, second.employees_created) == (1, 1, 1, 1)
+    # Hanya baris pegawai yang berubah yang ditulis (2 potongan x 2 pegawai)
+    assert second.upserted == 4
+    assert _amounts(session) == {
+        ("1", "Zakat"): 150, ("1", "Arisan"): 50,
+        ("2", "Zakat"): 200, ("2", "Arisan"): None,
+        ("3", "Zakat"): 300, ("3", "Arisan"): 25,
+    }
+    rollup = session.execute(text(
+        "SELECT SUM(total_amount), SUM(entry_count) FROM deduction_rollups WHERE year = 2024 AND month = 4"
+    )).one()
+    assert tuple(rollup) == (150 + 50 + 200 + 300 + 25, 6)
+
+
+def test_reimport_of_unchanged_file_writes_nothing(session):
+    frame = _csv(("Ani", "1", 100, 50), ("Budi", "2", 200, None))
+    import_batches(session, [frame], month=4, year=2024, content_hash="abc", filename="april.csv")
+    versions = session.execute(text("SELECT scope, version FROM data_versions")).all()
+
+    writes = _writes(session)
+    # Tanpa hash file: setiap baris dibandingkan dengan sidik jarinya
+    report = import_batches(session, [frame.copy()], month=4, year=2024)
+    assert (report.changed, report.unchanged, report.upserted) == (0, 2, 0)
+    assert writes == []
+    assert session.execute(text("SELECT scope, version FROM data_versions")).all() == versions
+
+    # Hash file sama: batch tidak dibaca sama sekali
+    def unread():
+        raise AssertionError("batches should not be read")
+        yield
+
+    report = import_batches(session, unread(), month=4, year=2024, content_hash="abc", filename="april.csv")
+    assert report.file_unchanged and report.rows == 2
+    assert writes == []
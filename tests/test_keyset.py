@@ -0,0 +1,111 @@
+"""Keyset pagination (SQL dan pivot di memori) dibandingkan dengan paging OFFSET."""
+import pytest
+import reflex as rx
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from Learn.backend.catalog import Catalog, DeductionType
+from Learn.backend.month_pivot import MonthPivot
+from Learn.backend.queries import (
+    CURSOR_AFTER,
+    CURSOR_BEFORE,
+    CURSOR_FROM,
+    entries_query,
+    keyset_query,
+    page_boundaries_query,
+)
+from Learn.models import Deduction, Employee, EmployeeDeduction
+
+LIMIT = 4
+# Zakat: NULL (tanpa baris) dan nilai kembar, supaya kursor melewati batas NULL dan seri
+ZAKAT = [None, 100, None, 50, 100, None, 200, 100, 50, None, 100, None, 300, 100]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    rx.Model.metadata.create_all(engine)
+    with Session(engine) as session:
+        zakat, arisan = Deduction(name="Zakat"), Deduction(name="Arisan")
+        employees = [Employee(name=f"Pegawai {i:02d}", nip=f"19{i:02d}") for i in range(len(ZAKAT))]
+        session.add_all([zakat, arisan, *employees])
+        session.flush()
+        for i, (employee, amount) in enumerate(zip(employees, ZAKAT)):
+            if amount is not None:
+                session.add(EmployeeDeduction(
+                    employee_id=employee.id, deduction_id=zakat.id, amount=amount, month=4, year=2024,
+                ))
+            session.add(EmployeeDeduction(
+                employee_id=employee.id, deduction_id=arisan.id, amount=10 * (i % 3), month=4, year=2024,
+            ))
+        session.commit()
+        catalog = Catalog(version=-1, types=(DeductionType(zakat.id, "Zakat"), DeductionType(arisan.id, "Arisan")))
+        yield session, catalog
+
+
+def _rows(session, sql, params) -> list:
+    return session.execute(text(sql), params).mappings().all()
+
+
+def _offset_pages(session, catalog, sort_value, sort_reverse) -> list:
+    pages = []
+    while True:
+        sql, params, _ = entries_query(
+            catalog, 4, 2024, sort_value=sort_value, sort_reverse=sort_reverse,
+            limit=LIMIT, offset=len(pages) * LIMIT,
+        )
+        ids = [row["id"] for row in _rows(session, sql, params)]
+        if not ids:
+            return pages
+        pages.append(ids)
+
+
+def _walk(fetch, boundaries, pages) -> None:
+    """Halaman pertama, next sampai habis, prev sampai awal, lalu last lewat batas halaman."""
+    page = fetch(None, CURSOR_AFTER)
+    seen = [page]
+    while True:
+        page = fetch(seen[-1][-1], CURSOR_AFTER)
+        if not page:
+            break
+        seen.append(page)
+    assert [[cursor[1] for cursor in page] for page in seen] == pages
+
+    for index in range(len(pages) - 1, 0, -1):
+        page = fetch(seen[index][0], CURSOR_BEFORE)
+        assert [cursor[1] for cursor in page] == pages[index - 1]
+
+    assert [cursor[1] for cursor in boundaries] == [page[0] for page in pages]
+    last = fetch(boundaries[-1], CURSOR_FROM)
+    assert [cursor[1] for cursor in last] == pages[-1]
+
+
+@pytest.mark.parametrize("sort_reverse", [False, True])
+@pytest.mark.parametrize("sort_value", ["Zakat", "total_potongan", "name", ""])
+def test_keyset_pages_match_offset(db, sort_value, sort_reverse):
+    session, catalog = db
+    pages = _offset_pages(session, catalog, sort_value, sort_reverse)
+    assert sum(map(len, pages)) == len(ZAKAT)
+
+    def sql_page(cursor, mode):
+        sql, params, _, column = keyset_query(
+            catalog, 4, 2024, sort_value=sort_value, sort_reverse=sort_reverse, limit=LIMIT,
+            cursor=tuple(cursor) if cursor is not None else None, mode=mode,
+        )
+        rows = _rows(session, sql, params)
+        if cursor is not None and mode == CURSOR_BEFORE:
+            rows = rows[::-1]
+        return [(row[column] if column else None, row["id"]) for row in rows]
+
+    sql, params = page_boundaries_query(catalog, 4, 2024, sort_value=sort_value, sort_reverse=sort_reverse, limit=LIMIT)
+    _walk(sql_page, [tuple(row) for row in session.execute(text(sql), params)], pages)
+
+    sql, params, _ = entries_query(catalog, 4, 2024)
+    pivot = MonthPivot([dict(row) for row in _rows(session, sql, params)])
+    _, _, _, column = keyset_query(catalog, 4, 2024, sort_value=sort_value)
+
+    def pivot_page(cursor, mode):
+        rows = pivot.page("", column, sort_reverse, LIMIT, cursor=cursor, mode=mode)
+        return [(row[column] if column else None, row["id"]) for row in rows]
+
+    _walk(pivot_page, pivot.boundaries("", column, sort_reverse, LIMIT), pages)
@@ -0,0 +1,43 @@
+"""Kartu statistik (MONTH_STATS_SQL) terhadap database SQLite di memori."""
+from datetime import datetime
+
+import pytest
+import reflex as rx
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from Learn.backend.queries import MONTH_STATS_SQL
+from Learn.models import Deduction, Employee, EmployeeDeduction
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    rx.Model.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _stats(session, year: int, month: int) -> tuple:
+    params = {"year": year, "month": month, "current_start": "1970-01-01 00:00:00", "previous_start": "1969-12-01 00:00:00"}
+    return tuple(session.execute(text(MONTH_STATS_SQL), params).one())
+
+
+def test_deleted_employee_not_counted(session):
+    now = datetime.now()
+    deduction = Deduction(name="Zakat")
+    kept = Employee(name="Kept", nip="1")
+    deleted = Employee(name="Deleted", nip="2")
+    session.add_all([deduction, kept, deleted])
+    session.flush()
+    for employee, amount in ((kept, 20000), (deleted, 50000)):
+        session.add(EmployeeDeduction(
+            employee_id=employee.id, deduction_id=deduction.id, amount=amount, month=now.month, year=now.year,
+        ))
+    session.flush()
+    assert _stats(session, now.year, now.month)[:2] == (2, 70000)
+
+    # Baris potongan yatim (pegawai sudah dihapus) tidak ikut dihitung, sama seperti pivot tabel
+    session.delete(deleted)
+    session.flush()
+    assert _stats(session, now.year, now.month)[:2] == (1, 20000)